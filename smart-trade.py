@@ -38,6 +38,7 @@ logger = logging.getLogger(__name__)
 # ============================================================================
 from src.config.settings import AppConfig, DataConfig, ChartConfig, ModelConfig
 from src.data.loader import StockDataLoader
+from src.data.cache import enable_copy_on_write
 from src.data.processor import DataProcessor
 from src.models.technical import TechnicalIndicatorCalculator
 from src.models.risk import RiskCalculator
@@ -54,12 +55,17 @@ import json
 # ============================================================================
 # 全局配置实例
 # ============================================================================
+enable_copy_on_write()  # 缓存命中返回零拷贝视图，需在加载任何数据前开启
+
 app_config = AppConfig()
 data_config = DataConfig()
 chart_config = ChartConfig()
 model_config = ModelConfig()
 
 data_loader = StockDataLoader(data_config)
+if data_config.warmup_in_app:
+    from src.data.warmup import start_warmup_scheduler
+    start_warmup_scheduler(data_config)
 data_processor = DataProcessor()
 indicator_calculator = TechnicalIndicatorCalculator()
 risk_calculator = RiskCalculator(model_config)
@@ -321,9 +327,11 @@ def main():
                 with col1:
                     if st.button("🔄 清除缓存"):
                         import shutil
+                        from src.data.cache import clear_frame_caches
                         if os.path.exists(".cache"):
                             shutil.rmtree(".cache")
                             os.makedirs(".cache", exist_ok=True)
+                        clear_frame_caches()
                         st.success("缓存已清除")
                 with col2:
                     if st.button("📊 性能统计"):
@@ -563,6 +571,22 @@ def _show_performance_stats():
         if stats["last_calculation"]:
             st.metric("上次计算", stats["last_calculation"].strftime("%Y-%m-%d %H:%M:%S"))
 
+        from src.data.cache import get_frame_cache_stats
+        for name, cache_stats in get_frame_cache_stats().items():
+            st.caption(
+                f"行情缓存 [{name}]: {cache_stats['entries']} 条 / "
+                f"{cache_stats['bytes'] / 1024 / 1024:.1f}MB，命中率 {cache_stats['hit_rate']:.1%}，"
+                f"淘汰 {cache_stats['evictions']} 次"
+            )
+
+        from src.data.http_pool import get_http_pool_stats
+        pool_stats = get_http_pool_stats()
+        if pool_stats:
+            st.caption(
+                f"HTTP 连接池: {pool_stats['requests']} 次请求，新建连接 {pool_stats['connections_opened']} 个，"
+                f"复用率 {pool_stats['reuse_rate']:.1%}（yfinance 会话 {pool_stats['curl_sessions']} 个）"
+            )
+
 
 if __name__ == "__main__":
     main()
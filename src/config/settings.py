@@ -5,6 +5,59 @@ class AppConfig:
 
 class DataConfig:
     sz100_stocks_file = "data/sz100_stocks.csv"
+    universe_dir = ".cache/universes"  # 从网络获取的股票池成分缓存
+    universe_ttl_days = 7  # 股票池成分缓存有效期（天）
+    store_dir = ".cache/ohlcv_store"  # 本地列式行情存储（Parquet，按代码/年份分区）
+    store_enabled = True
+    metadata_dir = ".cache/metadata"  # 公司名称/行业/上市日期等元数据缓存
+    metadata_ttl_days = 30  # 元数据缓存有效期（天）
+    panel_dir = ".cache/panels"  # 内存映射的股票池面板（多进程只读共享）
+    akshare_incremental = True  # AKShare 日线增量拉取（依赖本地存储）
+    adjust_factor_ttl_days = 7  # 复权因子表最长使用天数（检测到除权除息时立即更新）
+    frame_cache_max_bytes = 256 * 1024 * 1024  # 每个加载器内存缓存的字节预算
+    copy_on_write = True  # 开启 pandas Copy-on-Write，缓存读取不再整帧复制
+    batch_max_workers = 8  # 批量加载的最大并发数
+    # 各数据源限流：(每秒请求数, 突发容量)，同一进程内所有调用方共享
+    source_rate_limits = {
+        'akshare': (5.0, 10),
+        'yfinance': (2.0, 5),
+    }
+    default_rate_limit = (5.0, 10)
+    calendar_dir = ".cache/calendar"  # 交易日历缓存
+    calendar_ttl_days = 30  # 交易日历刷新间隔（天）
+    intraday_cache_ttl_seconds = 60  # 盘中行情缓存有效期（秒）；收盘定型后缓存到下一次开盘
+    # 缓存预热调度（python -m src.data.warmup）：开盘前、收盘后刷新以下股票池
+    warmup_universes = ['SZ100']
+    warmup_pre_open_minutes = 30  # 开盘前多少分钟运行
+    warmup_full_metadata = False  # 开盘前是否逐只补齐行业、上市日期等完整公司信息
+    warmup_in_app = False  # 在界面进程内后台运行预热（同时预热进程内缓存）
+    # 共享 HTTP 连接池（AKShare / YFinance 复用 keep-alive 连接）
+    http_pool_enabled = True
+    http_pool_hosts = 20  # 缓存连接池的主机数
+    http_pool_maxsize = 16  # 每个主机保持的最大连接数（不小于 batch_max_workers）
+    http_timeout = (5, 30)  # 默认 (连接, 读取) 超时（秒）
+    spot_ttl_seconds = 15  # 全市场行情快照有效期（秒）
+    health_probe_enabled = True  # 后台定时探测数据源健康状态
+    health_probe_interval = 300  # 探测间隔（秒）
+    unhealthy_after_failures = 3  # 连续失败多少次后熔断（标记为 unhealthy）
+    circuit_reset_timeout = 60  # 熔断后多少秒进入半开状态、放行一个试探请求
+    latency_window = 100  # 每个数据源保留的最近请求样本数（p50/p95、错误率）
+    routing_min_samples = 5  # 样本数不足时按静态优先级路由
+    hedge_enabled = False  # 对冲请求：首选数据源慢时并行请求备用数据源
+    hedge_p95_fraction = 0.8  # 等待首选数据源 p95 延迟的该比例后发出对冲
+    hedge_max_workers = 8
+    # 本地回放数据源（离线压测/回归）：从本地 Parquet 仓库与录制文件提供数据
+    local_source_enabled = False
+    local_source_exclusive = False  # 只使用本地回放数据源，不加载任何网络数据源
+    local_source_dir = "data/replay"
+    local_latency_ms = 0.0  # 注入延迟均值（毫秒）
+    local_latency_jitter_ms = 0.0  # 注入延迟标准差（毫秒）
+    local_error_rate = 0.0  # 注入故障的概率
+    local_random_seed = None  # 固定后延迟与故障序列可复现
+    # 上游调用录制/回放：off | record | replay | auto（可用环境变量 CASSETTE_MODE 覆盖）
+    cassette_mode = "off"
+    cassette_dir = ".cache/cassettes"
+    cassette_replay_latency = True  # 回放时按录制的延迟等待；False 为零延迟（只测本地开销）
 
 class ChartConfig:
     template = "plotly_dark"
@@ -0,0 +1,70 @@
+"""
+复权 - 本地存储不复权价格，读取时按复权因子表换算
+
+前复权（qfq）价格 = 不复权价格 / qfq_factor，
+后复权（hfq）价格 = 不复权价格 × hfq_factor，
+因子表只在除权除息日有记录，其余交易日沿用之前最近一次的因子。
+
+除权除息后只需要更新该股票很小的因子表，已存储的K线不变。
+"""
+
+import numpy as np
+import pandas as pd
+
+ADJUST_MODES = ('qfq', 'hfq', 'none')
+
+# 随复权换算的价格列（成交量、涨跌幅、换手率不受影响）
+ADJUSTED_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Change']
+
+# 除权判断：交易所昨收（Close - Change）与实际前一日收盘价之差超过该值（元）
+EX_RIGHT_TOLERANCE = 0.005
+
+
+def apply_adjustment(df: pd.DataFrame, factors: pd.DataFrame, adjust: str) -> pd.DataFrame:
+    """
+    对不复权日线应用复权因子（向量化乘法）。
+
+    Args:
+        df: 不复权日线，按日期升序
+        factors: 列为 Date / qfq_factor / hfq_factor 的因子表；为空时原样返回
+        adjust: 'qfq' / 'hfq' / 'none'
+    """
+    if adjust not in ADJUST_MODES:
+        raise ValueError(f"未知的复权方式: {adjust}（可选 {', '.join(ADJUST_MODES)}）")
+    column = f"{adjust}_factor"
+    if (adjust == 'none' or df is None or df.empty or factors is None
+            or factors.empty or column not in factors.columns):
+        return df
+
+    table = factors[['Date', column]].dropna().sort_values('Date')
+    if table.empty:
+        return df
+
+    # 每根K线取不晚于当日的最近一次因子；早于因子表的K线取第一条因子
+    position = np.searchsorted(table['Date'].to_numpy(), df['Date'].to_numpy(), side='right') - 1
+    factor = table[column].to_numpy(dtype=np.float64)[np.clip(position, 0, None)]
+    multiplier = 1.0 / factor if adjust == 'qfq' else factor
+
+    df = df.copy(deep=False)
+    for col in ADJUSTED_COLUMNS:
+        if col in df.columns:
+            df[col] = (df[col].to_numpy(dtype=np.float64) * multiplier).astype(df[col].dtype)
+    return df
+
+
+def has_ex_right(bars: pd.DataFrame, prev_close: float = None) -> bool:
+    """
+    不复权日线中是否出现除权除息：交易所公布的昨收（Close - Change）
+    与前一根K线的实际收盘价不一致。
+
+    Args:
+        bars: 不复权日线，按日期升序，需包含 Close 与 Change
+        prev_close: bars 第一根之前一个交易日的收盘价（可选）
+    """
+    if bars is None or bars.empty or 'Change' not in bars.columns:
+        return False
+    close = bars['Close'].to_numpy(dtype=np.float64)
+    exchange_pre_close = close - bars['Change'].to_numpy(dtype=np.float64)
+    actual_pre_close = np.concatenate([[np.nan if prev_close is None else prev_close], close[:-1]])
+    diff = np.abs(exchange_pre_close - actual_pre_close)
+    return bool(np.nanmax(diff, initial=0.0) > EX_RIGHT_TOLERANCE)
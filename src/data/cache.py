@@ -0,0 +1,189 @@
+"""
+内存受限的 LRU 缓存 - 按 DataFrame 实际占用字节数计量
+"""
+
+import sys
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+import pandas as pd
+
+from src.config.settings import DataConfig
+
+logger = logging.getLogger(__name__)
+
+
+def copy_on_write_active() -> bool:
+    """pandas Copy-on-Write 是否生效（pandas 3 默认开启，2.x 需设置 mode.copy_on_write）"""
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return True
+    return pd.get_option('mode.copy_on_write') is True
+
+
+def enable_copy_on_write() -> None:
+    """在进程启动时为 pandas 2.x 开启 Copy-on-Write（pandas 3 无需设置）"""
+    if DataConfig.copy_on_write and not copy_on_write_active():
+        pd.set_option('mode.copy_on_write', True)
+        logger.info("已开启 pandas Copy-on-Write，缓存命中返回零拷贝视图")
+
+
+def share_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    返回可安全交给调用方的 DataFrame：
+    Copy-on-Write 生效时为浅拷贝（不复制数据，调用方修改时才按列复制），
+    否则退回深拷贝，保证缓存中的数据不会被调用方改写。
+    """
+    return df.copy(deep=not copy_on_write_active())
+
+
+def estimate_bytes(value: Any) -> int:
+    """估算缓存值占用的内存字节数（DataFrame 使用 deep memory_usage）"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_bytes(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_bytes(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+class FrameCache:
+    """
+    线程安全的 LRU 缓存：
+    - 总占用超过 max_bytes 时按最近最少使用淘汰；
+    - 条目到期（默认写入 ttl_seconds 后，或写入时指定的 expires_at）后在读取或写入时释放；
+    - 单个条目大于整个预算时不缓存。
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: Optional[float] = None, name: str = ''):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.name = name
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, size, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @staticmethod
+    def _expired(expires_at: Optional[float], now: float) -> bool:
+        return expires_at is not None and now >= expires_at
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """命中返回缓存值并标记为最近使用；未命中或已过期返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            value, _, expires_at = entry
+            if self._expired(expires_at, time.time()):
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, expires_at: Optional[float] = None) -> None:
+        """
+        写入缓存，必要时淘汰过期与最久未使用的条目。
+
+        Args:
+            expires_at: 过期时间戳（time.time()），默认写入 ttl_seconds 后过期
+        """
+        size = estimate_bytes(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                logger.debug(f"[{self.name}] 条目 {key} 大小 {size} 超过缓存预算，不缓存")
+                return
+
+            self._purge_expired(time.time())
+            while self._entries and self._bytes + size > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._evictions += 1
+
+            if expires_at is None and self.ttl_seconds is not None:
+                expires_at = time.time() + self.ttl_seconds
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+
+    def _purge_expired(self, now: float) -> None:
+        expired = [k for k, (_, _, expires_at) in self._entries.items() if self._expired(expires_at, now)]
+        for key in expired:
+            self._remove(key)
+        self._expirations += len(expired)
+
+    def purge_expired(self) -> None:
+        """释放所有已过期条目"""
+        with self._lock:
+            self._purge_expired(time.time())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """命中/未命中/淘汰计数与内存占用"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+            }
+
+
+# 进程内按名称共享的缓存：同类加载器的多个实例共用同一份预算
+_caches: Dict[str, FrameCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_frame_cache(name: str, ttl_seconds: Optional[float] = None,
+                    max_bytes: Optional[int] = None) -> FrameCache:
+    """获取（首次调用时创建）名为 name 的共享缓存"""
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = FrameCache(
+                max_bytes or DataConfig.frame_cache_max_bytes, ttl_seconds, name
+            )
+        return _caches[name]
+
+
+def get_frame_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """所有共享缓存的统计"""
+    with _caches_lock:
+        caches = dict(_caches)
+    return {name: cache.get_stats() for name, cache in caches.items()}
+
+
+def clear_frame_caches() -> None:
+    """清空所有共享缓存（如界面上的"清除缓存"）"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.clear()
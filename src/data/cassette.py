@@ -0,0 +1,191 @@
+"""
+上游行情接口的录制/回放层（cassette）
+
+- record: 真实调用上游，把结果（或异常）与实测延迟压缩写入磁盘；
+- replay: 只从磁盘读取，未录制的调用抛出 CassetteMiss，不访问网络；
+- auto:   已录制则回放，否则真实调用并录制；只录制与回放成功的结果，
+          异常（多为瞬时故障）直接抛出、不写入磁盘；
+- off:    直接调用上游（默认）。
+
+录制文件按 "接口名/参数哈希" 存放::
+
+    {root}/{name}/{sha1(name + 参数)}.pkl.gz
+
+回放时可以按录制时的延迟 sleep（复现端到端耗时），也可以零延迟（只测本地 CPU 开销）。
+模式与延迟策略取自 DataConfig，可用环境变量 CASSETTE_MODE / CASSETTE_LATENCY
+（recorded 或 zero）覆盖，便于在脚本中切换。
+
+注意：录制文件使用 pickle，只回放自己录制的文件。
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from src.config.settings import DataConfig
+
+logger = logging.getLogger(__name__)
+
+MODES = ('off', 'record', 'replay', 'auto')
+
+
+class CassetteMiss(LookupError):
+    """回放模式下请求了未录制的调用"""
+
+
+class Cassette:
+    """按 (接口名, 参数) 录制与回放上游调用结果（线程安全）"""
+
+    def __init__(self, root: str, mode: str = 'off', replay_latency: bool = True):
+        if mode not in MODES:
+            raise ValueError(f"未知的 cassette 模式: {mode}（可选 {', '.join(MODES)}）")
+        self.root = root
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self._lock = threading.Lock()
+        self._stats = {'live_calls': 0, 'recorded': 0, 'replayed': 0, 'misses': 0}
+        self._network_seconds = 0.0  # 实测（record）或模拟（replay）的网络耗时合计
+
+        if mode != 'off':
+            logger.info(f"cassette 模式: {mode}，目录: {os.path.abspath(root)}")
+
+    @staticmethod
+    def key(name: str, params: Dict[str, Any]) -> str:
+        """调用的稳定键：参数按名称排序后序列化再取哈希"""
+        payload = json.dumps([name, params], sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, name: str, params: Dict[str, Any]) -> str:
+        return os.path.join(self.root, name, f"{self.key(name, params)}.pkl.gz")
+
+    def _add(self, field: str, seconds: float = 0.0) -> None:
+        with self._lock:
+            self._stats[field] += 1
+            self._network_seconds += seconds
+
+    def call(self, name: str, params: Dict[str, Any], fn: Callable[[], Any]) -> Any:
+        """
+        执行（或回放）一次上游调用。
+
+        Args:
+            name: 接口名，如 'ak.stock_zh_a_hist'
+            params: 决定返回结果的全部参数（组成录制键）
+            fn: 真实调用，无参数；回放命中时不会执行
+        """
+        if self.mode == 'off':
+            return fn()
+
+        path = self._path(name, params)
+        if self.mode in ('replay', 'auto') and os.path.exists(path):
+            entry = self._load(path)
+            # auto 模式不回放录制的异常（如 record 模式下录到的故障），改为重新真实调用
+            if self.mode == 'replay' or entry.get('error') is None:
+                return self._replay(entry)
+        elif self.mode == 'replay':
+            self._add('misses')
+            raise CassetteMiss(f"未录制的调用: {name}({params})")
+
+        return self._record(path, name, params, fn)
+
+    @staticmethod
+    def _load(path: str) -> Dict[str, Any]:
+        with gzip.open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def _replay(self, entry: Dict[str, Any]) -> Any:
+        latency = entry['latency'] if self.replay_latency else 0.0
+        if latency:
+            time.sleep(latency)
+        self._add('replayed', latency)
+        if entry.get('error') is not None:
+            raise entry['error']
+        return entry['result']
+
+    def _record(self, path: str, name: str, params: Dict[str, Any], fn: Callable[[], Any]) -> Any:
+        started = time.monotonic()
+        result, error = None, None
+        try:
+            result = fn()
+        except Exception as e:
+            error = e
+        latency = time.monotonic() - started
+        self._add('live_calls', latency)
+        if error is not None and self.mode != 'record':
+            # 只有显式 record 模式录制异常；auto 模式的失败不落盘，下次仍真实调用
+            raise error
+
+        entry = {
+            'name': name,
+            'params': params,
+            'latency': latency,
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+            'result': result,
+            'error': error,
+        }
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                payload = pickle.dumps(entry)
+            except Exception:
+                # 部分异常类型无法序列化，按消息保存
+                entry['error'] = RuntimeError(repr(error))
+                payload = pickle.dumps(entry)
+            with gzip.open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+            self._add('recorded')
+        except Exception as e:
+            logger.warning(f"录制 {name} 失败: {e}")
+
+        if error is not None:
+            raise error
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """调用统计；network_seconds 为网络耗时合计，可从总耗时中扣除得到本地计算耗时"""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats['network_seconds'] = round(self._network_seconds, 3)
+        stats['mode'] = self.mode
+        stats['replay_latency'] = self.replay_latency
+        return stats
+
+
+# 全局单例
+_cassette_instance: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Cassette:
+    """获取录制/回放层单例（模式取自环境变量或 DataConfig）"""
+    global _cassette_instance
+    with _cassette_lock:
+        if _cassette_instance is None:
+            mode = os.getenv('CASSETTE_MODE', DataConfig.cassette_mode)
+            latency = os.getenv('CASSETTE_LATENCY')
+            replay_latency = (latency != 'zero') if latency else DataConfig.cassette_replay_latency
+            _cassette_instance = Cassette(DataConfig.cassette_dir, mode, replay_latency)
+        return _cassette_instance
+
+
+def set_cassette_mode(mode: str, replay_latency: Optional[bool] = None,
+                      root: Optional[str] = None) -> Cassette:
+    """在运行时切换模式（脚本或压测入口使用）"""
+    global _cassette_instance
+    with _cassette_lock:
+        current = _cassette_instance
+        _cassette_instance = Cassette(
+            root or (current.root if current else DataConfig.cassette_dir),
+            mode,
+            replay_latency if replay_latency is not None
+            else (current.replay_latency if current else DataConfig.cassette_replay_latency)
+        )
+        return _cassette_instance
@@ -0,0 +1,182 @@
+"""
+只追加的本地数据集 - 新闻、资金流向、财务报表的增量去重缓存
+
+目录结构（与日线仓库共用根目录）::
+
+    {root}/datasets/{dataset}/{symbol}.parquet
+
+每个数据集按主键去重合并（新闻按链接、资金流向按日期、财报按报告期），
+后拉取的行覆盖先拉取的同键行；上游只返回最近一段数据时，本地表仍保留更早的历史。
+表在有效期内（或已包含最后一个已定型交易日的数据）直接读取本地，不请求上游。
+"""
+
+import hashlib
+import os
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+from src.config.settings import DataConfig
+from .store import PARQUET_AVAILABLE, last_settled_date, normalize_symbol
+
+logger = logging.getLogger(__name__)
+
+KEY_COLUMN = '_key'
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """数据集的主键与刷新规则"""
+    key: str                          # 主键列；缺失时按整行内容哈希
+    sort: Optional[str]               # 排序列
+    ascending: bool                   # 排序方向
+    ttl_seconds: float                # 有效期
+    daily: bool = False               # 按交易日更新：已有最后一个定型交易日的数据即视为最新
+
+
+DATASETS: Dict[str, DatasetSpec] = {
+    'news': DatasetSpec(key='新闻链接', sort='发布时间', ascending=False, ttl_seconds=30 * 60),
+    'fund_flow': DatasetSpec(key='日期', sort='日期', ascending=True, ttl_seconds=30 * 60, daily=True),
+    'financial_report': DatasetSpec(key='报告日', sort='报告日', ascending=False,
+                                    ttl_seconds=7 * 86400),
+}
+
+
+def _row_keys(df: pd.DataFrame, key: str) -> pd.Series:
+    """主键列转为字符串；没有主键列时对整行内容取哈希"""
+    if key in df.columns:
+        return df[key].astype(str)
+    return df.astype(str).agg('|'.join, axis=1).map(
+        lambda text: hashlib.sha1(text.encode('utf-8')).hexdigest()
+    )
+
+
+def _arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """混合类型的 object 列（如财报中数字与文本混排）转为字符串，Parquet 才能写入"""
+    mixed = [col for col in df.columns if df[col].dtype == object
+             and pd.api.types.infer_dtype(df[col], skipna=True).startswith('mixed')]
+    if not mixed:
+        return df
+    df = df.copy()
+    for col in mixed:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+class DatasetStore:
+    """按 数据集/代码 存储的增量去重表"""
+
+    def __init__(self, root: str, enabled: bool = True):
+        self.root = root
+        self.enabled = enabled and PARQUET_AVAILABLE
+        self._lock = threading.RLock()
+
+    def _path(self, dataset: str, symbol: str) -> str:
+        return os.path.join(self.root, 'datasets', dataset, f"{normalize_symbol(symbol)}.parquet")
+
+    def read(self, dataset: str, symbol: str) -> pd.DataFrame:
+        """读取本地表（不含内部主键列），没有时返回空表"""
+        path = self._path(dataset, symbol)
+        if not self.enabled or not os.path.exists(path):
+            return pd.DataFrame()
+        try:
+            with self._lock:
+                df = pd.read_parquet(path)
+        except Exception as e:
+            logger.warning(f"读取数据集 {path} 失败: {e}")
+            return pd.DataFrame()
+        return df.drop(columns=[KEY_COLUMN], errors='ignore')
+
+    def is_fresh(self, dataset: str, symbol: str) -> bool:
+        """本地表是否无需刷新"""
+        path = self._path(dataset, symbol)
+        if not self.enabled or not os.path.exists(path):
+            return False
+        spec = DATASETS[dataset]
+        if time.time() - os.path.getmtime(path) < spec.ttl_seconds:
+            return True
+        if spec.daily:
+            df = self.read(dataset, symbol)
+            if spec.sort in df.columns and not df.empty:
+                latest = pd.to_datetime(df[spec.sort], errors='coerce').max()
+                return pd.notna(latest) and latest >= last_settled_date()
+        return False
+
+    def merge(self, dataset: str, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        把新拉取的数据按主键合并进本地表并返回合并结果。
+        没有新增行时只更新表的刷新时间。
+        """
+        spec = DATASETS[dataset]
+        if df is None or df.empty:
+            self._touch(dataset, symbol)
+            return self.read(dataset, symbol)
+        if not self.enabled:
+            return df
+
+        path = self._path(dataset, symbol)
+        fresh = df.copy()
+        fresh[KEY_COLUMN] = _row_keys(fresh, spec.key).to_numpy()
+
+        with self._lock:
+            try:
+                existing = pd.read_parquet(path) if os.path.exists(path) else pd.DataFrame()
+                added = (len(fresh) if existing.empty
+                         else int((~fresh[KEY_COLUMN].isin(existing[KEY_COLUMN])).sum()))
+                merged = pd.concat([existing, fresh], ignore_index=True) if not existing.empty else fresh
+                merged = merged.drop_duplicates(subset=KEY_COLUMN, keep='last')
+                if spec.sort in merged.columns:
+                    merged = merged.sort_values(spec.sort, ascending=spec.ascending, kind='stable')
+                merged = _arrow_safe(merged.reset_index(drop=True))
+
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                merged.to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, path)
+                logger.debug(f"{dataset}/{symbol} 新增 {added} 行，共 {len(merged)} 行")
+            except Exception as e:
+                logger.warning(f"写入数据集 {dataset}/{symbol} 失败: {e}")
+                return df
+        return merged.drop(columns=[KEY_COLUMN])
+
+    def _touch(self, dataset: str, symbol: str) -> None:
+        path = self._path(dataset, symbol)
+        if self.enabled and os.path.exists(path):
+            os.utime(path, None)
+
+    def load(self, dataset: str, symbol: str, fetch: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """
+        读取数据集：本地表未过期时直接返回，否则请求上游并合并。
+        请求失败时退回本地表；本地也没有数据时抛出原异常。
+        """
+        if self.is_fresh(dataset, symbol):
+            return self.read(dataset, symbol)
+        try:
+            df = fetch()
+        except Exception as e:
+            cached = self.read(dataset, symbol)
+            if cached.empty:
+                raise
+            logger.warning(f"{dataset}/{symbol} 刷新失败，使用本地数据: {e}")
+            return cached
+        return self.merge(dataset, symbol, df)
+
+
+# 全局单例
+_dataset_store_instance: Optional[DatasetStore] = None
+
+
+def get_dataset_store(data_config: Optional[DataConfig] = None) -> DatasetStore:
+    """获取数据集存储单例（根目录与日线仓库相同）"""
+    global _dataset_store_instance
+    if _dataset_store_instance is None:
+        config = data_config or DataConfig()
+        _dataset_store_instance = DatasetStore(
+            getattr(config, 'store_dir', DataConfig.store_dir),
+            enabled=getattr(config, 'store_enabled', DataConfig.store_enabled)
+        )
+    return _dataset_store_instance
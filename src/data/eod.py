@@ -0,0 +1,180 @@
+"""
+收盘后全市场日线入库 - 用一次全市场行情快照生成当日日线
+
+每日更新大股票池时，逐只请求 stock_zh_a_hist 需要几千次上游请求；
+收盘后的 stock_zh_a_spot 快照已经包含每只A股当日的开高低收与成交量，
+一次请求即可为全部股票追加当日K线。逐只的历史接口只用于补齐缺口。
+
+快照为不复权价格，写入存储时口径为 'raw'；快照中出现除权除息的股票，
+其复权因子表被标记为过期，下次加载时重新请求。
+
+用法::
+
+    python -m src.data.eod                 # 全部A股
+    python -m src.data.eod --universe SZ100
+"""
+
+import argparse
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.config.settings import DataConfig
+from .adjust import has_ex_right
+from .schema import compact_ohlcv
+from .store import OHLCVStore, DATE_FORMAT, get_ohlcv_store
+from .trading_calendar import SETTLE_DELAY, get_trading_calendar
+
+logger = logging.getLogger(__name__)
+
+# 快照（新浪）成交量单位为股，历史日线接口为手
+SPOT_VOLUME_PER_LOT = 100
+
+# 快照列 -> 日线列
+_SPOT_COLUMNS = {
+    '今开': 'Open',
+    '最高': 'High',
+    '最低': 'Low',
+    '最新价': 'Close',
+    '涨跌额': 'Change',
+    '涨跌幅': 'ChangePercent',
+    '成交量': 'Volume',
+    '成交额': 'Amount',
+    '换手率': 'Turnover',
+}
+
+
+def snapshot_session(now: Optional[datetime] = None) -> Optional[pd.Timestamp]:
+    """
+    当前时刻的全市场快照对应的交易日：收盘定型之后、下一个交易日开盘集合竞价（09:15）
+    之前，快照即为最后一个交易日的日线；盘中或开盘前返回 None。
+    """
+    calendar = get_trading_calendar('CN')
+    now = pd.Timestamp(now) if now is not None else calendar.now()
+    session = calendar.last_settled_session(now)
+    next_open = calendar.next_trading_day(session) + timedelta(
+        hours=calendar.spec.pre_open.hour, minutes=calendar.spec.pre_open.minute)
+    settled_at = calendar.close_time(session) + SETTLE_DELAY
+    return session if settled_at <= now < next_open else None
+
+
+def spot_to_daily_bars(spot: pd.DataFrame, trade_date) -> pd.DataFrame:
+    """
+    全市场快照 -> 当日日线（每只股票一行，Symbol 为6位代码）。
+    停牌（无成交或无开盘价）的股票不生成K线。
+
+    Args:
+        spot: 行情快照，索引为6位代码（见 SpotSnapshot.get）
+        trade_date: 快照对应的交易日
+    """
+    if spot is None or spot.empty:
+        return pd.DataFrame()
+
+    bars = spot[[col for col in _SPOT_COLUMNS if col in spot.columns]].rename(columns=_SPOT_COLUMNS)
+    bars = bars.apply(pd.to_numeric, errors='coerce')
+    traded = (bars['Volume'] > 0) & (bars['Open'] > 0) & bars['Close'].notna()
+    bars = bars.loc[traded].copy()
+
+    bars['Volume'] = bars['Volume'] / SPOT_VOLUME_PER_LOT
+    if '昨收' in spot.columns:
+        pre_close = pd.to_numeric(spot.loc[bars.index, '昨收'], errors='coerce').replace(0, np.nan)
+        bars['Amplitude'] = (bars['High'] - bars['Low']) / pre_close * 100
+
+    bars['Date'] = pd.Timestamp(trade_date).normalize()
+    bars['Symbol'] = bars.index.astype(str)
+    return bars.reset_index(drop=True)
+
+
+def _previous_bar(store: OHLCVStore, symbol: str, trade_date: pd.Timestamp) -> Optional[pd.Series]:
+    """本地存储中 trade_date 之前最近的一根K线"""
+    history = store.read(symbol, (trade_date - timedelta(days=31)).strftime(DATE_FORMAT),
+                         (trade_date - timedelta(days=1)).strftime(DATE_FORMAT))
+    return None if history.empty else history.iloc[-1]
+
+
+def ingest_spot_snapshot(
+    spot: Optional[pd.DataFrame] = None,
+    symbols: Optional[Iterable[str]] = None,
+    trade_date=None,
+    store: Optional[OHLCVStore] = None,
+) -> Dict[str, int]:
+    """
+    把一次全市场快照写入本地日线存储。
+
+    Args:
+        spot: 行情快照，默认请求共享的全市场快照（get_spot_snapshot）
+        symbols: 只写入这些代码（如某个股票池），默认快照中的全部股票
+        trade_date: 快照对应的交易日；默认由当前时间推断，盘中调用时不写入
+        store: 目标存储，默认全局日线存储
+
+    Returns:
+        统计：written / skipped / ex_rights
+    """
+    stats = {'written': 0, 'skipped': 0, 'ex_rights': 0}
+    store = store or get_ohlcv_store()
+    if not store.enabled:
+        logger.warning("本地行情存储未启用，跳过收盘入库")
+        return stats
+
+    if trade_date is None:
+        trade_date = snapshot_session()
+        if trade_date is None:
+            logger.warning("当前处于交易时段或开盘前，快照不是定型的日线，跳过收盘入库")
+            return stats
+    trade_date = pd.Timestamp(trade_date).normalize()
+
+    if spot is None:
+        from .loader_akshare import get_spot_snapshot
+        spot = get_spot_snapshot().get()
+    if symbols is not None:
+        from .spot import spot_code
+        spot = spot.loc[spot.index.intersection([spot_code(code) for code in symbols])]
+
+    bars = spot_to_daily_bars(spot, trade_date)
+    day = trade_date.strftime(DATE_FORMAT)
+    for symbol, bar in bars.groupby('Symbol', sort=False):
+        if store.price_basis(symbol) != 'raw' and store.coverage(symbol):
+            # 旧版前复权数据不能混入不复权K线，留给下次加载时整体重拉
+            stats['skipped'] += 1
+            continue
+
+        previous = _previous_bar(store, symbol, trade_date)
+        if previous is not None:
+            same_bar = (np.isclose(previous['Close'], bar['Close'].iloc[0], atol=1e-3)
+                        and int(previous['Volume']) == int(round(bar['Volume'].iloc[0])))
+            if same_bar:
+                # 快照仍是上一交易日的数据（交易日历不可用、按工作日估算时的节假日）
+                stats['skipped'] += 1
+                continue
+            if has_ex_right(bar, prev_close=float(previous['Close'])):
+                store.expire_factors(symbol)
+                stats['ex_rights'] += 1
+
+        store.write(symbol, compact_ohlcv(bar), day, day, basis='raw')
+        stats['written'] += 1
+
+    logger.info(f"收盘入库 {day}: 写入 {stats['written']} 只，跳过 {stats['skipped']} 只，"
+                f"除权除息 {stats['ex_rights']} 只")
+    return stats
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="用全市场行情快照写入当日日线")
+    parser.add_argument('--universe', default=None,
+                        help="只写入该股票池（SZ100 / CSI300 / CSI500 / A_SHARE），默认全部A股")
+    parser.add_argument('--date', default=None, help="快照对应的交易日 YYYYMMDD（默认自动推断）")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    symbols = None
+    if args.universe:
+        from .universe import get_universe_registry
+        symbols = get_universe_registry(DataConfig()).get(args.universe).codes
+    ingest_spot_snapshot(symbols=symbols, trade_date=args.date)
+
+
+if __name__ == '__main__':
+    main()
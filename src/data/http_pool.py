@@ -0,0 +1,257 @@
+"""
+进程内共享的 HTTP 连接池 - AKShare / YFinance 请求复用 keep-alive 连接
+
+AKShare 内部直接调用 requests.get/post，每次都会新建 Session 与连接；
+批量扫描 100 只股票就要重复 100 次 TCP + TLS 握手。
+
+本模块维护一个进程级的 HTTPAdapter（urllib3 连接池，按主机分池、线程安全），
+每个线程使用挂载该适配器的 Session，连接在所有线程间复用：
+- pooled_requests(): 在该上下文内（仅当前线程），requests.get/post/request 改走共享连接池；
+- get_yf_session(): 传给 yf.Ticker(session=...) 的当前线程会话（curl_cffi 会话同样每线程一个）。
+
+连接池统计（请求数、新建连接数、复用率、各主机请求数，含 curl_cffi 会话）见 get_http_pool_stats()。
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.config.settings import DataConfig
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledSession(requests.Session):
+    """挂载共享适配器的 Session：补充默认超时并记录各主机请求数"""
+
+    def __init__(self, pool: 'HTTPPool'):
+        super().__init__()
+        self._pool = pool
+        self.mount('http://', pool.adapter)
+        self.mount('https://', pool.adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self._pool.timeout)
+        self._pool._record(url)
+        return super().request(method, url, **kwargs)
+
+    def close(self) -> None:
+        # 连接属于共享适配器，单个会话关闭时不释放
+        pass
+
+
+class HTTPPool:
+    """
+    共享连接池。
+
+    Args:
+        pool_hosts: 缓存连接池的主机数（HTTPAdapter pool_connections）
+        pool_maxsize: 每个主机保持的最大连接数，应不小于批量加载的并发数
+        timeout: 未显式指定时的 (连接超时, 读取超时)（秒）
+    """
+
+    def __init__(self, pool_hosts: int, pool_maxsize: int, timeout):
+        self.timeout = tuple(timeout) if isinstance(timeout, (list, tuple)) else timeout
+        self.adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_maxsize,
+                                   pool_block=False)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._host_requests: Dict[str, int] = {}
+        self._requests = 0
+        # curl_cffi 会话（yfinance）的连接统计：按本地端口识别连接是否复用
+        self._curl_sessions = []
+        self._curl_sockets = set()
+        self._curl_requests = 0
+        self._curl_connections = 0
+
+    def session(self) -> requests.Session:
+        """当前线程的会话（共享同一个连接池）"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = _PooledSession(self)
+        return session
+
+    def curl_session(self):
+        """当前线程的 curl_cffi 会话（yfinance 使用；curl_cffi 会话不能跨线程共享）"""
+        session = getattr(self._local, 'curl_session', None)
+        if session is None:
+            session = self._local.curl_session = _pooled_curl_session_class()(self)
+            with self._lock:
+                self._curl_sessions.append(session)
+        return session
+
+    def _record_curl(self, url: str, response) -> None:
+        """记录 curl_cffi 请求；同一 (服务器地址, 本地端口) 再次出现即为复用的连接"""
+        self._record(url)
+        socket = (getattr(response, 'primary_ip', None), getattr(response, 'local_port', None))
+        with self._lock:
+            self._curl_requests += 1
+            if socket[1] and socket not in self._curl_sockets:
+                self._curl_sockets.add(socket)
+                self._curl_connections += 1
+
+    def _record(self, url: str) -> None:
+        host = urlsplit(url).hostname or ''
+        with self._lock:
+            self._requests += 1
+            self._host_requests[host] = self._host_requests.get(host, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """请求数、新建连接数与连接复用率（取自 urllib3 各主机连接池）"""
+        connections = 0
+        pooled_requests = 0
+        hosts = 0
+        manager = self.adapter.poolmanager
+        for key in list(manager.pools.keys()):
+            host_pool = manager.pools.get(key)
+            if host_pool is None:
+                continue
+            hosts += 1
+            connections += host_pool.num_connections
+            pooled_requests += host_pool.num_requests
+        with self._lock:
+            host_requests = dict(self._host_requests)
+            total = self._requests
+            curl_requests, curl_connections = self._curl_requests, self._curl_connections
+            curl_sessions = len(self._curl_sessions)
+        pooled_requests += curl_requests
+        connections += curl_connections
+        reused = max(0, pooled_requests - connections)
+        return {
+            'requests': total,
+            'connections_opened': connections,
+            'connections_reused': reused,
+            'reuse_rate': round(reused / pooled_requests, 3) if pooled_requests else 0.0,
+            'host_pools': hosts,
+            'host_requests': host_requests,
+            'curl_sessions': curl_sessions,
+            'curl_requests': curl_requests,
+        }
+
+    def close(self) -> None:
+        self.adapter.close()
+        with self._lock:
+            sessions, self._curl_sessions = self._curl_sessions, []
+        for session in sessions:
+            session.close()
+
+
+# 全局单例
+_pool_instance: Optional[HTTPPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_http_pool(data_config: Optional[DataConfig] = None) -> HTTPPool:
+    """获取进程内共享的连接池"""
+    global _pool_instance
+    with _pool_lock:
+        if _pool_instance is None:
+            config = data_config or DataConfig()
+            _pool_instance = HTTPPool(
+                getattr(config, 'http_pool_hosts', DataConfig.http_pool_hosts),
+                getattr(config, 'http_pool_maxsize', DataConfig.http_pool_maxsize),
+                getattr(config, 'http_timeout', DataConfig.http_timeout),
+            )
+        return _pool_instance
+
+
+def get_http_pool_stats() -> Dict[str, Any]:
+    """共享连接池的统计（未创建时为空）"""
+    return _pool_instance.get_stats() if _pool_instance is not None else {}
+
+
+# ----------------------------------------------------------------------
+# requests 模块级函数的线程内重定向
+# ----------------------------------------------------------------------
+
+_scope = threading.local()
+_originals: Dict[str, Any] = {}
+_patch_lock = threading.Lock()
+
+
+def _redirect(name: str):
+    original = _originals[name]
+
+    def call(*args, **kwargs):
+        if not getattr(_scope, 'depth', 0):
+            return original(*args, **kwargs)
+        session = get_http_pool().session()
+        if name == 'request':
+            return session.request(*args, **kwargs)
+        return getattr(session, name)(*args, **kwargs)
+
+    call.__wrapped__ = original
+    call.__name__ = getattr(original, '__name__', name)
+    return call
+
+
+def _install() -> None:
+    """替换 requests.get/post/... 一次；上下文外的调用原样交给原函数"""
+    with _patch_lock:
+        if _originals:
+            return
+        for name in ('request', 'get', 'post', 'head', 'put', 'delete'):
+            _originals[name] = getattr(requests, name)
+        for name in _originals:
+            patched = _redirect(name)
+            setattr(requests, name, patched)
+            setattr(requests.api, name, patched)
+
+
+@contextmanager
+def pooled_requests():
+    """当前线程在该上下文内的 requests.get/post 等调用改走共享连接池（可嵌套）"""
+    if not DataConfig.http_pool_enabled:
+        yield
+        return
+    _install()
+    _scope.depth = getattr(_scope, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _scope.depth -= 1
+
+
+_curl_session_class = None
+
+
+def _pooled_curl_session_class():
+    """curl_cffi Session 子类：请求计入连接池统计（curl_cffi 为可选依赖，首次使用时定义）"""
+    global _curl_session_class
+    with _pool_lock:
+        if _curl_session_class is None:
+            from curl_cffi import requests as curl_requests
+
+            class _PooledCurlSession(curl_requests.Session):
+                def __init__(self, pool: HTTPPool):
+                    super().__init__(impersonate='chrome')
+                    self._pool = pool
+
+                def request(self, method, url, *args, **kwargs):
+                    response = super().request(method, url, *args, **kwargs)
+                    self._pool._record_curl(url, response)
+                    return response
+
+            _curl_session_class = _PooledCurlSession
+        return _curl_session_class
+
+
+def get_yf_session():
+    """
+    yf.Ticker(session=...) 使用的当前线程会话。
+    新版 yfinance 要求 curl_cffi 会话：已安装 curl_cffi 时返回当前线程的 curl_cffi 会话
+    （会话内复用连接），否则返回共享连接池的会话；连接池关闭时返回 None。
+    """
+    if not DataConfig.http_pool_enabled:
+        return None
+    try:
+        import curl_cffi  # noqa: F401
+    except ImportError:
+        return get_http_pool().session()
+    return get_http_pool().curl_session()
+
@@ -1,30 +1,53 @@
 import pandas as pd
-from typing import List, Tuple, Optional
-from datetime import datetime
+from typing import List, Tuple, Optional, Union
+import concurrent.futures
 import logging
 
 from src.config.settings import DataConfig
+from .cache import get_frame_cache, share_frame
+from .resample import daily_range_for, is_resample_period, resample_ohlcv
+from .schema import compact_ohlcv
+from .singleflight import SingleFlight
+from .store import get_ohlcv_store, normalize_symbol, resolve_date_range
+from .trading_calendar import cache_expiry
+from .universe import get_universe_registry
 
 logger = logging.getLogger(__name__)
 
+# 跨实例共享：预测器线程池与 UI 同时加载同一股票时只发起一次上游请求
+_inflight = SingleFlight()
+
 
 class StockDataLoader:
+    # 作为 SmartDataSource 的 'yfinance' 数据源时会回到 SmartDataSource 加载，
+    # 不是独立的上游，不能作为对冲请求的备用数据源
+    markets = ()
+
     def __init__(self, data_config: DataConfig):
         self.data_config = data_config
-        self._cache: dict = {}
-        self._cache_timeout = 300  # 缓存超时（秒）
+        self._cache_timeout = 300  # 未指定过期时间的条目的缓存超时（秒）
 
         # 导入智能数据源（延迟，避免循环导入）
         from .smart_loader import get_smart_loader
         self.smart_loader = get_smart_loader(data_config)
+
+        # 本地回放数据不能混入真实行情：回放时不读写本地日线存储，并使用独立的内存缓存
+        self.replaying = self.smart_loader.replaying
+        # 所有 StockDataLoader 实例共享，按字节预算 LRU 淘汰；
+        # 行情条目按交易日历过期：盘中短 TTL，收盘定型后保留到下一次开盘
+        self._cache = get_frame_cache('stock_loader_replay' if self.replaying else 'stock_loader',
+                                      ttl_seconds=self._cache_timeout)
+        self.store = get_ohlcv_store(data_config)
         logger.info("StockDataLoader 初始化，使用智能数据源")
 
     def get_sz100_tickers(self) -> List[str]:
-        """从本地 CSV 文件获取深证100指数成分股列表"""
+        """深证100指数成分股列表（进程内只读取一次 CSV）"""
+        return self.get_universe_tickers('SZ100')
+
+    def get_universe_tickers(self, name: str) -> List[str]:
+        """按名称获取股票池代码列表（SZ100 / CSI300 / CSI500 / A_SHARE），失败时返回空列表"""
         try:
-            df = pd.read_csv(self.data_config.sz100_stocks_file)
-            tickers = df['code'].tolist()
-            return tickers
+            return get_universe_registry(self.data_config).get(name).tickers
         except Exception as e:
             logger.error(f"读取股票列表失败: {str(e)}")
             return []
@@ -32,11 +55,23 @@ class StockDataLoader:
     def load_stock_data(
         self, stock_code: str, period: str = "daily",
         start_date: Optional[str] = None,
-        end_date: Optional[str] = None
+        end_date: Optional[str] = None,
+        copy: bool = False,
+        adjust: str = "qfq",
+        raise_errors: bool = False
     ) -> Tuple[pd.DataFrame, str]:
         """
         智能加载股票数据（支持多数据源自动切换）。
 
+        Args:
+            period: daily / weekly / monthly / quarterly / '<N>d'，
+                    非日线周期由本地日线合成（见 resample.py）
+            copy: 默认返回与缓存共享数据的视图（Copy-on-Write 下零拷贝）；
+                  需要大量原地修改时传 True 获取独立的深拷贝
+            adjust: 复权方式 qfq / hfq / none；由本地存储按复权因子换算，
+                    未开启本地存储时为数据源默认口径（前复权）
+            raise_errors: 异常时抛出而不是返回空结果（作为 SmartDataSource 的数据源时使用）
+
         Returns:
             (DataFrame, 标准化代码)
         """
@@ -46,34 +81,154 @@ class StockDataLoader:
                 return pd.DataFrame(), ''
 
             # 缓存键包含所有参数，防止不同参数命中同一缓存
-            cache_key = (stock_code, period, start_date, end_date)
-            if cache_key in self._cache:
-                cached_df, cached_time = self._cache[cache_key]
-                age_seconds = (datetime.now() - cached_time).total_seconds()
-                if age_seconds < self._cache_timeout:
-                    logger.debug(f"使用缓存数据: {stock_code} (age={age_seconds:.0f}s)")
-                    return cached_df.copy(), stock_code
+            cache_key = (stock_code, period, start_date, end_date, adjust)
+            cached_df = self._cache.get(cache_key)
+            if cached_df is not None:
+                logger.debug(f"使用缓存数据: {stock_code}")
+                return self._hand_out(cached_df, copy), stock_code
 
-            # 使用智能数据源获取数据
-            df, standardized_code, source = self.smart_loader.load_stock_data(
-                stock_code, period, start_date, end_date
+            flight_key = (normalize_symbol(stock_code), period, start_date, end_date, adjust)
+            (df, standardized_code, source), shared = _inflight.do(
+                flight_key,
+                lambda: self._fetch_stock_data(stock_code, period, start_date, end_date, adjust)
             )
+            if shared:
+                df = share_frame(df)
 
             if df.empty:
                 logger.error(f"无法获取股票 {stock_code} 的数据")
                 return pd.DataFrame(), standardized_code
 
-            # 缓存（带参数化的 key）
-            self._cache[cache_key] = (df.copy(), datetime.now())
+            # 缓存（带参数化的 key），下一根K线可能出现时过期
+            self._cache.put(cache_key, share_frame(df), expires_at=cache_expiry(stock_code))
             logger.info(
                 f"成功获取 {standardized_code} 的历史数据 ({source})，共 {len(df)} 条记录"
             )
+            # 新加载的 df 不与缓存共享可变状态（CoW 视图或缓存持有深拷贝），直接返回
             return df, standardized_code
 
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"加载数据失败: {str(e)}")
             return pd.DataFrame(), ''
 
+    @staticmethod
+    def _hand_out(df: pd.DataFrame, copy: bool) -> pd.DataFrame:
+        """按调用方要求返回深拷贝或共享视图"""
+        return df.copy() if copy else share_frame(df)
+
+    def _fetch_stock_data(
+        self, stock_code: str, period: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        adjust: str = "qfq"
+    ) -> Tuple[pd.DataFrame, str, str]:
+        """缓存未命中时的实际加载路径（由 single-flight 保证同键只执行一次）"""
+        if is_resample_period(period):
+            # 周/月/季/N日线由日线本地合成，不单独请求上游
+            return self._load_resampled(stock_code, period, start_date, end_date, adjust)
+
+        if period == "daily" and self.store.enabled and not self.replaying:
+            # 本地存储优先，只向数据源请求缺失的日期
+            df, standardized_code, source = self._load_through_store(
+                stock_code, start_date, end_date, adjust
+            )
+        else:
+            # 使用智能数据源获取数据
+            df, standardized_code, source = self.smart_loader.load_stock_data(
+                stock_code, period, start_date, end_date
+            )
+
+        # 各数据源及旧版本存储分区的列类型不一致，统一后再进入缓存
+        return compact_ohlcv(df), standardized_code, source
+
+    def _load_resampled(
+        self, stock_code: str, period: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        adjust: str = "qfq"
+    ) -> Tuple[pd.DataFrame, str, str]:
+        """加载覆盖完整周期的日线后合成 period 周期K线，再截取到请求的日期范围"""
+        start, end = resolve_date_range(start_date, end_date)
+        daily_start, daily_end = daily_range_for(period, start, end)
+        daily, standardized_code, source = self._fetch_stock_data(
+            stock_code, "daily", daily_start, daily_end, adjust
+        )
+        bars = resample_ohlcv(daily, period)
+        if not bars.empty:
+            bars = bars[bars['Date'] >= pd.Timestamp(start)].reset_index(drop=True)
+        return bars, standardized_code, f"{source}+resample"
+
+    def _load_through_store(
+        self, stock_code: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        adjust: str = "qfq"
+    ) -> Tuple[pd.DataFrame, str, str]:
+        """
+        从本地存储读取日线，缺失区间通过智能数据源补齐后写回存储。
+
+        Returns:
+            (DataFrame, 标准化代码, 数据来源描述)
+        """
+        symbol = normalize_symbol(stock_code)
+        start, end = resolve_date_range(start_date, end_date)
+        standardized_code = symbol
+        sources = []
+        unstored = []
+
+        for gap_start, gap_end in self.store.missing_ranges(symbol, start, end):
+            gap_df, standardized_code, source = self.smart_loader.load_stock_data(
+                stock_code, "daily", gap_start, gap_end
+            )
+            if source in ('none', 'failed'):
+                logger.warning(f"{stock_code} 缺失区间 {gap_start}-{gap_end} 补齐失败")
+                continue
+            sources.append(source)
+            # 自行落盘的数据源（如 AKShare）已写入存储，避免重复写
+            source_obj = self.smart_loader.data_sources.get(source)
+            if getattr(source_obj, 'persists_to_store', False):
+                continue
+            if self.store.price_basis(symbol) == 'raw':
+                # 不复权存储中不混入其他数据源的复权价格，本次直接返回
+                unstored.append(gap_df)
+            else:
+                self.store.write(symbol, gap_df, gap_start, gap_end)
+
+        if adjust != 'none' and not self.store.can_adjust(symbol):
+            # 不复权存储没有可用的复权因子：不能把不复权价格当作复权价格返回
+            if adjust != 'qfq':
+                logger.warning(f"{stock_code} 没有可用的复权因子，无法提供 {adjust} 日线")
+                return pd.DataFrame(), standardized_code, 'failed'
+            logger.warning(f"{stock_code} 没有可用的复权因子，改为直接请求数据源（前复权）")
+            return self.smart_loader.load_stock_data(stock_code, "daily", start, end)
+
+        df = self.store.read(symbol, start, end, adjust=adjust)
+        if unstored:
+            df = (pd.concat([df] + unstored, ignore_index=True)
+                    .drop_duplicates(subset='Date', keep='first')
+                    .sort_values('Date')
+                    .reset_index(drop=True))
+        source = '+'.join(['store'] + sources) if sources else 'store'
+        return df, standardized_code, source
+
+    def get_cache_stats(self) -> dict:
+        """内存缓存统计（命中/未命中/淘汰/占用字节）"""
+        return self._cache.get_stats()
+
+    def preload_metadata(self, stock_codes: Union[List[str], str], full: bool = False) -> int:
+        """
+        批量预热股票名称等元数据（名称只需一次全市场快照请求）。
+
+        Args:
+            stock_codes: 代码列表、Universe 或股票池名称
+            full: 同时逐只请求行业、上市日期等完整公司信息
+        """
+        if isinstance(stock_codes, str):
+            stock_codes = self.get_universe_tickers(stock_codes)
+        return self.smart_loader.preload_metadata(list(stock_codes), full=full)
+
     def get_market_info(self, stock_code: str) -> dict:
         """获取股票市场信息"""
         try:
@@ -95,27 +250,56 @@ class StockDataLoader:
             }
 
     def batch_load_stock_data(
-        self, stock_codes: List[str],
-        progress_callback=None
+        self, stock_codes: Union[List[str], str],
+        progress_callback=None,
+        max_workers: Optional[int] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
     ) -> List[Tuple[pd.DataFrame, str]]:
         """
-        批量加载多只股票数据。
+        并发批量加载多只股票数据。
+
+        上游请求频率由各数据源共享的令牌桶限流，并发数只决定同时在途的请求数。
 
         Args:
+            stock_codes: 代码列表、Universe 或股票池名称（如 'A_SHARE'，全市场约 5000 只）
             progress_callback: (current, total, message) -> None，
-                               替代直接依赖 st.progress/st.empty
+                               替代直接依赖 st.progress/st.empty；按完成顺序回调
+            max_workers: 最大并发数，默认取 DataConfig.batch_max_workers
+            start_date/end_date: 所有股票共用的日期范围，默认最近一年
+
+        Returns:
+            与 stock_codes 顺序一致的 (DataFrame, 标准化代码) 列表
         """
-        results = []
+        if isinstance(stock_codes, str):
+            stock_codes = self.get_universe_tickers(stock_codes)
+        stock_codes = list(stock_codes)
         total = len(stock_codes)
+        if total == 0:
+            return []
 
-        for i, code in enumerate(stock_codes):
-            if progress_callback:
-                progress_callback(i, total, f"正在处理 {i+1}/{total}: {code}")
+        max_workers = max_workers or getattr(
+            self.data_config, 'batch_max_workers', DataConfig.batch_max_workers
+        )
+        results: List[Tuple[pd.DataFrame, str]] = [(pd.DataFrame(), '')] * total
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(max_workers, total)) as executor:
+            future_to_index = {
+                executor.submit(self.load_stock_data, code, "daily", start_date, end_date): i
+                for i, code in enumerate(stock_codes)
+            }
 
-            df, standardized_code = self.load_stock_data(code)
-            results.append((df, standardized_code))
+            completed = 0
+            for future in concurrent.futures.as_completed(future_to_index):
+                i = future_to_index[future]
+                code = stock_codes[i]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    logger.warning(f"批量加载 {code} 失败: {e}")
 
-            if progress_callback:
-                progress_callback(i + 1, total, f"完成 {i+1}/{total}: {code}")
+                completed += 1
+                if progress_callback:
+                    progress_callback(completed, total, f"完成 {completed}/{total}: {code}")
 
         return results
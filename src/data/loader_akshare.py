@@ -7,25 +7,90 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import streamlit as st
-import time
-from typing import Tuple, Dict, Any, Optional
+import concurrent.futures
+from typing import Tuple, Dict, Any, Optional, List
 import logging
 
+from src.config.settings import DataConfig
+from .adjust import has_ex_right
+from .cache import get_frame_cache, share_frame
+from .cassette import get_cassette
+from .dataset_store import get_dataset_store
+from .http_pool import pooled_requests
+from .metadata import get_metadata_store
+from .minute_store import get_minute_store, latest_market_minute
+from .rate_limiter import get_rate_limiter
+from .resample import resample_minutes
+from .schema import compact_ohlcv
+from .spot import SpotSnapshot
+from .store import get_ohlcv_store, resolve_date_range
+from .trading_calendar import cache_expiry
+
 logger = logging.getLogger(__name__)
 
+# 健康探测使用的股票（平安银行，长期正常交易）
+PROBE_SYMBOL = "000001"
+
+
+def _throttle() -> None:
+    """所有 AKShare 请求共享同一个令牌桶，避免并发批量加载触发上游限流"""
+    get_rate_limiter('akshare').acquire()
+
+
+def _ak_call(name: str, **kwargs):
+    """
+    调用 ak.<name>，经过录制/回放层（见 cassette.py）；
+    只有真实请求上游时才占用限流令牌，请求复用进程内共享的 HTTP 连接池。
+    """
+    def live():
+        _throttle()
+        with pooled_requests():
+            return getattr(ak, name)(**kwargs)
+    return get_cassette().call(f"ak.{name}", kwargs, live)
+
+
+def _fetch_spot() -> pd.DataFrame:
+    return _ak_call('stock_zh_a_spot')
+
+
+# 进程内共享的全市场行情快照：报价 100 只股票只需一次上游请求
+_spot_snapshot = SpotSnapshot(_fetch_spot, ttl_seconds=DataConfig.spot_ttl_seconds)
+
+
+def get_spot_snapshot() -> SpotSnapshot:
+    """获取共享的全市场行情快照"""
+    return _spot_snapshot
+
 
 class AKShareDataLoader:
     """AKShare数据加载器 - 专门为A股市场设计"""
     
+    # 独立提供数据的市场（对冲请求只在同一市场的独立数据源之间进行）
+    markets = ('CN',)
+    
     def __init__(self, config=None):
         self.config = config or {}
-        self.cache = {}  # 简单缓存机制
-        self.cache_timeout = 300  # 5分钟缓存
+        self.cache_timeout = 300  # 未指定过期时间的条目缓存5分钟
+        # 按字节预算 LRU 淘汰；行情条目按交易日历过期（盘中短 TTL，收盘定型后保留到下一次开盘）
+        self.cache = get_frame_cache('akshare', ttl_seconds=self.cache_timeout)
+        # 日线以本地存储为准（不复权价格 + 复权因子表），增量模式只拉取缺失的尾部
+        self.store = get_ohlcv_store(config if isinstance(config, DataConfig) else None)
+        self.incremental = getattr(self.config, 'akshare_incremental', DataConfig.akshare_incremental)
+        self.persists_to_store = self.store.enabled
+        self.minute_store = get_minute_store(config if isinstance(config, DataConfig) else None)
+        # 名称、行业等几乎不变的公司信息持久缓存，避免每次查名称都请求上游
+        self.metadata = get_metadata_store(config if isinstance(config, DataConfig) else None)
+        # 新闻、资金流向、财报：按主键去重的本地增量表
+        self.datasets = get_dataset_store(config if isinstance(config, DataConfig) else None)
         st.info("📊 使用AKShare数据源 - 专门为A股优化，完全免费")
     
     def load_stock_data(self, stock_code: str, period: str = "daily", 
                        start_date: Optional[str] = None, 
-                       end_date: Optional[str] = None) -> Tuple[pd.DataFrame, str]:
+                       end_date: Optional[str] = None,
+                       incremental: Optional[bool] = None,
+                       copy: bool = False,
+                       adjust: str = "qfq",
+                       raise_errors: bool = False) -> Tuple[pd.DataFrame, str]:
         """
         使用AKShare加载A股股票数据
         
@@ -34,6 +99,10 @@ class AKShareDataLoader:
             period: 周期 (daily, weekly, monthly)
             start_date: 开始日期 (YYYYMMDD)
             end_date: 结束日期 (YYYYMMDD)
+            incremental: 是否增量拉取日线（默认取配置 akshare_incremental）
+            copy: 是否返回独立的深拷贝（默认返回与缓存共享数据的视图）
+            adjust: 复权方式 qfq（前复权）/ hfq（后复权）/ none（不复权）
+            raise_errors: 上游异常时抛出而不是返回空结果（SmartDataSource 据此记录失败、驱动熔断）
             
         Returns:
             (DataFrame, 标准化代码)
@@ -43,94 +112,225 @@ class AKShareDataLoader:
             standardized_code = self._standardize_code(stock_code)
             
             # 检查缓存
-            cache_key = f"{standardized_code}_{period}_{start_date}_{end_date}"
-            if cache_key in self.cache:
-                cached_data, timestamp = self.cache[cache_key]
-                if time.time() - timestamp < self.cache_timeout:
-                    st.info(f"📦 使用缓存数据: {standardized_code}")
-                    return cached_data.copy(), standardized_code
+            cache_key = f"{standardized_code}_{period}_{start_date}_{end_date}_{adjust}"
+            cached_data = self.cache.get(cache_key)
+            if cached_data is not None:
+                st.info(f"📦 使用缓存数据: {standardized_code}")
+                return (cached_data.copy() if copy else share_frame(cached_data)), standardized_code
             
             st.info(f"📡 正在通过AKShare获取 {standardized_code} 数据...")
             
             # 设置默认日期范围
-            if not end_date:
-                end_date = datetime.now().strftime('%Y%m%d')
-            if not start_date:
-                start_date = (datetime.now() - timedelta(days=365)).strftime('%Y%m%d')
+            start_date, end_date = resolve_date_range(start_date, end_date)
             
-            # 获取历史数据
-            df = ak.stock_zh_a_hist(
-                symbol=standardized_code,
-                period=period,
-                start_date=start_date,
-                end_date=end_date,
-                adjust="qfq"  # 前复权
-            )
+            if incremental is None:
+                incremental = self.incremental
+            if period == "daily" and self.store.enabled:
+                df = self._load_through_store(standardized_code, start_date, end_date,
+                                              incremental, adjust)
+            else:
+                df = self._fetch_history(standardized_code, period, start_date, end_date, adjust)
             
             if df.empty:
                 st.warning(f"⚠️  未获取到 {standardized_code} 的历史数据")
                 return pd.DataFrame(), standardized_code
             
-            # 标准化数据格式
-            df = self._standardize_akshare_data(df, standardized_code)
-            
             # 缓存数据
-            self.cache[cache_key] = (df.copy(), time.time())
+            self.cache.put(cache_key, share_frame(df), expires_at=cache_expiry(standardized_code))
             
             st.success(f"✅ 成功获取 {standardized_code} 数据: {len(df)} 条记录")
             return df, standardized_code
             
         except Exception as e:
+            if raise_errors:
+                raise
             st.error(f"❌ AKShare数据获取失败: {e}")
             logger.error(f"AKShare数据获取失败: {e}", exc_info=True)
             return pd.DataFrame(), stock_code
     
-    def get_real_time_quote(self, stock_code: str) -> Dict[str, Any]:
+    def _fetch_history(self, symbol: str, period: str,
+                       start_date: str, end_date: str,
+                       adjust: str = "none") -> pd.DataFrame:
+        """向 AKShare 请求 [start_date, end_date] 的K线（adjust: qfq/hfq/none）并标准化"""
+        df = _ak_call(
+            'stock_zh_a_hist',
+            symbol=symbol,
+            period=period,
+            start_date=start_date,
+            end_date=end_date,
+            adjust="" if adjust == "none" else adjust
+        )
+        if df is None or df.empty:
+            return pd.DataFrame()
+        return self._standardize_akshare_data(df, symbol)
+    
+    def _load_through_store(self, symbol: str, start_date: str, end_date: str,
+                            incremental: bool, adjust: str) -> pd.DataFrame:
+        """
+        本地存储模式：存储不复权日线，读取时按复权因子表换算为 adjust 口径。
+        除权除息只需更新因子表，已存储的K线不必重新拉取。
+        没有可用的因子表时，复权请求直接向上游请求 adjust 口径的K线（不写入存储），
+        不把不复权价格当作复权价格返回。
+        """
+        if self.store.price_basis(symbol) != 'raw' and self.store.coverage(symbol):
+            # 旧版本存储的是前复权价格，无法与因子表配合使用
+            logger.info(f"{symbol} 本地数据为旧版前复权格式，清除后重新拉取不复权数据")
+            self.store.clear(symbol)
+        
+        if incremental:
+            new_bars = self._load_incremental(symbol, start_date, end_date)
+        else:
+            new_bars = self._fetch_history(symbol, "daily", start_date, end_date)
+            self.store.write(symbol, new_bars, start_date, end_date, basis='raw')
+        
+        factors_ok = self._refresh_factors(symbol, new_bars)
+        if adjust != 'none' and not factors_ok:
+            logger.warning(f"{symbol} 没有可用的复权因子，改为向上游请求 {adjust} 日线")
+            return self._fetch_history(symbol, "daily", start_date, end_date, adjust)
+        return self.store.read(symbol, start_date, end_date, adjust=adjust)
+    
+    def _load_incremental(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        增量拉取不复权日线并写入存储：
+        1. 本地没有数据时整段拉取；
+        2. 尾部缺口从本地最后一个交易日开始拉取（重叠一根K线，用于判断除权）；
+        3. 头部/中间缺口按缺口原样拉取。
+        
+        Returns:
+            本次新拉取的K线（尾部拉取时包含重叠的那一根）
+        """
+        gaps = self.store.missing_ranges(symbol, start_date, end_date)
+        last_date = self.store.last_date(symbol)
+        fetched = []
+        for gap_start, gap_end in gaps:
+            if last_date is None or pd.Timestamp(gap_start) <= last_date:
+                # 无本地数据，或头部/中间缺口：按缺口原样拉取
+                bars = self._fetch_history(symbol, "daily", gap_start, gap_end)
+            else:
+                bars = self._fetch_history(symbol, "daily", last_date.strftime('%Y%m%d'), gap_end)
+                logger.debug(f"{symbol} 增量拉取 {len(bars)} 条日线 ({gap_start}-{gap_end})")
+            self.store.write(symbol, bars, gap_start, gap_end, basis='raw')
+            fetched.append(bars)
+        
+        fetched = [bars for bars in fetched if not bars.empty]
+        if not fetched:
+            return pd.DataFrame()
+        return pd.concat(fetched, ignore_index=True) if len(fetched) > 1 else fetched[0]
+    
+    def _refresh_factors(self, symbol: str, new_bars: pd.DataFrame) -> bool:
+        """
+        按需更新复权因子表：
+        没有因子表、因子表超过 adjust_factor_ttl_days，或新拉取的K线中出现除权除息时重新请求。
+        
+        Returns:
+            本地因子表是否可用于复权：请求失败时，只有超过有效期（没有新的除权除息）的旧表仍可沿用
+        """
+        age = self.store.factors_age(symbol)
+        ttl = getattr(self.config, 'adjust_factor_ttl_days', DataConfig.adjust_factor_ttl_days) * 86400
+        ex_right = has_ex_right(new_bars) or self.store.factors_expired(symbol)
+        if age is not None and age < ttl and not ex_right:
+            return True
+        
+        try:
+            factors = self._fetch_factors(symbol)
+        except Exception as e:
+            logger.warning(f"{symbol} 复权因子获取失败: {e}")
+            factors = pd.DataFrame()
+        if not factors.empty:
+            logger.info(f"{symbol} 复权因子已更新（{len(factors)} 条）")
+            self.store.write_factors(symbol, factors)
+            return True
+        return age is not None and not ex_right
+    
+    def _fetch_factors(self, symbol: str) -> pd.DataFrame:
+        """请求前复权/后复权因子（新浪），合并为 Date / qfq_factor / hfq_factor"""
+        prefixed = f"{self._exchange_prefix(symbol)}{symbol}"
+        tables = []
+        for adjust in ('qfq', 'hfq'):
+            df = _ak_call('stock_zh_a_daily', symbol=prefixed, adjust=f"{adjust}-factor")
+            if df is None or df.empty:
+                return pd.DataFrame()
+            df = df.rename(columns={'date': 'Date'})
+            df['Date'] = pd.to_datetime(df['Date'])
+            df[f"{adjust}_factor"] = pd.to_numeric(df[f"{adjust}_factor"], errors='coerce')
+            tables.append(df[['Date', f"{adjust}_factor"]].set_index('Date'))
+        
+        # 两张表的除权日相同，个别日期缺失时沿用前一次的因子
+        factors = tables[0].join(tables[1], how='outer').sort_index().ffill().bfill()
+        return factors.reset_index()
+    
+    @staticmethod
+    def _exchange_prefix(symbol: str) -> str:
+        """新浪接口的交易所前缀"""
+        if symbol.startswith('6'):
+            return 'sh'
+        if symbol.startswith(('4', '8')):
+            return 'bj'
+        return 'sz'
+    
+    def get_real_time_quote(self, stock_code: str, raise_errors: bool = False) -> Dict[str, Any]:
         """
         获取实时行情数据
         
         Args:
             stock_code: 股票代码
+            raise_errors: 快照请求失败时抛出异常而不是返回空字典
             
         Returns:
             实时行情字典
         """
-        try:
-            standardized_code = self._standardize_code(stock_code)
-            
-            # 获取所有A股实时行情
-            spot_df = ak.stock_zh_a_spot()
-            
-            # 查找目标股票
-            stock_data = spot_df[spot_df['代码'] == standardized_code]
+        standardized_code = self._standardize_code(stock_code)
+        quotes = self.get_real_time_quotes([standardized_code], raise_errors=raise_errors)
+        if standardized_code not in quotes:
+            st.warning(f"⚠️  未找到 {standardized_code} 的实时行情")
+            return {}
+        return quotes[standardized_code]
+    
+    def get_real_time_quotes(self, stock_codes: List[str],
+                             raise_errors: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取实时行情（共享全市场快照，TTL 内不重复请求上游）
+        
+        Args:
+            stock_codes: 股票代码列表
+            raise_errors: 快照请求失败时抛出异常而不是返回空字典
             
-            if not stock_data.empty:
-                stock = stock_data.iloc[0]
-                return {
-                    'symbol': standardized_code,
-                    'name': stock['名称'],
-                    'latest_price': stock['最新价'],
-                    'change_percent': stock['涨跌幅'],
-                    'change_amount': stock['涨跌额'],
-                    'volume': stock['成交量'],
-                    'amount': stock['成交额'],
-                    'open': stock['今开'],
-                    'high': stock['最高'],
-                    'low': stock['最低'],
-                    'pre_close': stock['昨收'],
-                    'amplitude': stock['振幅'],
-                    'turnover_rate': stock['换手率'],
-                    'pe_ratio': stock['市盈率-动态'],
-                    'pb_ratio': stock['市净率'],
-                    'timestamp': datetime.now().isoformat()
-                }
-            else:
-                st.warning(f"⚠️  未找到 {standardized_code} 的实时行情")
-                return {}
-                
+        Returns:
+            {标准化代码: 实时行情字典}，未找到的代码不包含在结果中
+        """
+        try:
+            rows = _spot_snapshot.lookup(stock_codes)
         except Exception as e:
+            if raise_errors:
+                raise
             st.error(f"❌ 实时行情获取失败: {e}")
             return {}
+        
+        timestamp = datetime.fromtimestamp(_spot_snapshot.fetched_at).isoformat()
+        return {code: self._quote_from_spot_row(code, stock, timestamp)
+                for code, stock in rows.iterrows()}
+    
+    @staticmethod
+    def _quote_from_spot_row(code: str, stock: pd.Series, timestamp: str) -> Dict[str, Any]:
+        """快照行 -> 实时行情字典（快照接口缺少的字段为 None）"""
+        return {
+            'symbol': code,
+            'name': stock.get('名称'),
+            'latest_price': stock.get('最新价'),
+            'change_percent': stock.get('涨跌幅'),
+            'change_amount': stock.get('涨跌额'),
+            'volume': stock.get('成交量'),
+            'amount': stock.get('成交额'),
+            'open': stock.get('今开'),
+            'high': stock.get('最高'),
+            'low': stock.get('最低'),
+            'pre_close': stock.get('昨收'),
+            'amplitude': stock.get('振幅'),
+            'turnover_rate': stock.get('换手率'),
+            'pe_ratio': stock.get('市盈率-动态'),
+            'pb_ratio': stock.get('市净率'),
+            'timestamp': timestamp
+        }
     
     def get_fund_flow(self, stock_code: str, market: str = "SZ") -> pd.DataFrame:
         """
@@ -145,31 +345,74 @@ class AKShareDataLoader:
         """
         try:
             standardized_code = self._standardize_code(stock_code)
-            df = ak.stock_individual_fund_flow(stock=standardized_code, market=market)
-            return df
+            return self.datasets.load(
+                'fund_flow', standardized_code,
+                lambda: _ak_call('stock_individual_fund_flow', stock=standardized_code, market=market)
+            )
         except Exception as e:
             st.warning(f"资金流向数据获取失败: {e}")
             return pd.DataFrame()
     
-    def get_minute_data(self, stock_code: str, period: str = "5") -> pd.DataFrame:
+    def get_minute_data(self, stock_code: str, period: str = "5",
+                        recent_days: int = 5) -> pd.DataFrame:
         """
-        获取分时数据
+        获取分时数据。
+        
+        本地存储开启时，只向上游请求最后一根已存分钟（含）之后的 1 分钟线并追加存储，
+        5/15/30/60 分钟线由 1 分钟线在本地合成。
         
         Args:
             stock_code: 股票代码
             period: 周期 (1, 5, 15, 30, 60)
+            recent_days: 返回最近几个交易日的数据（仅本地存储模式）
             
         Returns:
-            分时数据DataFrame
+            分时数据DataFrame（Time/Open/High/Low/Close/Volume/Amount/Symbol）
         """
         try:
             standardized_code = self._standardize_code(stock_code)
-            df = ak.stock_zh_a_hist_min_em(symbol=standardized_code, period=period, adjust="")
-            return df
+            if not self.minute_store.enabled:
+                return self._fetch_minutes(standardized_code, period)
+
+            last = self.minute_store.last_timestamp(standardized_code)
+            if last is None or last < latest_market_minute():
+                fresh = self._fetch_minutes(
+                    standardized_code, "1",
+                    last.strftime('%Y-%m-%d %H:%M:%S') if last is not None else None
+                )
+                self.minute_store.append(standardized_code, fresh)
+
+            minutes = self.minute_store.read(standardized_code, recent_days=recent_days)
+            return resample_minutes(minutes, int(period))
         except Exception as e:
             st.warning(f"分时数据获取失败: {e}")
             return pd.DataFrame()
     
+    def _fetch_minutes(self, symbol: str, period: str,
+                       start: Optional[str] = None) -> pd.DataFrame:
+        """请求分钟线（start 为 'YYYY-MM-DD HH:MM:SS'，默认接口能提供的全部）并标准化"""
+        kwargs = {'symbol': symbol, 'period': period, 'adjust': ""}
+        if start is not None:
+            kwargs['start_date'] = start
+        df = _ak_call('stock_zh_a_hist_min_em', **kwargs)
+        if df is None or df.empty:
+            return pd.DataFrame()
+        
+        df = df.rename(columns={
+            '时间': 'Time',
+            '开盘': 'Open',
+            '收盘': 'Close',
+            '最高': 'High',
+            '最低': 'Low',
+            '成交量': 'Volume',
+            '成交额': 'Amount'
+        })
+        df = df[[c for c in ['Time', 'Open', 'High', 'Low', 'Close', 'Volume', 'Amount']
+                 if c in df.columns]]
+        df['Time'] = pd.to_datetime(df['Time'])
+        df['Symbol'] = symbol
+        return compact_ohlcv(df.sort_values('Time').reset_index(drop=True))
+    
     def get_company_info(self, stock_code: str) -> Dict[str, Any]:
         """
         获取公司基本信息
@@ -182,18 +425,80 @@ class AKShareDataLoader:
         """
         try:
             standardized_code = self._standardize_code(stock_code)
-            df = ak.stock_individual_info_em(symbol=standardized_code)
+            cached = self.metadata.get(standardized_code, require_info=True)
+            if cached is not None:
+                return dict(cached['info'])
             
-            if not df.empty:
-                info = {}
-                for _, row in df.iterrows():
-                    info[row['item']] = row['value']
-                return info
-            return {}
+            info = self._fetch_company_info(standardized_code)
+            if info:
+                self.metadata.put(standardized_code, info=info)
+            return info
         except Exception as e:
             st.warning(f"公司信息获取失败: {e}")
             return {}
     
+    @staticmethod
+    def _fetch_company_info(symbol: str) -> Dict[str, Any]:
+        """请求个股信息表（item/value 两列）并转为字典"""
+        df = _ak_call('stock_individual_info_em', symbol=symbol)
+        if df is None or df.empty:
+            return {}
+        return dict(zip(df['item'], df['value']))
+    
+    def preload_metadata(self, stock_codes: List[str], full: bool = False,
+                         max_workers: Optional[int] = None) -> int:
+        """
+        批量预热元数据缓存。
+        
+        名称来自全市场行情快照，整个股票池只需一次上游请求；
+        full=True 时再逐只补齐行业、上市日期等完整公司信息（并发、共享限流）。
+        
+        Args:
+            stock_codes: 股票代码列表（或 Universe）
+            full: 是否同时请求完整公司信息
+            max_workers: 补齐公司信息的并发数，默认取 DataConfig.batch_max_workers
+            
+        Returns:
+            本次写入缓存的股票数
+        """
+        codes = [self._standardize_code(code) for code in stock_codes]
+        written = 0
+        
+        missing = self.metadata.missing(codes)
+        if missing:
+            try:
+                rows = _spot_snapshot.lookup(missing)
+                names = {code: {'name': row.get('名称')} for code, row in rows.iterrows()}
+                self.metadata.put_many(names)
+                written += len(names)
+            except Exception as e:
+                logger.warning(f"从行情快照批量获取名称失败: {e}")
+        
+        if full:
+            missing = self.metadata.missing(codes, require_info=True)
+            max_workers = max_workers or getattr(
+                self.config, 'batch_max_workers', DataConfig.batch_max_workers
+            )
+            infos = {}
+            if missing:
+                with concurrent.futures.ThreadPoolExecutor(
+                        max_workers=min(max_workers, len(missing))) as executor:
+                    futures = {executor.submit(self._fetch_company_info, code): code
+                               for code in missing}
+                    for future in concurrent.futures.as_completed(futures):
+                        try:
+                            info = future.result()
+                        except Exception as e:
+                            logger.warning(f"{futures[future]} 公司信息获取失败: {e}")
+                            continue
+                        if info:
+                            infos[futures[future]] = {'info': info}
+            self.metadata.put_many(infos)
+            written += len(infos)
+        
+        logger.info(f"元数据预热完成: {len(codes)} 只股票，写入 {written} 条")
+        return written
+    
     def get_financial_data(self, stock_code: str) -> pd.DataFrame:
         """
         获取财务数据
@@ -206,10 +511,13 @@ class AKShareDataLoader:
         """
         try:
             standardized_code = self._standardize_code(stock_code)
-            df = ak.stock_financial_report_sina(symbol=f"sz{standardized_code}" 
-                                               if standardized_code.startswith('0') 
-                                               else f"sh{standardized_code}")
-            return df
+            return self.datasets.load(
+                'financial_report', standardized_code,
+                lambda: _ak_call('stock_financial_report_sina',
+                                 symbol=f"sz{standardized_code}"
+                                 if standardized_code.startswith('0')
+                                 else f"sh{standardized_code}")
+            )
         except Exception as e:
             st.warning(f"财务数据获取失败: {e}")
             return pd.DataFrame()
@@ -226,8 +534,10 @@ class AKShareDataLoader:
         """
         try:
             standardized_code = self._standardize_code(stock_code)
-            df = ak.stock_news_em(symbol=standardized_code)
-            return df
+            return self.datasets.load(
+                'news', standardized_code,
+                lambda: _ak_call('stock_news_em', symbol=standardized_code)
+            )
         except Exception as e:
             st.warning(f"新闻数据获取失败: {e}")
             return pd.DataFrame()
@@ -302,18 +612,11 @@ class AKShareDataLoader:
         if 'Change' not in df.columns and 'Close' in df.columns:
             df['Change'] = df['Close'].diff()
         
-        # 确保数据类型正确
-        numeric_columns = ['Open', 'Close', 'High', 'Low', 'Volume', 'Amount', 
-                          'Amplitude', 'ChangePercent', 'Change', 'Turnover']
-        
-        for col in numeric_columns:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        # 按日期排序
-        df = df.sort_values('Date').reset_index(drop=True)
+        # 新版接口额外返回的代码列与 Symbol 重复
+        df = df.drop(columns=['股票代码'], errors='ignore')
         
-        return df
+        # 统一为紧凑类型（float32 价格、int64 成交量/额、category 代码），并按日期排序
+        return compact_ohlcv(df)
     
     def get_market_info(self, stock_code: str) -> Dict[str, Any]:
         """
@@ -341,9 +644,13 @@ class AKShareDataLoader:
             market_name = '未知市场'
             suffix = ''
         
-        # 获取公司信息
-        company_info = self.get_company_info(stock_code)
-        name = company_info.get('股票简称', '') or company_info.get('公司名称', '')
+        # 名称优先取元数据缓存（含批量预热写入的名称），没有时请求公司信息
+        cached = self.metadata.get(standardized_code)
+        if cached is not None and cached.get('name'):
+            name = cached['name']
+        else:
+            company_info = self.get_company_info(stock_code)
+            name = company_info.get('股票简称', '') or company_info.get('公司名称', '')
         
         return {
             'symbol': standardized_code,
@@ -357,6 +664,28 @@ class AKShareDataLoader:
             'country': 'China'
         }
     
+    def probe(self) -> bool:
+        """
+        轻量健康探测：只请求一只股票最近几天的日线（不下载全市场快照），
+        不输出 Streamlit 提示，可在后台线程调用。
+        
+        Returns:
+            数据源是否可用
+        """
+        if get_cassette().mode == 'replay':
+            # 回放模式没有上游可探测（探测参数含当天日期，也不会有录制）
+            return True
+        today = datetime.now()
+        df = _ak_call(
+            'stock_zh_a_hist',
+            symbol=PROBE_SYMBOL,
+            period="daily",
+            start_date=(today - timedelta(days=10)).strftime('%Y%m%d'),
+            end_date=today.strftime('%Y%m%d'),
+            adjust=""
+        )
+        return df is not None and not df.empty
+    
     def test_connection(self) -> bool:
         """
         测试AKShare连接
@@ -365,9 +694,7 @@ class AKShareDataLoader:
             连接是否成功
         """
         try:
-            # 尝试获取一只常见股票数据
-            test_df = ak.stock_zh_a_spot()
-            if not test_df.empty:
+            if self.probe():
                 st.success("✅ AKShare连接测试成功")
                 return True
             else:
@@ -0,0 +1,149 @@
+"""
+本地回放数据源 - 无网络环境下的确定性压测与回归
+
+数据来自本地目录::
+
+    {root}/daily/{symbol}/{year}.parquet   # 与 OHLCVStore 相同的 Parquet 日线仓库
+    {root}/quotes.json                     # 可选：{代码: 实时行情字典}
+    {root}/market_info.json                # 可选：{代码: 市场信息字典}
+
+可以直接把 .cache/ohlcv_store 复制为回放目录。未录制实时行情的代码，
+以仓库中最后一根日线合成行情。
+
+可配置注入延迟与错误率，用来复现慢源、故障源下的路由、熔断与对冲行为。
+"""
+
+import json
+import os
+import random
+import threading
+import time
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from src.config.settings import DataConfig
+from .store import OHLCVStore, normalize_symbol, resolve_date_range
+
+logger = logging.getLogger(__name__)
+
+
+class InjectedFailure(ConnectionError):
+    """按配置的错误率注入的模拟故障"""
+
+
+class LocalReplayLoader:
+    """
+    本地回放数据源，接口与 AKShareDataLoader 一致（load_stock_data / get_real_time_quote /
+    get_market_info / probe），由 SmartDataSource 注册为 'local'。
+    """
+
+    # 独立提供数据的市场（None 为回放目录中的任意市场）
+    markets = None
+
+    def __init__(self, config=None):
+        self.config = config or DataConfig()
+        self.root = self._setting('local_source_dir')
+        self.latency_ms = self._setting('local_latency_ms')
+        self.latency_jitter_ms = self._setting('local_latency_jitter_ms')
+        self.error_rate = self._setting('local_error_rate')
+        # 固定种子时，延迟与故障序列可复现
+        self._random = random.Random(self._setting('local_random_seed'))
+        self._random_lock = threading.Lock()
+        # 只读使用：回放数据源不写入
+        self.lake = OHLCVStore(self.root, enabled=True)
+        self._quotes = self._load_json('quotes.json')
+        self._market_info = self._load_json('market_info.json')
+
+        if not os.path.isdir(self.root):
+            logger.warning(f"本地回放目录不存在: {os.path.abspath(self.root)}")
+
+    def _setting(self, name: str):
+        return getattr(self.config, name, getattr(DataConfig, name))
+
+    def _load_json(self, filename: str) -> Dict[str, Dict[str, Any]]:
+        path = os.path.join(self.root, filename)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return {normalize_symbol(k): v for k, v in json.load(f).items()}
+        except Exception as e:
+            logger.warning(f"读取回放文件 {path} 失败: {e}")
+            return {}
+
+    def _simulate_network(self) -> None:
+        """按配置注入延迟与故障"""
+        with self._random_lock:
+            delay = max(0.0, self._random.gauss(self.latency_ms, self.latency_jitter_ms)) / 1000
+            fail = self._random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise InjectedFailure("本地回放数据源注入的模拟故障")
+
+    def load_stock_data(
+        self, stock_code: str, period: str = "daily",
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        raise_errors: bool = True
+    ) -> Tuple[pd.DataFrame, str]:
+        """从本地日线仓库读取（仅支持日线）；注入的故障总是抛出"""
+        symbol = normalize_symbol(stock_code)
+        self._simulate_network()
+        if period != "daily":
+            logger.warning(f"本地回放数据源不支持 {period} 周期")
+            return pd.DataFrame(), symbol
+
+        start, end = resolve_date_range(start_date, end_date)
+        # 与网络数据源一致返回前复权价格（回放目录中有复权因子表时换算）
+        return self.lake.read(symbol, start, end, adjust='qfq'), symbol
+
+    def get_real_time_quote(self, stock_code: str, raise_errors: bool = True) -> Dict[str, Any]:
+        """录制的行情优先，否则用最后一根日线合成"""
+        symbol = normalize_symbol(stock_code)
+        self._simulate_network()
+        if symbol in self._quotes:
+            return dict(self._quotes[symbol])
+
+        last = self.lake.last_date(symbol)
+        if last is None:
+            return {}
+        bars = self.lake.read(symbol, (last - pd.Timedelta(days=30)).strftime('%Y%m%d'),
+                              last.strftime('%Y%m%d'))
+        bar = bars.iloc[-1]
+        pre_close = bars['Close'].iloc[-2] if len(bars) > 1 else None
+        return {
+            'symbol': symbol,
+            'name': self._market_info.get(symbol, {}).get('name'),
+            'latest_price': float(bar['Close']),
+            'change_percent': bar.get('ChangePercent'),
+            'change_amount': bar.get('Change'),
+            'volume': bar.get('Volume'),
+            'amount': bar.get('Amount'),
+            'open': bar.get('Open'),
+            'high': bar.get('High'),
+            'low': bar.get('Low'),
+            'pre_close': pre_close,
+            'amplitude': bar.get('Amplitude'),
+            'turnover_rate': bar.get('Turnover'),
+            'pe_ratio': None,
+            'pb_ratio': None,
+            'timestamp': last.strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+    def get_market_info(self, stock_code: str) -> Dict[str, Any]:
+        """录制的市场信息；未录制时只返回代码"""
+        symbol = normalize_symbol(stock_code)
+        self._simulate_network()
+        if symbol in self._market_info:
+            return dict(self._market_info[symbol])
+        return {'symbol': symbol, 'standardized_symbol': symbol, 'name': ''}
+
+    def probe(self) -> bool:
+        """回放目录存在即视为健康（不注入故障，避免探测把数据源熔断）"""
+        return os.path.isdir(self.root)
+
+    def test_connection(self) -> bool:
+        return self.probe()
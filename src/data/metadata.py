@@ -0,0 +1,181 @@
+"""
+股票元数据持久缓存 - 名称、行业、上市日期等几乎不变的公司信息
+
+所有股票保存在同一个 JSON 文件中::
+
+    {metadata_dir}/company_info.json
+    # {代码: {name, industry, list_date, info, updated_at, info_updated_at}}
+
+条目超过 metadata_ttl_days 后视为过期。名称可以从全市场行情快照批量写入
+（一次请求覆盖整个股票池），完整的公司信息（info）按需逐只请求。
+名称与公司信息分别记录获取时间：只更新名称时沿用的旧 info 不会因此续期。
+"""
+
+import json
+import os
+import threading
+import time
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.config.settings import DataConfig
+from .store import normalize_symbol
+
+logger = logging.getLogger(__name__)
+
+# stock_individual_info_em 的字段名 -> 条目字段
+_INFO_FIELDS = {
+    'name': ('股票简称', '公司名称'),
+    'industry': ('行业',),
+    'list_date': ('上市时间',),
+}
+
+
+def _jsonable(value: Any) -> Any:
+    """AKShare 返回的 numpy 标量转为 JSON 可序列化的 Python 值"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+class MetadataStore:
+    """线程安全的元数据缓存；每次更新整体原子写回磁盘"""
+
+    def __init__(self, path: str, ttl_days: float):
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+        self._hits = 0
+        self._misses = 0
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"读取元数据缓存 {self.path} 失败: {e}")
+            return {}
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"保存元数据缓存失败: {e}")
+
+    def _fresh(self, entry: Optional[Dict[str, Any]], require_info: bool = False) -> bool:
+        """条目未过期；require_info 时按公司信息本身的获取时间判断"""
+        if entry is None:
+            return False
+        if require_info:
+            if not entry.get('info'):
+                return False
+            # 旧版缓存没有 info_updated_at，按整条的更新时间
+            updated_at = entry.get('info_updated_at', entry.get('updated_at', 0))
+        else:
+            updated_at = entry.get('updated_at', 0)
+        return time.time() - updated_at < self.ttl_seconds
+
+    def get(self, symbol: str, require_info: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        未过期的条目，没有时返回 None。
+
+        Args:
+            require_info: 只接受包含完整公司信息（info）的条目
+        """
+        symbol = normalize_symbol(symbol)
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if self._fresh(entry, require_info):
+                self._hits += 1
+                return dict(entry)
+            self._misses += 1
+            return None
+
+    def missing(self, symbols: Iterable[str], require_info: bool = False) -> List[str]:
+        """没有未过期条目的代码（不计入命中统计）"""
+        with self._lock:
+            result = []
+            for symbol in symbols:
+                entry = self._entries.get(normalize_symbol(symbol))
+                if not self._fresh(entry, require_info):
+                    result.append(symbol)
+            return result
+
+    def put(self, symbol: str, name: Optional[str] = None,
+            info: Optional[Dict[str, Any]] = None) -> None:
+        """写入单只股票（名称或完整公司信息）"""
+        self.put_many({symbol: {'name': name, 'info': info}})
+
+    def put_many(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """
+        批量写入，只落盘一次。写入的值应来自本次上游请求，获取时间记为当前时间。
+
+        Args:
+            entries: {代码: {'name': ..., 'info': {...}}}；只有名称时保留已缓存的 info
+                     及其原获取时间（不续期）
+        """
+        if not entries:
+            return
+        now = time.time()
+        with self._lock:
+            for symbol, values in entries.items():
+                symbol = normalize_symbol(symbol)
+                info = values.get('info')
+                entry = {'name': values.get('name') or '', 'updated_at': now}
+                if info:
+                    info = {str(k): _jsonable(v) for k, v in info.items()}
+                    entry['info'] = info
+                    entry['info_updated_at'] = now
+                    for field, items in _INFO_FIELDS.items():
+                        value = next((info[item] for item in items if info.get(item)), None)
+                        if value is not None:
+                            entry[field] = value
+                else:
+                    previous = self._entries.get(symbol, {})
+                    for field in ('info', 'industry', 'list_date'):
+                        if field in previous:
+                            entry[field] = previous[field]
+                    if 'info' in previous:
+                        entry['info_updated_at'] = previous.get('info_updated_at',
+                                                                previous.get('updated_at', 0))
+                self._entries[symbol] = entry
+            self._save()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'with_info': sum(1 for e in self._entries.values() if e.get('info')),
+                'hits': self._hits,
+                'misses': self._misses,
+            }
+
+
+# 全局单例
+_metadata_store_instance: Optional[MetadataStore] = None
+_metadata_store_lock = threading.Lock()
+
+
+def get_metadata_store(data_config: Optional[DataConfig] = None) -> MetadataStore:
+    """获取元数据缓存单例"""
+    global _metadata_store_instance
+    with _metadata_store_lock:
+        if _metadata_store_instance is None:
+            config = data_config or DataConfig()
+            directory = getattr(config, 'metadata_dir', DataConfig.metadata_dir)
+            _metadata_store_instance = MetadataStore(
+                os.path.join(directory, 'company_info.json'),
+                getattr(config, 'metadata_ttl_days', DataConfig.metadata_ttl_days)
+            )
+        return _metadata_store_instance
@@ -0,0 +1,144 @@
+"""
+本地分钟线存储 - 按 代码/交易日 分区的 1 分钟K线
+
+目录结构（与日线仓库共用根目录）::
+
+    {root}/minute/{symbol}/{YYYYMMDD}.parquet
+
+只追加：每次只向上游请求最后一根已存分钟（含）之后的数据，
+最后一根分钟线在盘中可能尚未走完，因此重新请求并覆盖。
+5/15/30/60 分钟线由 1 分钟线在本地合成（见 resample.resample_minutes）。
+"""
+
+import os
+import threading
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+import pandas as pd
+
+from src.config.settings import DataConfig
+from .store import DATE_FORMAT, PARQUET_AVAILABLE, normalize_symbol
+from .trading_calendar import get_trading_calendar
+
+logger = logging.getLogger(__name__)
+
+
+def latest_market_minute(now: Optional[datetime] = None) -> pd.Timestamp:
+    """
+    不晚于 now 的最后一个A股交易分钟（按交易日历）：
+    盘中为当前分钟，午休为 11:30，收盘后为 15:00，开盘前为上一个交易日 15:00。
+    """
+    return get_trading_calendar('CN').latest_market_minute(now)
+
+
+class MinuteStore:
+    """1 分钟K线仓库，读写均按交易日分区"""
+
+    def __init__(self, root: str, enabled: bool = True):
+        self.root = root
+        self.enabled = enabled and PARQUET_AVAILABLE
+        self._lock = threading.RLock()
+
+    def _symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.root, 'minute', symbol)
+
+    def _partition_path(self, symbol: str, day: str) -> str:
+        return os.path.join(self._symbol_dir(symbol), f"{day}.parquet")
+
+    def days(self, symbol: str) -> List[str]:
+        """已存储的交易日（YYYYMMDD，升序）"""
+        symbol_dir = self._symbol_dir(normalize_symbol(symbol))
+        if not self.enabled or not os.path.isdir(symbol_dir):
+            return []
+        return sorted(name.split('.')[0] for name in os.listdir(symbol_dir)
+                      if name.endswith('.parquet') and name.split('.')[0].isdigit())
+
+    def last_timestamp(self, symbol: str) -> Optional[pd.Timestamp]:
+        """最后一根已存分钟线的时间，无数据返回 None"""
+        for day in reversed(self.days(symbol)):
+            df = self.read(symbol, days=[day])
+            if not df.empty:
+                return df['Time'].max()
+        return None
+
+    def read(self, symbol: str, days: Optional[List[str]] = None,
+             recent_days: Optional[int] = None) -> pd.DataFrame:
+        """
+        读取分钟线，按时间升序。
+
+        Args:
+            days: 指定交易日（YYYYMMDD）；默认全部
+            recent_days: 只读取最近 N 个交易日
+        """
+        if not self.enabled:
+            return pd.DataFrame()
+
+        symbol = normalize_symbol(symbol)
+        if days is None:
+            days = self.days(symbol)
+            if recent_days:
+                days = days[-recent_days:]
+
+        frames = []
+        with self._lock:
+            for day in days:
+                path = self._partition_path(symbol, day)
+                if os.path.exists(path):
+                    try:
+                        frames.append(pd.read_parquet(path))
+                    except Exception as e:
+                        logger.warning(f"读取分钟线分区 {path} 失败: {e}")
+
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        return df.sort_values('Time').reset_index(drop=True)
+
+    def append(self, symbol: str, df: pd.DataFrame) -> None:
+        """按交易日合并写入（同一分钟以新数据为准）"""
+        if not self.enabled or df is None or df.empty:
+            return
+
+        symbol = normalize_symbol(symbol)
+        with self._lock:
+            try:
+                os.makedirs(self._symbol_dir(symbol), exist_ok=True)
+                for day, rows in df.groupby(df['Time'].dt.strftime(DATE_FORMAT)):
+                    path = self._partition_path(symbol, day)
+                    if os.path.exists(path):
+                        rows = pd.concat([pd.read_parquet(path), rows], ignore_index=True)
+                    rows = (rows.drop_duplicates(subset='Time', keep='last')
+                                .sort_values('Time')
+                                .reset_index(drop=True))
+                    tmp_path = f"{path}.tmp"
+                    rows.to_parquet(tmp_path, index=False)
+                    os.replace(tmp_path, path)
+            except Exception as e:
+                logger.warning(f"写入分钟线失败 ({symbol}): {e}")
+
+    def clear(self, symbol: str) -> None:
+        if not self.enabled:
+            return
+        symbol_dir = self._symbol_dir(normalize_symbol(symbol))
+        with self._lock:
+            if os.path.isdir(symbol_dir):
+                for name in os.listdir(symbol_dir):
+                    os.remove(os.path.join(symbol_dir, name))
+
+
+# 全局单例
+_minute_store_instance: Optional[MinuteStore] = None
+
+
+def get_minute_store(data_config: Optional[DataConfig] = None) -> MinuteStore:
+    """获取分钟线存储单例（根目录与日线仓库相同）"""
+    global _minute_store_instance
+    if _minute_store_instance is None:
+        config = data_config or DataConfig()
+        _minute_store_instance = MinuteStore(
+            getattr(config, 'store_dir', DataConfig.store_dir),
+            enabled=getattr(config, 'store_enabled', DataConfig.store_enabled)
+        )
+    return _minute_store_instance
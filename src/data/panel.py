@@ -0,0 +1,189 @@
+"""
+多股票对齐面板 - 日期 × 股票 × 字段 的三维数组与有效性掩码
+
+横截面计算（收益率、排名、波动率等）可以在整个股票池上一次向量化完成，
+不必逐只股票循环处理 DataFrame。
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.config.settings import DataConfig
+
+logger = logging.getLogger(__name__)
+
+# 面板默认包含的字段（与 compact_ohlcv 的列名一致）
+PANEL_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume', 'Amount']
+
+
+@dataclass
+class Panel:
+    """
+    对齐后的行情面板。
+
+    arrays[f][t, i] 为字段 f 在第 t 个交易日、第 i 只股票的值（每个字段一个二维数组，
+    可以是内存数组，也可以是只读的内存映射，见 PanelStore）；
+    mask[t, i] 为 False 表示该股票当日无K线（停牌、未上市或数据缺失），对应值为 NaN。
+    价格为 float32；Volume/Amount 同样以 float32 存放，足够横截面分析使用。
+    """
+    dates: pd.DatetimeIndex
+    tickers: List[str]
+    arrays: Dict[str, np.ndarray]  # field -> (len(dates), len(tickers))
+    mask: np.ndarray               # (len(dates), len(tickers))，bool
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self.arrays)
+
+    @property
+    def shape(self):
+        return len(self.dates), len(self.tickers), len(self.arrays)
+
+    @property
+    def values(self) -> np.ndarray:
+        """(日期, 股票, 字段) 三维数组（按需拼接，会复制数据）"""
+        return np.stack([self.arrays[name] for name in self.fields], axis=2)
+
+    def field(self, name: str, ffill: bool = False) -> np.ndarray:
+        """
+        取单个字段的 (日期, 股票) 二维数组。
+
+        Args:
+            ffill: 停牌日用最近一个有效值填充（如计算持仓市值时）
+        """
+        data = self.arrays[name]
+        if not ffill:
+            return data
+        # 对每只股票取"截至当日最后一个有效行"的下标，一次索引完成前向填充
+        rows = np.where(self.mask, np.arange(len(self.dates))[:, None], 0)
+        np.maximum.accumulate(rows, axis=0, out=rows)
+        filled = data[rows, np.arange(len(self.tickers))]
+        filled[~np.logical_or.accumulate(self.mask, axis=0)] = np.nan
+        return filled
+
+    def frame(self, name: str, ffill: bool = False) -> pd.DataFrame:
+        """单个字段的宽表（行为日期，列为股票）"""
+        return pd.DataFrame(self.field(name, ffill), index=self.dates, columns=self.tickers)
+
+    def ticker_frame(self, ticker: str) -> pd.DataFrame:
+        """还原单只股票的日线 DataFrame（只保留有效交易日）"""
+        i = self.tickers.index(ticker)
+        valid = self.mask[:, i]
+        df = pd.DataFrame({name: data[valid, i] for name, data in self.arrays.items()})
+        df.insert(0, 'Date', self.dates[valid])
+        return df
+
+    def returns(self, name: str = 'Close') -> np.ndarray:
+        """
+        日收益率 (日期, 股票)：停牌后复牌首日相对停牌前最后收盘价计算，
+        当日无K线的位置为 NaN，首行为 NaN。
+        """
+        prices = self.field(name, ffill=True)
+        result = np.full(prices.shape, np.nan, dtype=prices.dtype)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result[1:] = prices[1:] / prices[:-1] - 1
+        result[~self.mask] = np.nan
+        return result
+
+    def cross_section(self, name: str, date=None) -> pd.Series:
+        """某一交易日（默认最后一个）全部股票的字段值"""
+        t = -1 if date is None else self.dates.get_loc(pd.Timestamp(date))
+        return pd.Series(self.arrays[name][t], index=self.tickers, name=name)
+
+    @classmethod
+    def from_frames(
+        cls, frames: List[pd.DataFrame], tickers: List[str],
+        fields: Optional[List[str]] = None
+    ) -> 'Panel':
+        """把逐只股票的日线 DataFrame 对齐到所有股票交易日的并集上"""
+        fields = list(fields or PANEL_FIELDS)
+        present = [df for df in frames if df is not None and not df.empty]
+        if present:
+            dates = pd.DatetimeIndex(
+                np.unique(np.concatenate([pd.to_datetime(df['Date']).values for df in present]))
+            )
+        else:
+            dates = pd.DatetimeIndex([])
+
+        arrays = {name: np.full((len(dates), len(tickers)), np.nan, dtype=np.float32)
+                  for name in fields}
+        mask = np.zeros((len(dates), len(tickers)), dtype=bool)
+
+        for i, df in enumerate(frames):
+            if df is None or df.empty:
+                continue
+            rows = dates.get_indexer(pd.to_datetime(df['Date']))
+            for name in fields:
+                if name in df.columns:
+                    arrays[name][rows, i] = pd.to_numeric(df[name], errors='coerce').to_numpy(
+                        dtype=np.float32, na_value=np.nan
+                    )
+            mask[rows, i] = True
+
+        return cls(dates=dates, tickers=list(tickers), arrays=arrays, mask=mask)
+
+
+class PanelLoader:
+    """
+    按股票池批量加载日线并对齐为 Panel。
+    逐只股票的加载走 StockDataLoader（本地存储、缓存、限流与并发均复用）。
+    """
+
+    def __init__(self, data_config: Optional[DataConfig] = None, loader=None):
+        self.data_config = data_config or DataConfig()
+        if loader is None:
+            from .loader import StockDataLoader
+            loader = StockDataLoader(self.data_config)
+        self.loader = loader
+
+    def load(
+        self,
+        tickers: Union[List[str], str, None] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None
+    ) -> Panel:
+        """
+        Args:
+            tickers: 代码列表、Universe 或股票池名称（如 'CSI300'），默认深证100成分股
+            start_date/end_date: 日期范围，默认最近一年
+            fields: 面板字段，默认 PANEL_FIELDS
+
+        Returns:
+            Panel；加载失败的股票保留在 tickers 中，mask 全为 False
+        """
+        if tickers is None:
+            tickers = self.loader.get_sz100_tickers()
+        elif isinstance(tickers, str):
+            tickers = self.loader.get_universe_tickers(tickers)
+        tickers = list(tickers)
+
+        results = self.loader.batch_load_stock_data(
+            tickers, progress_callback=progress_callback,
+            start_date=start_date, end_date=end_date
+        )
+        frames = [df for df, _ in results]
+        panel = Panel.from_frames(frames, tickers, fields)
+
+        missing = [t for t, df in zip(tickers, frames) if df is None or df.empty]
+        if missing:
+            logger.warning(f"面板中 {len(missing)} 只股票无数据: {missing[:10]}")
+        logger.info(f"面板加载完成: {len(panel.dates)} 个交易日 × {len(tickers)} 只股票")
+        return panel
+
+    def build(self, name: str, **kwargs) -> Panel:
+        """加载面板并保存为内存映射文件（供其他进程 open_shared 读取），参数同 load"""
+        from .panel_store import get_panel_store
+        panel = self.load(**kwargs)
+        get_panel_store(self.data_config).save(name, panel)
+        return panel
+
+    def open_shared(self, name: str, fields: Optional[List[str]] = None) -> Optional[Panel]:
+        """只读映射已保存的面板；不存在时返回 None"""
+        from .panel_store import get_panel_store
+        return get_panel_store(self.data_config).open(name, fields)
@@ -0,0 +1,146 @@
+"""
+内存映射的股票池面板 - 多进程共享同一份历史数据
+
+目录结构::
+
+    {root}/{name}/index.json      # 股票代码、交易日、字段列表
+    {root}/{name}/mask.npy        # (日期, 股票) bool
+    {root}/{name}/{field}.npy     # (日期, 股票) float32，每个字段一个文件
+
+读取方以 mmap_mode='r' 打开 .npy 文件，数据不复制到进程内存，
+多个 Streamlit 会话或预计算进程共享操作系统页缓存中的同一份数据。
+"""
+
+import json
+import os
+import shutil
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.config.settings import DataConfig
+from .panel import Panel
+from .store import DATE_FORMAT
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'index.json'
+MASK_FILE = 'mask.npy'
+
+
+class PanelStore:
+    """
+    面板的保存与只读打开。
+    保存时先写入临时目录再整体替换，已打开旧版本的读取方不受影响（旧文件在其关闭前仍然有效）。
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _panel_dir(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(os.path.join(self._panel_dir(name), INDEX_FILE))
+
+    def list_panels(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if '.tmp-' not in name and '.old-' not in name and self.exists(name))
+
+    def save(self, name: str, panel: Panel) -> str:
+        """写入面板，返回面板目录"""
+        target = self._panel_dir(name)
+        tmp_dir = f"{target}.tmp-{os.getpid()}"
+        old_dir = f"{target}.old-{os.getpid()}"
+
+        with self._lock:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(tmp_dir)
+            try:
+                for field in panel.fields:
+                    np.save(os.path.join(tmp_dir, f"{field}.npy"),
+                            np.ascontiguousarray(panel.arrays[field], dtype=np.float32))
+                np.save(os.path.join(tmp_dir, MASK_FILE), np.ascontiguousarray(panel.mask, dtype=bool))
+                with open(os.path.join(tmp_dir, INDEX_FILE), 'w') as f:
+                    json.dump({
+                        'tickers': list(panel.tickers),
+                        'dates': [d.strftime(DATE_FORMAT) for d in panel.dates],
+                        'fields': panel.fields,
+                        'created_at': datetime.now().isoformat(timespec='seconds'),
+                    }, f, ensure_ascii=False)
+
+                # 目录不能原子覆盖非空目录：旧版本先移开，新版本就位后再删除
+                if os.path.exists(target):
+                    os.replace(target, old_dir)
+                os.replace(tmp_dir, target)
+                shutil.rmtree(old_dir, ignore_errors=True)
+            except Exception:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise
+
+        logger.info(f"面板 {name} 已保存: {len(panel.dates)} 个交易日 × {len(panel.tickers)} 只股票")
+        return target
+
+    def open(self, name: str, fields: Optional[List[str]] = None) -> Optional[Panel]:
+        """
+        只读打开面板（各字段为 np.memmap，不复制数据），不存在时返回 None。
+
+        Args:
+            fields: 只映射需要的字段，默认全部
+        """
+        panel_dir = self._panel_dir(name)
+        if not self.exists(name):
+            return None
+
+        with open(os.path.join(panel_dir, INDEX_FILE), 'r') as f:
+            index = json.load(f)
+
+        arrays: Dict[str, np.ndarray] = {
+            field: np.load(os.path.join(panel_dir, f"{field}.npy"), mmap_mode='r')
+            for field in (fields or index['fields'])
+        }
+        return Panel(
+            dates=pd.DatetimeIndex(pd.to_datetime(index['dates'], format=DATE_FORMAT)),
+            tickers=index['tickers'],
+            arrays=arrays,
+            mask=np.load(os.path.join(panel_dir, MASK_FILE), mmap_mode='r'),
+        )
+
+    def info(self, name: str) -> Optional[dict]:
+        """面板的元数据（不映射数组）"""
+        if not self.exists(name):
+            return None
+        with open(os.path.join(self._panel_dir(name), INDEX_FILE), 'r') as f:
+            index = json.load(f)
+        return {
+            'tickers': len(index['tickers']),
+            'dates': len(index['dates']),
+            'start': index['dates'][0] if index['dates'] else None,
+            'end': index['dates'][-1] if index['dates'] else None,
+            'fields': index['fields'],
+            'created_at': index.get('created_at'),
+        }
+
+    def delete(self, name: str) -> None:
+        with self._lock:
+            shutil.rmtree(self._panel_dir(name), ignore_errors=True)
+
+
+# 全局单例
+_panel_store_instance: Optional[PanelStore] = None
+
+
+def get_panel_store(data_config: Optional[DataConfig] = None) -> PanelStore:
+    """获取面板存储单例"""
+    global _panel_store_instance
+    if _panel_store_instance is None:
+        config = data_config or DataConfig()
+        _panel_store_instance = PanelStore(getattr(config, 'panel_dir', DataConfig.panel_dir))
+    return _panel_store_instance
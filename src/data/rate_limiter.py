@@ -0,0 +1,99 @@
+"""
+按数据源共享的令牌桶限流器
+"""
+
+import threading
+import time
+import logging
+from typing import Dict, Any, Optional
+
+from src.config.settings import DataConfig
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    令牌桶：以 rate 个/秒的速度补充令牌，最多积累 capacity 个。
+    acquire 在令牌不足时阻塞等待，所有调用方共享同一个桶。
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate 和 capacity 必须为正数")
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self._acquired = 0
+        self._rejected = 0
+        self._waited_seconds = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        获取令牌。
+
+        Args:
+            tokens: 需要的令牌数
+            timeout: 最长等待秒数，None 表示一直等待
+
+        Returns:
+            是否成功获取（仅在超时时返回 False）
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    self._acquired += 1
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+                if deadline is not None and time.monotonic() + wait > deadline:
+                    self._rejected += 1
+                    return False
+                self._waited_seconds += wait
+            time.sleep(wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """限流统计"""
+        with self._lock:
+            self._refill()
+            return {
+                'rate': self.rate,
+                'capacity': self.capacity,
+                'available_tokens': round(self._tokens, 2),
+                'acquired': self._acquired,
+                'rejected': self._rejected,
+                'waited_seconds': round(self._waited_seconds, 3),
+            }
+
+
+# 进程内按数据源共享的限流器
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(source: str) -> TokenBucket:
+    """获取数据源对应的共享限流器（速率取自 DataConfig.source_rate_limits）"""
+    with _limiters_lock:
+        if source not in _limiters:
+            rate, capacity = DataConfig.source_rate_limits.get(
+                source, DataConfig.default_rate_limit
+            )
+            _limiters[source] = TokenBucket(rate, capacity)
+            logger.debug(f"{source} 限流器: {rate}/s, 突发 {capacity}")
+        return _limiters[source]
+
+
+def get_rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """所有数据源的限流统计"""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.get_stats() for name, limiter in limiters.items()}
@@ -0,0 +1,153 @@
+"""
+日线重采样 - 由本地日线精确合成周线/月线/季线/N日线
+
+规则与交易所（及 AKShare 周/月线接口）一致：
+- 周线按自然周（周一至周日）分组，节假日所在周只包含实际交易日；
+- 每根K线的日期为该周期内最后一个交易日；
+- Open 取首日开盘，Close 取末日收盘，High/Low 取极值，Volume/Amount/Turnover 求和；
+- 涨跌额、涨跌幅、振幅相对上一周期收盘价计算。
+"""
+
+import re
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .schema import compact_ohlcv
+from .store import DATE_FORMAT
+
+# 周期名 -> pandas Period 频率
+CALENDAR_PERIODS = {
+    'weekly': 'W-SUN',
+    'monthly': 'M',
+    'quarterly': 'Q',
+}
+
+_N_DAY_PATTERN = re.compile(r'^(\d+)d$')
+
+_SUM_COLUMNS = ['Volume', 'Amount', 'Turnover']
+
+
+def _n_days(period: str) -> Optional[int]:
+    match = _N_DAY_PATTERN.match(str(period))
+    return int(match.group(1)) if match and int(match.group(1)) > 0 else None
+
+
+def is_resample_period(period: str) -> bool:
+    """period 是否可以由日线合成（weekly / monthly / quarterly / '<N>d'）"""
+    return period in CALENDAR_PERIODS or _n_days(period) is not None
+
+
+def daily_range_for(period: str, start_date: str, end_date: str) -> Tuple[str, str]:
+    """
+    合成 [start_date, end_date] 内的周期K线需要的日线范围：
+    起始日对齐到所在周期的第一天，避免首根K线只包含部分交易日。
+    N 日线从区间内第一个交易日起算，不需要扩展。
+    """
+    start = pd.Timestamp(start_date)
+    if period in CALENDAR_PERIODS:
+        start = start.to_period(CALENDAR_PERIODS[period]).start_time
+    return start.strftime(DATE_FORMAT), pd.Timestamp(end_date).strftime(DATE_FORMAT)
+
+
+def resample_ohlcv(daily: pd.DataFrame, period: str) -> pd.DataFrame:
+    """
+    把按日期升序的日线合成为 period 周期的K线。
+
+    Args:
+        daily: 日线（列名同 compact_ohlcv）
+        period: 'weekly' / 'monthly' / 'quarterly' / '<N>d'（如 '5d'，每 N 个交易日一根）
+    """
+    if not is_resample_period(period):
+        raise ValueError(f"不支持的重采样周期: {period}")
+    if daily is None or daily.empty:
+        return pd.DataFrame()
+
+    daily = daily.sort_values('Date').reset_index(drop=True)
+    dates = pd.to_datetime(daily['Date'])
+    n = _n_days(period)
+    if n is not None:
+        groups = np.arange(len(daily)) // n
+    else:
+        groups = dates.dt.to_period(CALENDAR_PERIODS[period]).to_numpy()
+
+    grouped = daily.groupby(groups, sort=True)
+    agg = {'Date': 'last'}
+    for col, how in (('Open', 'first'), ('High', 'max'), ('Low', 'min'), ('Close', 'last')):
+        if col in daily.columns:
+            agg[col] = how
+    for col in _SUM_COLUMNS:
+        if col in daily.columns:
+            agg[col] = 'sum'
+    if 'Symbol' in daily.columns:
+        agg['Symbol'] = 'first'
+    bars = grouped.agg(agg).reset_index(drop=True)
+
+    if 'Close' in bars.columns:
+        # 首根K线的上一周期收盘价 = 首个交易日的收盘价 - 当日涨跌额
+        first_pre_close = np.nan
+        if 'Change' in daily.columns and pd.notna(daily['Change'].iloc[0]):
+            first_pre_close = float(daily['Close'].iloc[0]) - float(daily['Change'].iloc[0])
+        close = bars['Close'].astype('float64')
+        pre_close = close.shift(1)
+        pre_close.iloc[0] = first_pre_close
+
+        bars['Change'] = close - pre_close
+        bars['ChangePercent'] = bars['Change'] / pre_close * 100
+        if 'High' in bars.columns and 'Low' in bars.columns:
+            bars['Amplitude'] = (bars['High'].astype('float64') - bars['Low'].astype('float64')) / pre_close * 100
+
+    return compact_ohlcv(bars)
+
+
+# A股连续竞价时段：上午 09:30-11:30，下午 13:00-15:00，各 120 分钟
+_MORNING_OPEN = 9 * 60 + 30
+_AFTERNOON_OPEN = 13 * 60
+_SESSION_MINUTES = 120
+MINUTE_PERIODS = (1, 5, 15, 30, 60)
+
+
+def _session_index(times: pd.Series) -> np.ndarray:
+    """
+    分钟线在交易日内的序号：09:31-11:30 -> 1..120，13:01-15:00 -> 121..240。
+    09:30 的集合竞价成交并入第 1 分钟，15:00 之后（盘后固定价格交易）并入最后一分钟。
+    """
+    minutes = (times.dt.hour * 60 + times.dt.minute).to_numpy()
+    index = np.where(
+        minutes <= _MORNING_OPEN + _SESSION_MINUTES,
+        minutes - _MORNING_OPEN,
+        _SESSION_MINUTES + minutes - _AFTERNOON_OPEN
+    )
+    return np.clip(index, 1, 2 * _SESSION_MINUTES)
+
+
+def resample_minutes(minutes: pd.DataFrame, period: int) -> pd.DataFrame:
+    """
+    把 1 分钟线合成为 period 分钟线（5/15/30/60），按交易时段切分：
+    K线不跨越午休，时间标记为该K线最后一分钟（如 60 分钟线为 10:30/11:30/14:00/15:00）。
+    """
+    period = int(period)
+    if period not in MINUTE_PERIODS:
+        raise ValueError(f"不支持的分钟周期: {period}（可选 {MINUTE_PERIODS}）")
+    if minutes is None or minutes.empty or period == 1:
+        return minutes
+
+    minutes = minutes.sort_values('Time').reset_index(drop=True)
+    times = pd.to_datetime(minutes['Time'])
+    bucket_end = (np.ceil(_session_index(times) / period) * period).astype(int)
+    end_minute = np.where(
+        bucket_end <= _SESSION_MINUTES,
+        _MORNING_OPEN + bucket_end,
+        _AFTERNOON_OPEN + bucket_end - _SESSION_MINUTES
+    )
+    labels = times.dt.normalize() + pd.to_timedelta(end_minute, unit='m')
+
+    agg = {}
+    for col, how in (('Open', 'first'), ('High', 'max'), ('Low', 'min'), ('Close', 'last'),
+                     ('Volume', 'sum'), ('Amount', 'sum'), ('Symbol', 'first')):
+        if col in minutes.columns:
+            agg[col] = how
+    bars = minutes.groupby(labels.to_numpy(), sort=True).agg(agg)
+    bars.index.name = 'Time'
+    return bars.reset_index()
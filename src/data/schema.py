@@ -0,0 +1,51 @@
+"""
+行情数据的紧凑列类型 - 各数据源输出统一使用的 OHLCV schema
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 价格与比例类字段：float32 对 A 股价格（两位小数）精度足够
+FLOAT32_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Change',
+                   'ChangePercent', 'Amplitude', 'Turnover']
+# 成交量（股/手）与成交额（元）：整数存储
+INT64_COLUMNS = ['Volume', 'Amount']
+
+
+def compact_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    将行情 DataFrame 转为紧凑类型（幂等，可重复调用）：
+    - Date: datetime64，按日期升序，RangeIndex；
+    - 价格/比例: float32；
+    - Volume/Amount: int64（含缺失值时用可空的 Int64）；
+    - Symbol: category（整列只保存一次代码字符串）。
+
+    下游（图表、预测、风险计算）按列名读取 Date，因此日期保留为列而不是索引。
+    """
+    if df is None or df.empty:
+        return df
+
+    df = df.copy(deep=False)
+    if 'Date' in df.columns:
+        df['Date'] = pd.to_datetime(df['Date'])
+        if not df['Date'].is_monotonic_increasing:
+            df = df.sort_values('Date')
+    df = df.reset_index(drop=True)
+
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns and df[col].dtype != np.float32:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(np.float32)
+
+    for col in INT64_COLUMNS:
+        if col in df.columns and df[col].dtype not in (np.int64, pd.Int64Dtype()):
+            values = pd.to_numeric(df[col], errors='coerce').round()
+            df[col] = values.astype(np.int64) if values.notna().all() else values.astype('Int64')
+
+    if 'Symbol' in df.columns and not isinstance(df['Symbol'].dtype, pd.CategoricalDtype):
+        df['Symbol'] = df['Symbol'].astype('category')
+
+    return df
@@ -0,0 +1,88 @@
+"""
+请求合并（single-flight）- 相同键的并发请求只执行一次，结果共享
+"""
+
+import threading
+import logging
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """一次在途调用"""
+
+    def __init__(self, owner: int):
+        self.owner = owner
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    同一时刻每个键最多只有一个在途调用：
+    第一个调用方（leader）执行 fn，其余调用方等待并共享其结果或异常。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        执行或等待 key 对应的调用。
+
+        同一线程重入同一个键时直接执行 fn（不等待自己，避免死锁）。
+
+        Returns:
+            (结果, 是否为共享结果)；共享结果与 leader 拿到的是同一个对象
+        """
+        me = threading.get_ident()
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call(me)
+                self._calls[key] = call
+                self._executed += 1
+                role = 'leader'
+            elif call.owner == me:
+                role = 'reentrant'
+            else:
+                call.followers += 1
+                self._coalesced += 1
+                role = 'follower'
+
+        # fn 一律在锁外执行：上游请求期间其他键的调用不受阻塞，fn 内嵌套 do() 也不会死锁
+        if role == 'reentrant':
+            return fn(), False
+
+        if role == 'follower':
+            logger.debug(f"合并在途请求: {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, False
+
+    def get_stats(self) -> Dict[str, int]:
+        """合并统计：executed 为实际执行次数，coalesced 为被合并的请求数"""
+        with self._lock:
+            return {
+                'executed': self._executed,
+                'coalesced': self._coalesced,
+                'in_flight': len(self._calls),
+            }
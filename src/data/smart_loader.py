@@ -3,11 +3,20 @@
 """
 
 import pandas as pd
-from typing import Tuple, Dict, Any, Optional
+from typing import Tuple, Dict, Any, Optional, List, Set, Hashable, Callable
+import concurrent.futures
 import logging
+import threading
 import time
 from datetime import datetime
 
+from src.config.settings import DataConfig
+from .cache import share_frame
+from .singleflight import SingleFlight
+from .source_health import CircuitBreaker, SourceStats
+from .store import normalize_symbol
+from .trading_calendar import market_of
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,15 +33,45 @@ class SmartDataSource:
         self.source_status = {}
         self.initialized = False
         self._init_timestamp: Optional[datetime] = None
+        self._init_lock = threading.RLock()  # 并发批量加载时避免重复初始化
+        self._inflight = SingleFlight()
+        self._status_lock = threading.Lock()
+        self._stats: Dict[str, SourceStats] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._probe_stop: Optional[threading.Event] = None
+        self._last_probe: Optional[datetime] = None
+        self._local = threading.local()
+        self._hedge_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._hedge_lock = threading.Lock()
+        self._hedge_stats = self._empty_hedge_stats()
 
     def reset(self) -> None:
         """重置实例状态，允许重新初始化（测试或多实例场景）"""
         logger.info("重置 SmartDataSource 实例")
+        if self._probe_stop is not None:
+            self._probe_stop.set()
+            self._probe_stop = None
         self.data_sources = {}
         self.source_priority = []
         self.source_status = {}
         self.initialized = False
         self._init_timestamp = None
+        self._stats = {}
+        self._breakers = {}
+        self._last_probe = None
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+            self._hedge_executor = None
+        self._hedge_stats = self._empty_hedge_stats()
+
+    def _setting(self, name: str):
+        """读取配置项（config 可能是 DataConfig 实例或空 dict）"""
+        return getattr(self.config, name, getattr(DataConfig, name))
+
+    @property
+    def replaying(self) -> bool:
+        """是否启用了本地回放数据源"""
+        return bool(self._setting('local_source_enabled') or self._setting('local_source_exclusive'))
 
     def initialize_sources(self) -> None:
         """初始化所有数据源"""
@@ -40,28 +79,24 @@ class SmartDataSource:
             logger.debug("数据源已初始化，跳过")
             return
 
+        with self._init_lock:
+            if not self.initialized:
+                self._initialize_sources()
+
+    def _initialize_sources(self) -> None:
+        """加载各数据源并测试连接（调用方已持有初始化锁）"""
         try:
-            # 尝试导入 AKShare 数据源
-            try:
-                from .loader_akshare import AKShareDataLoader
-                akshare_loader = AKShareDataLoader(self.config)
-                self.data_sources['akshare'] = akshare_loader
-                self.source_priority.append('akshare')
-                logger.info("AKShare 数据源已加载（A股优化）")
-            except ImportError as e:
-                logger.warning(f"AKShare 数据源加载失败: {e}")
-
-            # 尝试导入 YFinance 数据源
-            try:
-                from .loader import StockDataLoader
-                yfinance_loader = StockDataLoader(self.config)
-                self.data_sources['yfinance'] = yfinance_loader
-                self.source_priority.append('yfinance')
-                logger.info("YFinance 数据源已加载（全球市场）")
-            except ImportError as e:
-                logger.warning(f"YFinance 数据源加载失败: {e}")
+            # 本地回放数据源（离线压测/回归）
+            if self.replaying:
+                from .loader_local import LocalReplayLoader
+                self.data_sources['local'] = LocalReplayLoader(self.config)
+                self.source_priority.append('local')
+                logger.info(f"本地回放数据源已加载: {self._setting('local_source_dir')}")
 
-            self._test_sources()
+            if not self._setting('local_source_exclusive'):
+                self._initialize_network_sources()
+
+            self._start_health_monitor()
 
             if not self.data_sources:
                 logger.error("没有可用的数据源，请检查依赖安装")
@@ -73,40 +108,108 @@ class SmartDataSource:
         except Exception as e:
             logger.error(f"数据源初始化失败: {e}", exc_info=True)
 
-    def _test_sources(self) -> None:
-        """测试所有数据源连接（轻量探测，不阻塞）"""
-        for source_name, source in self.data_sources.items():
-            try:
-                # 优先使用数据源自身的 test_connection（若支持）
-                if hasattr(source, 'test_connection'):
-                    try:
-                        healthy = source.test_connection()
-                        self.source_status[source_name] = 'healthy' if healthy else 'unhealthy'
-                        logger.info(f"{source_name} 连接测试: {'healthy' if healthy else 'unhealthy'}")
-                        continue
-                    except Exception:
-                        pass  # 继续走默认逻辑
-
-                # 默认：对已有 data_sources 设为 healthy（已通过 ImportError 过滤）
-                self.source_status[source_name] = 'healthy'
-                logger.debug(f"{source_name} 未提供 test_connection，默认 healthy")
+    def _initialize_network_sources(self) -> None:
+        """加载 AKShare 与 YFinance 数据源"""
+        # 尝试导入 AKShare 数据源
+        try:
+            from .loader_akshare import AKShareDataLoader
+            akshare_loader = AKShareDataLoader(self.config)
+            self.data_sources['akshare'] = akshare_loader
+            self.source_priority.append('akshare')
+            logger.info("AKShare 数据源已加载（A股优化）")
+        except ImportError as e:
+            logger.warning(f"AKShare 数据源加载失败: {e}")
+
+        # 尝试导入 YFinance 数据源
+        try:
+            from .loader import StockDataLoader
+            yfinance_loader = StockDataLoader(self.config)
+            self.data_sources['yfinance'] = yfinance_loader
+            self.source_priority.append('yfinance')
+            logger.info("YFinance 数据源已加载（全球市场）")
+        except ImportError as e:
+            logger.warning(f"YFinance 数据源加载失败: {e}")
+
+    def _start_health_monitor(self) -> None:
+        """
+        启动健康监测，不在初始化路径上做任何网络请求：
+        所有数据源先乐观视为 healthy，由后台线程定时轻量探测，
+        并根据真实请求结果被动更新。
+        """
+        with self._status_lock:
+            for source_name in self.data_sources:
+                self._stats.setdefault(source_name, SourceStats(self._setting('latency_window')))
+                self._breakers.setdefault(source_name, CircuitBreaker(
+                    self._setting('unhealthy_after_failures'),
+                    self._setting('circuit_reset_timeout')
+                ))
+                self.source_status.setdefault(source_name, 'healthy')
+
+        if not self._setting('health_probe_enabled'):
+            return
 
+        self._probe_stop = threading.Event()
+        threading.Thread(
+            target=self._probe_loop,
+            args=(self._probe_stop, self._setting('health_probe_interval')),
+            name='smart-loader-health-probe',
+            daemon=True
+        ).start()
+
+    def _probe_loop(self, stop_event: threading.Event, interval: float) -> None:
+        """后台探测循环，reset() 时退出"""
+        while not stop_event.is_set():
+            self.probe_sources()
+            stop_event.wait(interval)
+
+    def probe_sources(self) -> None:
+        """主动探测所有提供 probe() 的数据源，结果与真实请求一样计入熔断器"""
+        for source_name, source in list(self.data_sources.items()):
+            probe = getattr(source, 'probe', None)
+            if probe is None:
+                continue
+            try:
+                healthy = bool(probe())
             except Exception as e:
-                self.source_status[source_name] = 'failed'
-                logger.error(f"{source_name} 连接测试失败: {e}")
+                logger.warning(f"{source_name} 健康探测失败: {e}")
+                healthy = False
 
-    def get_best_source(self, stock_code: str) -> Optional[str]:
-        """
-        根据股票代码选择最佳数据源。
+            # 与真实请求走同一路径：单次探测失败只计一次失败，达到阈值才熔断
+            self.record_outcome(source_name, healthy, reason='健康探测')
+        self._last_probe = datetime.now()
 
-        A股（0/3/6开头6位代码）优先 AKShare（国内数据更完整），
-        美股/港股等使用 YFinance。
+    def record_outcome(self, source_name: str, success: bool,
+                       latency: Optional[float] = None, reason: str = '请求结果') -> None:
+        """
+        根据真实请求结果被动更新健康状态：
+        记录延迟样本并驱动熔断器，连续失败达到阈值后熔断（unhealthy），
+        熔断超时后半开放行一个试探请求，成功即恢复 healthy。
+        """
+        if source_name not in self._breakers:
+            return
+        if latency is not None:
+            self._stats[source_name].record(latency, success)
+        if success:
+            self._breakers[source_name].record_success()
+        else:
+            self._breakers[source_name].record_failure()
+        self._refresh_status(source_name, reason=reason)
+
+    def _refresh_status(self, source_name: str, reason: str) -> None:
+        """熔断器状态 -> source_status（open/half_open 均视为 unhealthy）"""
+        state = self._breakers[source_name].state
+        current = 'healthy' if state == CircuitBreaker.CLOSED else 'unhealthy'
+        with self._status_lock:
+            previous = self.source_status.get(source_name)
+            self.source_status[source_name] = current
+        if previous != current:
+            logger.info(f"{source_name} 状态变化（{reason}）: {previous} -> {current}")
+
+    def _static_order(self, stock_code: str) -> List[str]:
+        """
+        静态优先级：A股（0/3/6开头6位代码）优先 AKShare（国内数据更完整），
+        美股/港股等优先 YFinance，其余按加载顺序。
         """
-        self.initialize_sources()
-
-        if not self.data_sources:
-            return None
-
         code = str(stock_code).strip().upper()
 
         # A股判断逻辑
@@ -117,30 +220,46 @@ class SmartDataSource:
                 if clean_code.startswith(('0', '3', '6')):
                     is_a_share = True
 
-        if is_a_share:
-            # A股：优先 AKShare，备用 YFinance
-            if 'akshare' in self.data_sources and self.source_status.get('akshare') == 'healthy':
-                return 'akshare'
-            elif 'yfinance' in self.data_sources and self.source_status.get('yfinance') == 'healthy':
-                return 'yfinance'
-        else:
-            # 非A股：优先 YFinance，备用 AKShare
-            if 'yfinance' in self.data_sources and self.source_status.get('yfinance') == 'healthy':
-                return 'yfinance'
-            elif 'akshare' in self.data_sources and self.source_status.get('akshare') == 'healthy':
-                return 'akshare'
+        preferred = ['akshare', 'yfinance'] if is_a_share else ['yfinance', 'akshare']
+        order = [name for name in preferred if name in self.data_sources]
+        order += [name for name in self.source_priority
+                  if name in self.data_sources and name not in order]
+        return order
 
-        # 按优先级返回第一个健康数据源
-        for source_name in self.source_priority:
-            if source_name in self.data_sources and self.source_status.get(source_name) == 'healthy':
-                return source_name
+    def rank_sources(self, stock_code: str) -> List[str]:
+        """
+        按路由优先级排列数据源：
+        1. 熔断打开的数据源排除在外；
+        2. 所有候选都有足够延迟样本时，按期望代价（p50 / 成功率）升序；
+        3. 否则按静态优先级。
+        所有数据源都已熔断时返回静态顺序（调用方会被熔断器快速拒绝）。
+        """
+        self.initialize_sources()
+
+        order = self._static_order(stock_code)
+        available = [name for name in order
+                     if name not in self._breakers or self._breakers[name].is_available()]
+        if not available:
+            return order
+
+        min_samples = self._setting('routing_min_samples')
+        if all(name in self._stats and self._stats[name].sample_count >= min_samples
+               for name in available):
+            def cost(name: str) -> float:
+                expected = self._stats[name].expected_latency()
+                return expected if expected is not None else float('inf')
+            available.sort(key=cost)  # 稳定排序：代价相同保持静态优先级
+        return available
+
+    def get_best_source(self, stock_code: str) -> Optional[str]:
+        """根据股票代码、延迟统计和熔断状态选择最佳数据源"""
+        self.initialize_sources()
 
-        # 返回任意可用数据源
-        for source_name in self.source_priority:
-            if source_name in self.data_sources:
-                return source_name
+        if not self.data_sources:
+            return None
 
-        return None
+        ranked = self.rank_sources(stock_code)
+        return ranked[0] if ranked else None
 
     def load_stock_data(
         self, stock_code: str, period: str = "daily",
@@ -149,88 +268,291 @@ class SmartDataSource:
     ) -> Tuple[pd.DataFrame, str, str]:
         """
         智能加载股票数据。
+        相同 (代码, 周期, 日期范围) 的并发请求合并为一次上游请求。
 
         Returns:
             (DataFrame, 标准化代码, 使用的数据源)
         """
+        flight_key = (str(stock_code).strip().upper(), period, start_date, end_date)
+        if flight_key in self._resolving_keys():
+            # yfinance 数据源（StockDataLoader）会回调本方法，同键重入直接返回空结果
+            logger.debug(f"检测到 {stock_code} 的递归加载，跳过")
+            return pd.DataFrame(), stock_code, 'none'
+
+        (df, std_code, source), shared = self._inflight.do(
+            flight_key,
+            lambda: self._resolve(
+                flight_key, self._load_stock_data,
+                flight_key, stock_code, period, start_date, end_date
+            )
+        )
+        if shared:
+            df = share_frame(df)
+        return df, std_code, source
+
+    def _resolving_keys(self) -> Set[Hashable]:
+        """当前线程正在（直接或代为）解析的请求键"""
+        keys = getattr(self._local, 'keys', None)
+        if keys is None:
+            keys = self._local.keys = set()
+        return keys
+
+    def _resolve(self, flight_key: Hashable, fn: Callable, *args):
+        """在当前线程上标记 flight_key 正在解析后执行 fn（对冲线程同样需要标记）"""
+        keys = self._resolving_keys()
+        keys.add(flight_key)
+        try:
+            return fn(*args)
+        finally:
+            keys.discard(flight_key)
+
+    def _call_source(
+        self, source_name: str, stock_code: str, period: str,
+        start_date: Optional[str], end_date: Optional[str]
+    ) -> Tuple[pd.DataFrame, str]:
+        """
+        调用单个数据源并记录延迟与结果，异常转为空结果。
+        数据源以 raise_errors=True 调用，上游异常（含超时）不会被吞成空结果，计为失败；
+        正常返回的空结果（如区间内停牌）计为成功。
+        """
+        started = time.monotonic()
+        try:
+            df, std_code = self.data_sources[source_name].load_stock_data(
+                stock_code, period, start_date, end_date, raise_errors=True
+            )
+            self.record_outcome(source_name, True, time.monotonic() - started)
+            return df, std_code
+        except Exception as e:
+            self.record_outcome(source_name, False, time.monotonic() - started)
+            logger.warning(f"{source_name} 数据获取失败: {e}")
+            return pd.DataFrame(), stock_code
+
+    def _load_stock_data(
+        self, flight_key: Hashable, stock_code: str, period: str,
+        start_date: Optional[str],
+        end_date: Optional[str]
+    ) -> Tuple[pd.DataFrame, str, str]:
+        """按首选数据源加载（可选对冲），失败或为空时依次尝试备用数据源"""
         self.initialize_sources()
 
         if not self.data_sources:
             logger.error("没有可用的数据源")
             return pd.DataFrame(), stock_code, 'none'
 
-        best_source = self.get_best_source(stock_code)
-
-        if not best_source:
+        ranked = self.rank_sources(stock_code)
+        if not ranked:
             logger.error("无法找到合适的数据源")
             return pd.DataFrame(), stock_code, 'none'
 
-        logger.info(f"使用 {best_source} 数据源加载 {stock_code}")
-
-        # 尝试首选数据源
-        source = self.data_sources[best_source]
-        try:
-            if hasattr(source, 'load_stock_data'):
-                df, std_code = source.load_stock_data(stock_code, period, start_date, end_date)
-                if not df.empty:
-                    logger.info(f"{best_source} 数据获取成功: {len(df)} 条记录")
-                    return df, std_code, best_source
-                else:
-                    logger.warning(f"{best_source} 返回空数据，尝试备用数据源...")
-            else:
-                logger.warning(f"{best_source} 不支持 load_stock_data 方法")
-        except Exception as e:
-            logger.warning(f"{best_source} 数据获取失败: {e}")
-
-        # 备用数据源
-        for source_name, alt_source in self.data_sources.items():
-            if source_name == best_source:
+        tried: Set[str] = set()
+        if self._setting('hedge_enabled'):
+            result, tried = self._load_hedged(
+                flight_key, ranked, stock_code, period, start_date, end_date
+            )
+            if result is not None:
+                return result
+
+        # 按路由优先级依次尝试，熔断中的数据源直接跳过
+        for i, source_name in enumerate(ranked):
+            if source_name in tried:
+                continue
+            source = self.data_sources[source_name]
+            if not hasattr(source, 'load_stock_data'):
+                logger.warning(f"{source_name} 不支持 load_stock_data 方法")
+                continue
+            breaker = self._breakers.get(source_name)
+            if breaker is not None and not breaker.allow_request():
+                logger.debug(f"{source_name} 熔断中，跳过")
                 continue
 
-            if self.source_status.get(source_name) == 'healthy':
+            if i == 0:
+                logger.info(f"使用 {source_name} 数据源加载 {stock_code}")
+            else:
                 logger.info(f"尝试备用数据源: {source_name}")
-                try:
-                    if hasattr(alt_source, 'load_stock_data'):
-                        df, std_code = alt_source.load_stock_data(stock_code, period, start_date, end_date)
-                        if not df.empty:
-                            logger.info(f"{source_name} 备用数据源成功: {len(df)} 条记录")
-                            return df, std_code, source_name
-                except Exception as e:
-                    logger.warning(f"{source_name} 备用数据源也失败: {e}")
+
+            df, std_code = self._call_source(source_name, stock_code, period, start_date, end_date)
+            if not df.empty:
+                logger.info(f"{source_name} 数据获取成功: {len(df)} 条记录")
+                return df, std_code, source_name
+            logger.warning(f"{source_name} 返回空数据，尝试下一个数据源...")
 
         logger.error("所有数据源均失败")
         return pd.DataFrame(), stock_code, 'failed'
 
-    def get_real_time_quote(self, stock_code: str) -> Tuple[Dict[str, Any], str]:
-        """获取实时行情"""
-        self.initialize_sources()
+    # ------------------------------------------------------------------
+    # 对冲请求
+    # ------------------------------------------------------------------
 
-        best_source = self.get_best_source(stock_code)
-        if not best_source:
-            return {}, 'none'
+    @staticmethod
+    def _empty_hedge_stats() -> Dict[str, int]:
+        return {'eligible': 0, 'hedged': 0, 'primary_wins': 0, 'backup_wins': 0, 'both_failed': 0}
 
-        source = self.data_sources[best_source]
+    def _count_hedge(self, field: str) -> None:
+        with self._hedge_lock:
+            self._hedge_stats[field] += 1
+
+    def _serves_independently(self, source_name: str, stock_code: str) -> bool:
+        """
+        数据源是否独立提供该市场的数据（类属性 markets：None 为所有市场，
+        空元组为不独立请求上游，如回到本类加载的 StockDataLoader）
+        """
+        markets = getattr(self.data_sources[source_name], 'markets', ())
+        return markets is None or market_of(stock_code) in markets
+
+    def _get_hedge_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._hedge_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self._setting('hedge_max_workers'),
+                    thread_name_prefix='smart-loader-hedge'
+                )
+            return self._hedge_executor
+
+    def _load_hedged(
+        self, flight_key: Hashable, ranked: List[str], stock_code: str, period: str,
+        start_date: Optional[str], end_date: Optional[str]
+    ) -> Tuple[Optional[Tuple[pd.DataFrame, str, str]], Set[str]]:
+        """
+        对冲请求：首选数据源在其 p95 延迟的 hedge_p95_fraction 倍时间内未返回，
+        则同时向备用数据源发出请求，取先返回的非空结果。
+        落败的请求继续在后台完成，其延迟与结果仍计入统计。
+
+        只在独立提供该市场数据的数据源之间对冲：回到本类加载的数据源或不覆盖该市场的数据源
+        只会重复请求首选上游，不作为备用。
+
+        Returns:
+            (结果或 None, 已尝试过的数据源)；首选样本不足或没有独立的备用数据源时不对冲，
+            返回 (None, 空集)
+        """
+        candidates = [
+            name for name in ranked
+            if hasattr(self.data_sources[name], 'load_stock_data')
+            and (name not in self._breakers or self._breakers[name].is_available())
+            and self._serves_independently(name, stock_code)
+        ]
+        if len(candidates) < 2:
+            return None, set()
+
+        primary, backup = candidates[0], candidates[1]
+        stats = self._stats.get(primary)
+        p95 = stats.percentile(95) if stats is not None else None
+        if p95 is None or stats.sample_count < self._setting('routing_min_samples'):
+            return None, set()
+        if primary in self._breakers and not self._breakers[primary].allow_request():
+            return None, set()
+
+        self._count_hedge('eligible')
+        executor = self._get_hedge_executor()
+        args = (stock_code, period, start_date, end_date)
+        futures = {
+            executor.submit(self._resolve, flight_key, self._call_source, primary, *args): primary
+        }
+        done, _ = concurrent.futures.wait(futures, timeout=p95 * self._setting('hedge_p95_fraction'))
+
+        if not done and (backup not in self._breakers or self._breakers[backup].allow_request()):
+            logger.info(f"{primary} 超过 {p95 * self._setting('hedge_p95_fraction'):.2f}s 未返回，对冲请求 {backup}")
+            futures[executor.submit(self._resolve, flight_key, self._call_source, backup, *args)] = backup
+            self._count_hedge('hedged')
+
+        pending = set(futures)
+        while pending:
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                source_name = futures[future]
+                df, std_code = future.result()
+                if df.empty:
+                    continue
+                if len(futures) > 1:
+                    self._count_hedge('primary_wins' if source_name == primary else 'backup_wins')
+                logger.info(f"{source_name} 数据获取成功: {len(df)} 条记录")
+                return (df, std_code, source_name), set(futures.values())
+
+        if len(futures) > 1:
+            self._count_hedge('both_failed')
+        return None, set(futures.values())
+
+    def get_hedge_stats(self) -> Dict[str, Any]:
+        """对冲统计：hedge_rate = 发出对冲的比例，backup_win_rate = 对冲后备用源胜出的比例"""
+        with self._hedge_lock:
+            stats: Dict[str, Any] = dict(self._hedge_stats)
+        stats['hedge_rate'] = round(stats['hedged'] / stats['eligible'], 3) if stats['eligible'] else 0.0
+        stats['backup_win_rate'] = round(stats['backup_wins'] / stats['hedged'], 3) if stats['hedged'] else 0.0
+        return stats
+
+    def _call_quote(self, source_name: str, stock_code: str) -> Dict[str, Any]:
+        """调用单个数据源的实时行情并记录延迟与结果（与 _call_source 相同：只有异常计为失败）"""
+        started = time.monotonic()
         try:
-            if hasattr(source, 'get_real_time_quote'):
-                quote = source.get_real_time_quote(stock_code)
-                if quote:
-                    return quote, best_source
+            quote = self.data_sources[source_name].get_real_time_quote(stock_code, raise_errors=True)
+            self.record_outcome(source_name, True, time.monotonic() - started)
+            return quote
         except Exception as e:
-            logger.warning(f"实时行情获取失败: {e}")
+            self.record_outcome(source_name, False, time.monotonic() - started)
+            logger.warning(f"{source_name} 实时行情获取失败: {e}")
+            return {}
 
-        for source_name, alt_source in self.data_sources.items():
-            if source_name == best_source:
+    def get_real_time_quote(self, stock_code: str) -> Tuple[Dict[str, Any], str]:
+        """获取实时行情：按路由优先级依次尝试，熔断中的数据源直接跳过"""
+        self.initialize_sources()
+
+        if not self.data_sources:
+            return {}, 'none'
+
+        for source_name in self.rank_sources(stock_code):
+            if not hasattr(self.data_sources[source_name], 'get_real_time_quote'):
                 continue
-            try:
-                if hasattr(alt_source, 'get_real_time_quote'):
-                    quote = alt_source.get_real_time_quote(stock_code)
-                    if quote:
-                        return quote, source_name
-            except Exception:
+            breaker = self._breakers.get(source_name)
+            if breaker is not None and not breaker.allow_request():
                 continue
+            quote = self._call_quote(source_name, stock_code)
+            if quote:
+                return quote, source_name
 
         return {}, 'failed'
 
+    def get_real_time_quotes(self, stock_codes: List[str]) -> Dict[str, Tuple[Dict[str, Any], str]]:
+        """
+        批量获取实时行情。
+        按首选数据源分组，支持批量接口的数据源一次请求整组，其余逐只获取。
+
+        Returns:
+            {原始代码: (行情字典, 使用的数据源)}，获取失败的代码不包含在结果中
+        """
+        self.initialize_sources()
+
+        groups: Dict[str, List[str]] = {}
+        for code in stock_codes:
+            best_source = self.get_best_source(code)
+            if best_source:
+                groups.setdefault(best_source, []).append(code)
+
+        results: Dict[str, Tuple[Dict[str, Any], str]] = {}
+        for source_name, codes in groups.items():
+            source = self.data_sources[source_name]
+            if hasattr(source, 'get_real_time_quotes'):
+                started = time.monotonic()
+                try:
+                    quotes = source.get_real_time_quotes(codes, raise_errors=True)
+                    self.record_outcome(source_name, True, time.monotonic() - started)
+                    for code in codes:
+                        quote = quotes.get(normalize_symbol(code))
+                        if quote:
+                            results[code] = (quote, source_name)
+                except Exception as e:
+                    self.record_outcome(source_name, False, time.monotonic() - started)
+                    logger.warning(f"{source_name} 批量行情获取失败: {e}")
+
+        # 批量未覆盖的代码走单只接口（含备用数据源）
+        for code in stock_codes:
+            if code not in results:
+                quote, source_name = self.get_real_time_quote(code)
+                if quote:
+                    results[code] = (quote, source_name)
+
+        return results
+
     def get_market_info(self, stock_code: str) -> Tuple[Dict[str, Any], str]:
         """获取市场信息"""
         self.initialize_sources()
@@ -261,6 +583,23 @@ class SmartDataSource:
 
         return {}, 'failed'
 
+    def preload_metadata(self, stock_codes: List[str], full: bool = False) -> int:
+        """
+        用支持批量预热的数据源填充元数据缓存（名称/行业/上市日期）。
+
+        Returns:
+            写入缓存的股票数
+        """
+        self.initialize_sources()
+        written = 0
+        for source_name, source in self.data_sources.items():
+            if hasattr(source, 'preload_metadata'):
+                try:
+                    written += source.preload_metadata(stock_codes, full=full)
+                except Exception as e:
+                    logger.warning(f"{source_name} 元数据预热失败: {e}")
+        return written
+
     def get_available_sources(self) -> Dict[str, str]:
         """获取可用的数据源状态"""
         self.initialize_sources()
@@ -276,7 +615,15 @@ class SmartDataSource:
             'failed_sources': sum(1 for s in self.source_status.values() if s == 'failed'),
             'source_priority': self.source_priority.copy(),
             'available_sources': list(self.data_sources.keys()),
-            'init_timestamp': self._init_timestamp.isoformat() if self._init_timestamp else None
+            'init_timestamp': self._init_timestamp.isoformat() if self._init_timestamp else None,
+            'last_probe': self._last_probe.isoformat() if self._last_probe else None,
+            'latency': {name: stats.snapshot() for name, stats in self._stats.items()},
+            'circuit_breakers': {
+                name: {'state': breaker.state, 'consecutive_failures': breaker.consecutive_failures}
+                for name, breaker in self._breakers.items()
+            },
+            'request_coalescing': self._inflight.get_stats(),
+            'hedging': self.get_hedge_stats()
         }
 
 
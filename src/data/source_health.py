@@ -0,0 +1,139 @@
+"""
+数据源健康度 - 滚动延迟/错误统计与熔断器
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+
+class SourceStats:
+    """最近 window 次请求的延迟与成败统计（线程安全）"""
+
+    def __init__(self, window: int = 100):
+        self._samples: deque = deque(maxlen=window)  # (latency_seconds, success)
+        self._lock = threading.Lock()
+        self.total_requests = 0
+        self.total_errors = 0
+
+    def record(self, latency: float, success: bool) -> None:
+        with self._lock:
+            self._samples.append((latency, success))
+            self.total_requests += 1
+            if not success:
+                self.total_errors += 1
+
+    @property
+    def sample_count(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """成功请求延迟的分位数（秒），无样本返回 None"""
+        with self._lock:
+            latencies = [lat for lat, ok in self._samples if ok]
+        if not latencies:
+            return None
+        return float(np.percentile(latencies, q))
+
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self._samples:
+                return 0.0
+            return sum(1 for _, ok in self._samples if not ok) / len(self._samples)
+
+    def expected_latency(self) -> Optional[float]:
+        """
+        路由用的期望代价：p50 按成功率放大（失败后还要再走备用源），
+        无成功样本时返回 None。
+        """
+        p50 = self.percentile(50)
+        if p50 is None:
+            return None
+        return p50 / max(1.0 - self.error_rate(), 0.05)
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            'samples': self.sample_count,
+            'p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+            'p95_ms': round(p95 * 1000, 1) if p95 is not None else None,
+            'error_rate': round(self.error_rate(), 3),
+            'total_requests': self.total_requests,
+            'total_errors': self.total_errors,
+        }
+
+
+class CircuitBreaker:
+    """
+    熔断器：
+    - closed: 正常放行，连续失败达到 failure_threshold 后打开；
+    - open: 直接拒绝，reset_timeout 秒后进入 half_open；
+    - half_open: 只放行一个试探请求，成功则关闭，失败则重新打开。
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def _advance(self) -> None:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._advance()
+            return self._state
+
+    @property
+    def consecutive_failures(self) -> int:
+        return self._failures
+
+    def is_available(self) -> bool:
+        """是否可能放行请求（不占用 half_open 的试探名额，用于路由排序）"""
+        with self._lock:
+            self._advance()
+            if self._state == self.HALF_OPEN:
+                return not self._trial_in_flight
+            return self._state == self.CLOSED
+
+    def allow_request(self) -> bool:
+        """实际发请求前调用；half_open 时占用唯一的试探名额"""
+        with self._lock:
+            self._advance()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._trip()
+
+    def _trip(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._trial_in_flight = False
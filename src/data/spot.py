@@ -0,0 +1,87 @@
+"""
+全市场实时行情快照 - 短 TTL 共享缓存，按6位代码索引
+"""
+
+import threading
+import time
+import logging
+from typing import Callable, Dict, Any, Iterable, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def spot_code(code: str) -> str:
+    """快照索引使用的代码：取末6位（兼容 sh600000 / 600000 / 600000.SS）"""
+    code = str(code).strip().lower().split('.')[0]
+    return code[-6:] if len(code) >= 6 else code.zfill(6)
+
+
+class SpotSnapshot:
+    """
+    一次拉取全市场行情表，在 TTL 内供所有调用方共享。
+    并发刷新由锁串行化，过期时只有一个线程真正请求上游。
+    """
+
+    def __init__(self, fetch: Callable[[], pd.DataFrame], ttl_seconds: float,
+                 code_column: str = '代码'):
+        self._fetch = fetch
+        self.ttl_seconds = ttl_seconds
+        self.code_column = code_column
+        self._lock = threading.Lock()
+        self._frame: Optional[pd.DataFrame] = None
+        self._fetched_at = 0.0
+        self._hits = 0
+        self._refreshes = 0
+
+    def _is_fresh(self) -> bool:
+        return self._frame is not None and time.time() - self._fetched_at < self.ttl_seconds
+
+    def get(self, max_age: Optional[float] = None) -> pd.DataFrame:
+        """
+        获取快照（索引为6位代码）。过期时刷新，刷新失败则抛出异常。
+
+        Args:
+            max_age: 可接受的最大快照年龄（秒），默认使用 ttl_seconds
+        """
+        ttl = self.ttl_seconds if max_age is None else max_age
+        with self._lock:
+            if self._frame is not None and time.time() - self._fetched_at < ttl:
+                self._hits += 1
+                return self._frame
+
+            df = self._fetch()
+            if df is None or df.empty:
+                raise ValueError("全市场行情快照为空")
+            df = df.copy()
+            df.index = df[self.code_column].map(spot_code)
+            df = df[~df.index.duplicated(keep='first')]
+
+            self._frame = df
+            self._fetched_at = time.time()
+            self._refreshes += 1
+            logger.info(f"全市场行情快照已刷新: {len(df)} 只股票")
+            return df
+
+    def lookup(self, codes: Iterable[str]) -> pd.DataFrame:
+        """按代码批量查找快照行（不存在的代码被忽略）"""
+        df = self.get()
+        wanted = [spot_code(code) for code in codes]
+        return df.loc[df.index.intersection(wanted)]
+
+    @property
+    def fetched_at(self) -> float:
+        """最近一次刷新的时间戳（time.time()），未刷新过为 0"""
+        return self._fetched_at
+
+    def get_stats(self) -> Dict[str, Any]:
+        """快照统计"""
+        with self._lock:
+            return {
+                'rows': 0 if self._frame is None else len(self._frame),
+                'age_seconds': round(time.time() - self._fetched_at, 1) if self._frame is not None else None,
+                'fresh': self._is_fresh(),
+                'hits': self._hits,
+                'refreshes': self._refreshes,
+            }
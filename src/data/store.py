@@ -0,0 +1,385 @@
+"""
+本地列式行情存储 - 按 代码/年份 分区的 Parquet 日线仓库
+
+目录结构::
+
+    {root}/daily/{symbol}/{year}.parquet
+    {root}/daily/{symbol}/_coverage.json   # 已覆盖（已向上游请求过）的日期区间与价格口径
+    {root}/daily/{symbol}/_factors.parquet # 复权因子表（有因子表时K线为不复权价格）
+
+覆盖区间记录的是"已经向数据源请求过"的日期范围，而不是"有K线的日期"，
+因此停牌、节假日等无数据的日期不会被反复请求。
+
+有复权因子表的股票，读取时按 adjust 参数在本地换算前复权/后复权价格（见 adjust.py）。
+"""
+
+import json
+import os
+import threading
+import time
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from src.config.settings import DataConfig
+from .adjust import apply_adjustment
+from .trading_calendar import calendar_for, get_trading_calendar
+
+# Parquet 读写依赖 pyarrow；未安装时存储自动禁用，加载器退回纯网络模式
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMAT = '%Y%m%d'
+DEFAULT_HISTORY_DAYS = 365
+
+
+def normalize_symbol(code: str) -> str:
+    """存储使用的代码键：A股统一为6位数字，其余市场保留原始代码（大写）"""
+    code = str(code).strip().upper()
+    head = code.split('.')[0]
+    if len(head) == 6 and head.isdigit():
+        return head
+    return code
+
+
+def resolve_date_range(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+) -> Tuple[str, str]:
+    """补全默认日期范围（与 AKShare 加载器一致：最近一年），统一为 YYYYMMDD"""
+    now = datetime.now()
+    end = pd.Timestamp(end_date) if end_date else pd.Timestamp(now)
+    start = (pd.Timestamp(start_date) if start_date
+             else pd.Timestamp(now - timedelta(days=DEFAULT_HISTORY_DAYS)))
+    return start.strftime(DATE_FORMAT), end.strftime(DATE_FORMAT)
+
+
+def last_settled_date(now: Optional[datetime] = None, market: str = 'CN') -> pd.Timestamp:
+    """最后一个K线已定型的交易日（按交易日历，收盘 30 分钟后视为定型）"""
+    return get_trading_calendar(market).last_settled_session(now)
+
+
+class OHLCVStore:
+    """
+    本地日线仓库。
+    读取按年份分区只加载需要的文件；写入按日期去重合并，后写覆盖先写。
+    """
+
+    def __init__(self, root: str, enabled: bool = True):
+        self.root = root
+        self.enabled = enabled and PARQUET_AVAILABLE
+        self._lock = threading.RLock()
+        self._coverage: dict = {}  # symbol -> [(start, end), ...]，Timestamp 区间
+        self._basis: dict = {}  # symbol -> 价格口径（'raw' 为不复权；旧版本存储为 None）
+
+        if enabled and not PARQUET_AVAILABLE:
+            logger.warning("未安装 pyarrow，本地行情存储已禁用")
+        elif self.enabled:
+            logger.info(f"本地行情存储: {os.path.abspath(root)}")
+
+    # ------------------------------------------------------------------
+    # 路径
+    # ------------------------------------------------------------------
+
+    def _symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.root, 'daily', symbol)
+
+    def _partition_path(self, symbol: str, year: int) -> str:
+        return os.path.join(self._symbol_dir(symbol), f"{year}.parquet")
+
+    def _coverage_path(self, symbol: str) -> str:
+        return os.path.join(self._symbol_dir(symbol), '_coverage.json')
+
+    def _factors_path(self, symbol: str) -> str:
+        return os.path.join(self._symbol_dir(symbol), '_factors.parquet')
+
+    # ------------------------------------------------------------------
+    # 覆盖区间
+    # ------------------------------------------------------------------
+
+    def coverage(self, symbol: str) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """返回已覆盖的日期区间（已合并、升序）"""
+        symbol = normalize_symbol(symbol)
+        with self._lock:
+            path = self._coverage_path(symbol)
+            if symbol in self._coverage and not os.path.exists(path):
+                # 目录被外部删除（如界面上的"清除缓存"），内存中的覆盖区间随之失效
+                self._coverage.pop(symbol)
+            if symbol not in self._coverage:
+                intervals, basis = [], None
+                if os.path.exists(path):
+                    try:
+                        with open(path, 'r') as f:
+                            raw = json.load(f)
+                        intervals = [(pd.Timestamp(s), pd.Timestamp(e))
+                                     for s, e in raw.get('intervals', [])]
+                        basis = raw.get('basis')
+                    except Exception as e:
+                        logger.warning(f"读取 {symbol} 覆盖区间失败，视为无本地数据: {e}")
+                self._coverage[symbol] = intervals
+                self._basis[symbol] = basis
+            return list(self._coverage[symbol])
+
+    def price_basis(self, symbol: str) -> Optional[str]:
+        """
+        本地K线的价格口径：'raw' 为不复权（由 AKShare 加载器写入），
+        None 为数据源原样提供的价格（含旧版本存储的前复权数据）。
+        """
+        symbol = normalize_symbol(symbol)
+        with self._lock:
+            self.coverage(symbol)
+            return self._basis.get(symbol)
+
+    def _save_coverage(self, symbol: str, intervals: List[Tuple[pd.Timestamp, pd.Timestamp]]) -> None:
+        merged: List[Tuple[pd.Timestamp, pd.Timestamp]] = []
+        for start, end in sorted(intervals):
+            if merged and start <= merged[-1][1] + timedelta(days=1):
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+
+        self._coverage[symbol] = merged
+        os.makedirs(self._symbol_dir(symbol), exist_ok=True)
+        path = self._coverage_path(symbol)
+        tmp_path = f"{path}.tmp"
+        payload = {'intervals': [[s.strftime(DATE_FORMAT), e.strftime(DATE_FORMAT)]
+                                 for s, e in merged]}
+        if self._basis.get(symbol):
+            payload['basis'] = self._basis[symbol]
+        with open(tmp_path, 'w') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+
+    def missing_ranges(self, symbol: str, start_date: str, end_date: str) -> List[Tuple[str, str]]:
+        """
+        计算 [start_date, end_date] 中尚未覆盖、需要向数据源请求的区间。
+        不含交易日（周末、节假日）的缺口会被忽略；尚未开盘的交易日还没有K线，
+        区间终点截到最后一个已开盘的交易日。
+        """
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        if not self.enabled:
+            return [(start.strftime(DATE_FORMAT), end.strftime(DATE_FORMAT))]
+
+        calendar = calendar_for(symbol)
+        end = min(end, calendar.latest_market_minute().normalize())
+        if start > end:
+            return []
+
+        gaps = []
+        cursor = start
+        for cov_start, cov_end in self.coverage(symbol):
+            if cov_end < cursor:
+                continue
+            if cov_start > end:
+                break
+            if cov_start > cursor:
+                gaps.append((cursor, cov_start - timedelta(days=1)))
+            cursor = max(cursor, cov_end + timedelta(days=1))
+            if cursor > end:
+                break
+        if cursor <= end:
+            gaps.append((cursor, end))
+
+        return [(s.strftime(DATE_FORMAT), e.strftime(DATE_FORMAT))
+                for s, e in gaps if calendar.has_trading_day(s, e)]
+
+    # ------------------------------------------------------------------
+    # 读写
+    # ------------------------------------------------------------------
+
+    def read(self, symbol: str, start_date: str, end_date: str,
+             adjust: str = 'none') -> pd.DataFrame:
+        """
+        读取 [start_date, end_date] 内的日线，按日期升序。
+
+        Args:
+            adjust: 'qfq' / 'hfq' / 'none'；只对有复权因子表的股票生效，
+                    其余股票按数据源原样返回
+        """
+        if not self.enabled:
+            return pd.DataFrame()
+
+        symbol = normalize_symbol(symbol)
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+
+        frames = []
+        with self._lock:
+            for year in range(start.year, end.year + 1):
+                path = self._partition_path(symbol, year)
+                if os.path.exists(path):
+                    try:
+                        frames.append(pd.read_parquet(path))
+                    except Exception as e:
+                        logger.warning(f"读取分区 {path} 失败: {e}")
+
+        if not frames:
+            return pd.DataFrame()
+
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        mask = (df['Date'] >= start) & (df['Date'] <= end)
+        df = df.loc[mask].sort_values('Date').reset_index(drop=True)
+        if adjust != 'none':
+            df = apply_adjustment(df, self.read_factors(symbol), adjust)
+        return df
+
+    def read_factors(self, symbol: str) -> pd.DataFrame:
+        """复权因子表（Date / qfq_factor / hfq_factor），没有时返回空表"""
+        if not self.enabled:
+            return pd.DataFrame()
+        path = self._factors_path(normalize_symbol(symbol))
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            logger.warning(f"读取复权因子 {path} 失败: {e}")
+            return pd.DataFrame()
+
+    def write_factors(self, symbol: str, factors: pd.DataFrame) -> None:
+        """整表替换复权因子"""
+        if not self.enabled or factors is None or factors.empty:
+            return
+        symbol = normalize_symbol(symbol)
+        with self._lock:
+            try:
+                os.makedirs(self._symbol_dir(symbol), exist_ok=True)
+                path = self._factors_path(symbol)
+                tmp_path = f"{path}.tmp"
+                factors.sort_values('Date').reset_index(drop=True).to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                logger.warning(f"写入复权因子失败 ({symbol}): {e}")
+
+    def factors_age(self, symbol: str) -> Optional[float]:
+        """复权因子表距上次更新的秒数，没有因子表返回 None"""
+        path = self._factors_path(normalize_symbol(symbol))
+        if not self.enabled or not os.path.exists(path):
+            return None
+        return time.time() - os.path.getmtime(path)
+
+    def expire_factors(self, symbol: str) -> None:
+        """把复权因子表标记为过期（保留原表），下次加载该股票时重新请求"""
+        path = self._factors_path(normalize_symbol(symbol))
+        if self.enabled and os.path.exists(path):
+            os.utime(path, (0, 0))
+
+    def factors_expired(self, symbol: str) -> bool:
+        """因子表是否被 expire_factors 标记为过期（出现了表中没有的除权除息）"""
+        path = self._factors_path(normalize_symbol(symbol))
+        return self.enabled and os.path.exists(path) and os.path.getmtime(path) == 0
+
+    def can_adjust(self, symbol: str) -> bool:
+        """
+        read(adjust='qfq'/'hfq') 能否给出复权价格：不复权存储需要有未过期的因子表；
+        其他口径的存储按数据源原样返回。
+        """
+        if self.price_basis(symbol) != 'raw':
+            return True
+        path = self._factors_path(normalize_symbol(symbol))
+        return os.path.exists(path) and not self.factors_expired(symbol)
+
+    def last_date(self, symbol: str) -> Optional[pd.Timestamp]:
+        """本地最后一根日线的日期，无数据返回 None"""
+        if not self.enabled:
+            return None
+
+        symbol = normalize_symbol(symbol)
+        symbol_dir = self._symbol_dir(symbol)
+        if not os.path.isdir(symbol_dir):
+            return None
+
+        years = sorted(
+            (int(name.split('.')[0]) for name in os.listdir(symbol_dir)
+             if name.endswith('.parquet') and name.split('.')[0].isdigit()),
+            reverse=True
+        )
+        for year in years:
+            df = self.read(symbol, f"{year}0101", f"{year}1231")
+            if not df.empty:
+                return df['Date'].max()
+        return None
+
+    def write(self, symbol: str, df: pd.DataFrame, start_date: str, end_date: str,
+              basis: Optional[str] = None) -> None:
+        """
+        合并写入日线，并把 [start_date, end_date] 记为已覆盖。
+
+        覆盖区间截止到最后一个已定型的交易日（见 last_settled_date）：
+        盘中的当日K线是不完整的，仍会写入，但下次请求会重新拉取并覆盖。
+
+        Args:
+            basis: 价格口径，写入不复权价格时传 'raw'
+        """
+        if not self.enabled:
+            return
+
+        symbol = normalize_symbol(symbol)
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        end = min(end, calendar_for(symbol).last_settled_session())
+
+        with self._lock:
+            try:
+                intervals = self.coverage(symbol)
+                if basis is not None:
+                    self._basis[symbol] = basis
+                if df is not None and not df.empty:
+                    self._write_rows(symbol, df)
+                if start <= end or basis is not None:
+                    self._save_coverage(
+                        symbol, intervals + ([(start, end)] if start <= end else [])
+                    )
+            except Exception as e:
+                logger.warning(f"写入本地行情存储失败 ({symbol}): {e}")
+
+    def _write_rows(self, symbol: str, df: pd.DataFrame) -> None:
+        os.makedirs(self._symbol_dir(symbol), exist_ok=True)
+        df = df.copy()
+        df['Date'] = pd.to_datetime(df['Date'])
+
+        for year, rows in df.groupby(df['Date'].dt.year):
+            path = self._partition_path(symbol, int(year))
+            if os.path.exists(path):
+                rows = pd.concat([pd.read_parquet(path), rows], ignore_index=True)
+            rows = (rows.drop_duplicates(subset='Date', keep='last')
+                        .sort_values('Date')
+                        .reset_index(drop=True))
+            tmp_path = f"{path}.tmp"
+            rows.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+
+    def clear(self, symbol: str) -> None:
+        """删除某只股票的全部本地数据与覆盖记录"""
+        if not self.enabled:
+            return
+
+        symbol = normalize_symbol(symbol)
+        with self._lock:
+            symbol_dir = self._symbol_dir(symbol)
+            if os.path.isdir(symbol_dir):
+                for name in os.listdir(symbol_dir):
+                    os.remove(os.path.join(symbol_dir, name))
+            self._coverage.pop(symbol, None)
+            self._basis.pop(symbol, None)
+
+
+# 全局单例（多个加载器实例共享同一份存储与覆盖区间缓存）
+_store_instance: Optional[OHLCVStore] = None
+
+
+def get_ohlcv_store(data_config: Optional[DataConfig] = None) -> OHLCVStore:
+    """获取本地行情存储单例"""
+    global _store_instance
+    if _store_instance is None:
+        config = data_config or DataConfig()
+        _store_instance = OHLCVStore(
+            getattr(config, 'store_dir', DataConfig.store_dir),
+            enabled=getattr(config, 'store_enabled', DataConfig.store_enabled)
+        )
+    return _store_instance
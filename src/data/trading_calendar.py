@@ -0,0 +1,328 @@
+"""
+交易日历 - 沪深（CN）、港股（HK）、美股（US）的交易日与交易时段
+
+缓存失效按"下一根K线何时可能出现"计算，而不是固定 TTL：
+- 交易时段内（含收盘后的结算等待）：数据随时变化，使用短 TTL；
+- 收盘定型之后、周末与节假日：数据在下一个交易日开盘前不会变化。
+
+交易日列表来源（缓存为 {calendar_dir}/{market}.json，超过 calendar_ttl_days 后刷新）：
+- CN: AKShare tool_trade_date_hist_sina（新浪交易日历，含当年全部交易日）；
+- HK/US（以及 CN 的备选）: 已安装 exchange_calendars 时使用；
+- 都不可用时按工作日估算（不含节假日）。
+"""
+
+import json
+import os
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from src.config.settings import DataConfig
+
+# 可选依赖：exchange_calendars 提供港股、美股（及沪市）的节假日
+try:
+    import exchange_calendars as xcals
+    EXCHANGE_CALENDARS_AVAILABLE = True
+except ImportError:
+    EXCHANGE_CALENDARS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 收盘后多久视为当日K线已定型：数据源的日线在收盘后稍晚才完成结算
+SETTLE_DELAY = timedelta(minutes=30)
+
+# 交易日列表获取失败后，多久再重试（秒）
+_RETRY_SECONDS = 3600
+
+
+@dataclass(frozen=True)
+class MarketSpec:
+    """市场的时区与连续竞价时段（当地时间）"""
+    timezone: str
+    sessions: Tuple[Tuple[dtime, dtime], ...]
+    pre_open: dtime       # 开盘集合竞价开始时间，此后行情快照不再是上一交易日的数据
+    xcals_code: str       # exchange_calendars 中的交易所代码
+
+
+MARKETS: Dict[str, MarketSpec] = {
+    'CN': MarketSpec('Asia/Shanghai', ((dtime(9, 30), dtime(11, 30)), (dtime(13, 0), dtime(15, 0))),
+                     dtime(9, 15), 'XSHG'),
+    'HK': MarketSpec('Asia/Hong_Kong', ((dtime(9, 30), dtime(12, 0)), (dtime(13, 0), dtime(16, 0))),
+                     dtime(9, 0), 'XHKG'),
+    'US': MarketSpec('America/New_York', ((dtime(9, 30), dtime(16, 0)),),
+                     dtime(9, 30), 'XNYS'),
+}
+
+
+def market_of(symbol: str) -> str:
+    """按代码判断市场：6位数字或 .SS/.SH/.SZ/.BJ 为 CN，.HK 或不超过5位数字为 HK，其余为 US"""
+    code = str(symbol).strip().upper()
+    head, _, suffix = code.partition('.')
+    if suffix in ('SS', 'SH', 'SZ', 'BJ') or (len(head) == 6 and head.isdigit()):
+        return 'CN'
+    if head[:2] in ('SH', 'SZ', 'BJ') and len(head) == 8 and head[2:].isdigit():
+        return 'CN'
+    if suffix == 'HK' or (head.isdigit() and len(head) <= 5):
+        return 'HK'
+    return 'US'
+
+
+class TradingCalendar:
+    """
+    单个市场的交易日历。
+
+    所有不带时区的 datetime 参数按该市场当地时间解释；
+    now 省略时取该市场的当前当地时间。
+    """
+
+    def __init__(self, market: str, cache_dir: str, ttl_days: float):
+        if market not in MARKETS:
+            raise ValueError(f"未知的市场: {market}（可选 {', '.join(MARKETS)}）")
+        self.market = market
+        self.spec = MARKETS[market]
+        self.tz = ZoneInfo(self.spec.timezone)
+        self.cache_path = os.path.join(cache_dir, f"{market}.json")
+        self.ttl_seconds = ttl_days * 86400
+        self._lock = threading.Lock()
+        self._days: Optional[set] = None
+        self._first: Optional[date] = None
+        self._last: Optional[date] = None
+        self._source = 'weekday'
+        self._retry_at = 0.0
+
+    # ------------------------------------------------------------------
+    # 交易日列表
+    # ------------------------------------------------------------------
+
+    def _ensure_loaded(self) -> None:
+        with self._lock:
+            if self._days is not None or time.time() < self._retry_at:
+                return
+
+            cached, fetched_at = self._read_cache()
+            if cached and time.time() - fetched_at < self.ttl_seconds:
+                self._set_days(cached, 'cache')
+                return
+
+            try:
+                days, source = self._fetch_days()
+                self._write_cache(days)
+                self._set_days(days, source)
+                logger.info(f"{self.market} 交易日历已更新（{source}）: {len(days)} 个交易日")
+            except Exception as e:
+                self._retry_at = time.time() + _RETRY_SECONDS
+                if cached:
+                    logger.warning(f"{self.market} 交易日历刷新失败，沿用缓存: {e}")
+                    self._set_days(cached, 'cache')
+                else:
+                    logger.warning(f"{self.market} 交易日历不可用，按工作日估算: {e}")
+
+    def _set_days(self, days: List[date], source: str) -> None:
+        self._days = set(days)
+        self._first, self._last = min(days), max(days)
+        self._source = source
+
+    def _read_cache(self) -> Tuple[List[date], float]:
+        if not os.path.exists(self.cache_path):
+            return [], 0.0
+        try:
+            with open(self.cache_path, 'r') as f:
+                raw = json.load(f)
+            return [datetime.strptime(d, '%Y%m%d').date() for d in raw['days']], raw['fetched_at']
+        except Exception as e:
+            logger.warning(f"读取交易日历缓存 {self.cache_path} 失败: {e}")
+            return [], 0.0
+
+    def _write_cache(self, days: List[date]) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'fetched_at': time.time(),
+                           'days': [d.strftime('%Y%m%d') for d in sorted(days)]}, f)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logger.warning(f"保存交易日历缓存失败: {e}")
+
+    def _fetch_days(self) -> Tuple[List[date], str]:
+        if self.market == 'CN':
+            try:
+                from .loader_akshare import _ak_call
+                df = _ak_call('tool_trade_date_hist_sina')
+                days = pd.to_datetime(df['trade_date']).dt.date.tolist()
+                if days:
+                    return days, 'akshare'
+            except Exception as e:
+                if not EXCHANGE_CALENDARS_AVAILABLE:
+                    raise
+                logger.debug(f"AKShare 交易日历获取失败，改用 exchange_calendars: {e}")
+
+        if not EXCHANGE_CALENDARS_AVAILABLE:
+            raise RuntimeError("未安装 exchange_calendars")
+        sessions = xcals.get_calendar(self.spec.xcals_code).sessions
+        return [ts.date() for ts in sessions], 'exchange_calendars'
+
+    @property
+    def source(self) -> str:
+        """交易日来源：akshare / exchange_calendars / cache / weekday（按工作日估算）"""
+        self._ensure_loaded()
+        return self._source
+
+    # ------------------------------------------------------------------
+    # 交易日
+    # ------------------------------------------------------------------
+
+    def is_trading_day(self, day) -> bool:
+        day = pd.Timestamp(day).date()
+        self._ensure_loaded()
+        if self._days is not None and self._first <= day <= self._last:
+            return day in self._days
+        return day.weekday() < 5
+
+    def previous_trading_day(self, day) -> pd.Timestamp:
+        """严格早于 day 的最近一个交易日"""
+        day = pd.Timestamp(day).normalize() - timedelta(days=1)
+        while not self.is_trading_day(day):
+            day -= timedelta(days=1)
+        return day
+
+    def next_trading_day(self, day) -> pd.Timestamp:
+        """严格晚于 day 的最近一个交易日"""
+        day = pd.Timestamp(day).normalize() + timedelta(days=1)
+        while not self.is_trading_day(day):
+            day += timedelta(days=1)
+        return day
+
+    def has_trading_day(self, start, end) -> bool:
+        """[start, end] 内是否有交易日"""
+        return any(self.is_trading_day(day) for day in pd.date_range(start, end, freq='D'))
+
+    # ------------------------------------------------------------------
+    # 交易时段
+    # ------------------------------------------------------------------
+
+    def now(self) -> pd.Timestamp:
+        """该市场的当前当地时间（不带时区）"""
+        return pd.Timestamp(datetime.now(self.tz).replace(tzinfo=None))
+
+    def _local(self, now) -> pd.Timestamp:
+        if now is None:
+            return self.now()
+        now = pd.Timestamp(now)
+        if now.tzinfo is not None:
+            now = now.tz_convert(self.spec.timezone).tz_localize(None)
+        return now
+
+    def _at(self, day, clock: dtime) -> pd.Timestamp:
+        return pd.Timestamp(day).normalize() + timedelta(hours=clock.hour, minutes=clock.minute)
+
+    def open_time(self, day) -> pd.Timestamp:
+        return self._at(day, self.spec.sessions[0][0])
+
+    def close_time(self, day) -> pd.Timestamp:
+        return self._at(day, self.spec.sessions[-1][1])
+
+    def is_open(self, now=None) -> bool:
+        """当前是否处于连续竞价时段"""
+        now = self._local(now)
+        return self.is_trading_day(now) and any(
+            self._at(now, start) <= now < self._at(now, end) for start, end in self.spec.sessions
+        )
+
+    def is_live(self, now=None) -> bool:
+        """当日数据是否仍在变化：交易日开盘至收盘定型之间（含午休）"""
+        now = self._local(now)
+        return (self.is_trading_day(now)
+                and self.open_time(now) <= now < self.close_time(now) + SETTLE_DELAY)
+
+    def last_settled_session(self, now=None) -> pd.Timestamp:
+        """最后一个K线已定型的交易日（收盘 SETTLE_DELAY 之后视为定型）"""
+        now = self._local(now)
+        day = now.normalize()
+        if self.is_trading_day(day) and now >= self.close_time(day) + SETTLE_DELAY:
+            return day
+        return self.previous_trading_day(day)
+
+    def next_open(self, now=None) -> pd.Timestamp:
+        """下一次开盘时间（今天尚未开盘时为今天）"""
+        now = self._local(now)
+        day = now.normalize()
+        if self.is_trading_day(day) and now < self.open_time(day):
+            return self.open_time(day)
+        return self.open_time(self.next_trading_day(day))
+
+    def next_bar_time(self, now=None) -> pd.Timestamp:
+        """下一根日线定型的时间"""
+        now = self._local(now)
+        day = now.normalize()
+        if self.is_trading_day(day) and now < self.close_time(day) + SETTLE_DELAY:
+            return self.close_time(day) + SETTLE_DELAY
+        return self.close_time(self.next_trading_day(day)) + SETTLE_DELAY
+
+    def latest_market_minute(self, now=None) -> pd.Timestamp:
+        """
+        不晚于 now 的最后一个交易分钟：
+        盘中为当前分钟，午休为上午收盘，收盘后为当日收盘，开盘前为上一交易日收盘。
+        """
+        now = self._local(now)
+        day = now.normalize()
+        if self.is_trading_day(day):
+            for start, end in reversed(self.spec.sessions):
+                if now >= self._at(day, end):
+                    return self._at(day, end)
+                if now >= self._at(day, start):
+                    return now.floor('min')
+        return self.close_time(self.previous_trading_day(day))
+
+    def to_epoch(self, local: pd.Timestamp) -> float:
+        """当地时间 -> time.time() 时间戳"""
+        return pd.Timestamp(local).tz_localize(self.spec.timezone).timestamp()
+
+    def cache_expiry(self, live_ttl: float, now=None) -> float:
+        """
+        缓存条目的过期时间戳（time.time()）：
+        数据仍在变化时为 live_ttl 秒后，否则为下一次开盘。
+        """
+        now = self._local(now)
+        if self.is_live(now):
+            return time.time() + live_ttl
+        return self.to_epoch(self.next_open(now))
+
+
+# 每个市场一个日历单例
+_calendars: Dict[str, TradingCalendar] = {}
+_calendars_lock = threading.Lock()
+
+
+def get_trading_calendar(market: str = 'CN', data_config: Optional[DataConfig] = None) -> TradingCalendar:
+    """获取市场的交易日历单例（CN / HK / US）"""
+    with _calendars_lock:
+        if market not in _calendars:
+            config = data_config or DataConfig()
+            _calendars[market] = TradingCalendar(
+                market,
+                getattr(config, 'calendar_dir', DataConfig.calendar_dir),
+                getattr(config, 'calendar_ttl_days', DataConfig.calendar_ttl_days)
+            )
+        return _calendars[market]
+
+
+def calendar_for(symbol: str) -> TradingCalendar:
+    """代码所属市场的交易日历"""
+    return get_trading_calendar(market_of(symbol))
+
+
+def cache_expiry(symbol: str, live_ttl: Optional[float] = None) -> float:
+    """
+    symbol 行情缓存的过期时间戳：盘中 live_ttl 秒（默认 DataConfig.intraday_cache_ttl_seconds），
+    收盘定型后持续到下一次开盘。
+    """
+    if live_ttl is None:
+        live_ttl = DataConfig.intraday_cache_ttl_seconds
+    return calendar_for(symbol).cache_expiry(live_ttl)
@@ -0,0 +1,265 @@
+"""
+股票池注册表 - 命名、带版本的成分股列表，进程内只加载一次
+
+内置股票池：
+- SZ100:   深证100（本地 CSV，DataConfig.sz100_stocks_file）
+- CSI300:  沪深300（中证指数成分）
+- CSI500:  中证500
+- A_SHARE: 全部A股（全市场行情快照）
+
+从网络获取的成分股列表缓存为 {universe_dir}/{name}.json，超过 universe_ttl_days 后刷新；
+刷新失败时沿用已缓存的旧版本。
+"""
+
+import json
+import os
+import threading
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from src.config.settings import DataConfig
+from .spot import spot_code
+
+logger = logging.getLogger(__name__)
+
+# 中证指数代码
+INDEX_CODES = {
+    'CSI300': '000300',
+    'CSI500': '000905',
+}
+
+
+@dataclass(frozen=True)
+class SymbolInfo:
+    """成分股的预计算元数据"""
+    code: str              # 6位代码
+    exchange: str          # SH / SZ / BJ
+    suffix: str            # .SH / .SZ / .BJ
+    yf_symbol: str         # YFinance 代码（上交所为 .SS）
+    preferred_source: str  # 首选数据源
+    name: str = ''
+
+    @property
+    def ticker(self) -> str:
+        """界面与加载器使用的代码，如 000893.SZ"""
+        return f"{self.code}{self.suffix}"
+
+    @classmethod
+    def from_code(cls, code: str, name: str = '') -> 'SymbolInfo':
+        code = spot_code(code)
+        if code.startswith('6'):
+            exchange = 'SH'
+        elif code.startswith(('4', '8', '92')):
+            exchange = 'BJ'
+        else:
+            exchange = 'SZ'
+        yf_suffix = '.SS' if exchange == 'SH' else f".{exchange}"
+        return cls(code=code, exchange=exchange, suffix=f".{exchange}",
+                   yf_symbol=f"{code}{yf_suffix}", preferred_source='akshare', name=name or '')
+
+
+@dataclass
+class Universe:
+    """
+    一个版本的股票池。可直接当作代码列表使用（迭代、len、下标均对应 tickers），
+    因此可以传给 batch_load_stock_data / PanelLoader。
+    """
+    name: str
+    version: str
+    symbols: List[SymbolInfo] = field(default_factory=list)
+    _by_code: Dict[str, SymbolInfo] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._by_code = {s.code: s for s in self.symbols}
+
+    @property
+    def tickers(self) -> List[str]:
+        return [s.ticker for s in self.symbols]
+
+    @property
+    def codes(self) -> List[str]:
+        return [s.code for s in self.symbols]
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.tickers)
+
+    def __getitem__(self, index):
+        return self.tickers[index]
+
+    def info(self, code: str) -> Optional[SymbolInfo]:
+        """按任意格式的代码查元数据"""
+        return self._by_code.get(spot_code(code))
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'version': self.version,
+            'symbols': [[s.code, s.name] for s in self.symbols],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Universe':
+        return cls(
+            name=data['name'],
+            version=data['version'],
+            symbols=[SymbolInfo.from_code(code, name) for code, name in data['symbols']],
+        )
+
+
+def _build(name: str, version: str, codes: List[str], names: Optional[List[str]] = None) -> Universe:
+    names = names or [''] * len(codes)
+    seen = set()
+    symbols = []
+    for code, symbol_name in zip(codes, names):
+        info = SymbolInfo.from_code(code, symbol_name)
+        if info.code not in seen:
+            seen.add(info.code)
+            symbols.append(info)
+    return Universe(name=name, version=version, symbols=symbols)
+
+
+class UniverseRegistry:
+    """按名称获取股票池；每个股票池在进程内只加载一次（线程安全）"""
+
+    def __init__(self, data_config: Optional[DataConfig] = None):
+        self.data_config = data_config or DataConfig()
+        self.cache_dir = getattr(self.data_config, 'universe_dir', DataConfig.universe_dir)
+        self.ttl_days = getattr(self.data_config, 'universe_ttl_days', DataConfig.universe_ttl_days)
+        self._universes: Dict[str, Universe] = {}
+        self._lock = threading.Lock()
+        self._loaders: Dict[str, Callable[[], Universe]] = {
+            'SZ100': self._load_sz100,
+            'CSI300': lambda: self._load_index('CSI300'),
+            'CSI500': lambda: self._load_index('CSI500'),
+            'A_SHARE': self._load_a_share,
+        }
+
+    def names(self) -> List[str]:
+        return list(self._loaders)
+
+    def register(self, name: str, loader: Callable[[], Universe]) -> None:
+        """注册自定义股票池"""
+        with self._lock:
+            self._loaders[name] = loader
+            self._universes.pop(name, None)
+
+    def get(self, name: str, refresh: bool = False) -> Universe:
+        """
+        获取股票池；加载失败时返回空股票池（不缓存，下次调用重试）。
+
+        Args:
+            refresh: 忽略进程内与磁盘缓存，重新加载
+        """
+        name = name.upper()
+        if name not in self._loaders:
+            raise KeyError(f"未知的股票池: {name}（可选 {', '.join(self._loaders)}）")
+
+        with self._lock:
+            if not refresh and name in self._universes:
+                return self._universes[name]
+            try:
+                universe = self._load(name, refresh)
+            except Exception as e:
+                logger.error(f"加载股票池 {name} 失败: {e}")
+                return Universe(name=name, version='')
+            if universe.symbols:
+                self._universes[name] = universe
+                logger.info(f"股票池 {name} 已加载: {len(universe)} 只（版本 {universe.version}）")
+            return universe
+
+    def clear(self) -> None:
+        with self._lock:
+            self._universes.clear()
+
+    # ------------------------------------------------------------------
+    # 各股票池的加载
+    # ------------------------------------------------------------------
+
+    def _load_sz100(self) -> Universe:
+        path = self.data_config.sz100_stocks_file
+        df = pd.read_csv(path, dtype=str, encoding='utf-8-sig')
+        version = datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y%m%d')
+        return _build('SZ100', version, df['code'].tolist())
+
+    def _load(self, name: str, refresh: bool) -> Universe:
+        """本地 CSV 直接加载；网络股票池优先使用未过期的磁盘缓存（refresh 时跳过）"""
+        if name == 'SZ100':
+            return self._load_sz100()
+        if refresh:
+            universe = self._loaders[name]()
+            self._save(universe)
+            return universe
+
+        path = os.path.join(self.cache_dir, f"{name}.json")
+        cached = None
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    cached = Universe.from_dict(json.load(f))
+            except Exception as e:
+                logger.warning(f"读取股票池缓存 {path} 失败: {e}")
+
+        age_days = (datetime.now() - datetime.fromtimestamp(os.path.getmtime(path))).days \
+            if cached is not None else None
+        if cached is not None and age_days < self.ttl_days:
+            return cached
+
+        try:
+            universe = self._loaders[name]()
+        except Exception as e:
+            if cached is not None:
+                logger.warning(f"刷新股票池 {name} 失败，沿用版本 {cached.version}: {e}")
+                return cached
+            raise
+        self._save(universe)
+        return universe
+
+    def _save(self, universe: Universe) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = os.path.join(self.cache_dir, f"{universe.name}.json")
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(universe.to_dict(), f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"保存股票池 {universe.name} 失败: {e}")
+
+    def _load_index(self, name: str) -> Universe:
+        from .loader_akshare import _ak_call
+        df = _ak_call('index_stock_cons_csindex', symbol=INDEX_CODES[name])
+        version = datetime.now().strftime('%Y%m%d')
+        if '日期' in df.columns and not df.empty:
+            version = pd.Timestamp(df['日期'].iloc[0]).strftime('%Y%m%d')
+        names = df['成分券名称'].tolist() if '成分券名称' in df.columns else None
+        return _build(name, version, df['成分券代码'].astype(str).tolist(), names)
+
+    def _load_a_share(self) -> Universe:
+        from .loader_akshare import get_spot_snapshot
+        spot = get_spot_snapshot().get()
+        names = spot['名称'].tolist() if '名称' in spot.columns else None
+        return _build('A_SHARE', datetime.now().strftime('%Y%m%d'), list(spot.index), names)
+
+
+# 全局单例
+_registry_instance: Optional[UniverseRegistry] = None
+
+
+def get_universe_registry(data_config: Optional[DataConfig] = None) -> UniverseRegistry:
+    """获取股票池注册表单例"""
+    global _registry_instance
+    if _registry_instance is None:
+        _registry_instance = UniverseRegistry(data_config)
+    return _registry_instance
+
+
+def get_universe(name: str) -> Universe:
+    """按名称获取股票池（SZ100 / CSI300 / CSI500 / A_SHARE）"""
+    return get_universe_registry().get(name)
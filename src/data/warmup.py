@@ -0,0 +1,193 @@
+"""
+缓存预热调度 - 按交易日历在开盘前、收盘后刷新配置的股票池
+
+- 开盘前（开盘前 warmup_pre_open_minutes 分钟）：刷新股票池成分、元数据（名称）与历史日线；
+- 收盘定型后：用一次全市场快照写入当日日线（见 eod.py），再加载历史日线并更新复权因子。
+
+数据写入共享的本地存储（日线仓库、元数据缓存、股票池缓存），界面进程读取时不再请求上游；
+在界面进程内运行（warmup_in_app）时同时预热进程内的行情缓存。
+
+用法::
+
+    python -m src.data.warmup                       # 常驻，按交易日历定时运行
+    python -m src.data.warmup --once pre_open       # 立即运行一次开盘前预热
+    python -m src.data.warmup --universe CSI300 --once post_close
+"""
+
+import argparse
+import threading
+import time
+import logging
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.config.settings import DataConfig
+from .trading_calendar import get_trading_calendar
+
+logger = logging.getLogger(__name__)
+
+JOBS = ('pre_open', 'post_close')
+
+
+class WarmupScheduler:
+    """按A股交易日历定时预热股票池数据"""
+
+    def __init__(self, data_config: Optional[DataConfig] = None,
+                 universes: Optional[List[str]] = None, loader=None):
+        self.data_config = data_config or DataConfig()
+        self.universes = universes or list(self._setting('warmup_universes'))
+        self.pre_open_lead = timedelta(minutes=self._setting('warmup_pre_open_minutes'))
+        self.full_metadata = self._setting('warmup_full_metadata')
+        self.calendar = get_trading_calendar('CN', self.data_config)
+        self._loader = loader
+        self._stop: Optional[threading.Event] = None
+        self._last_runs: Dict[str, Dict] = {}
+
+    def _setting(self, name: str):
+        return getattr(self.data_config, name, getattr(DataConfig, name))
+
+    @property
+    def loader(self):
+        if self._loader is None:
+            from .loader import StockDataLoader
+            self._loader = StockDataLoader(self.data_config)
+        return self._loader
+
+    # ------------------------------------------------------------------
+    # 调度
+    # ------------------------------------------------------------------
+
+    def next_run(self, now=None) -> Tuple[pd.Timestamp, str]:
+        """下一次运行的当地时间与任务名"""
+        now = pd.Timestamp(now) if now is not None else self.calendar.now()
+        pre_open = self.calendar.next_open(now) - self.pre_open_lead
+        if pre_open <= now:
+            # 已进入开盘前窗口：预热下一个交易日
+            pre_open = self.calendar.next_open(self.calendar.next_open(now)) - self.pre_open_lead
+        post_close = self.calendar.next_bar_time(now)
+        return (pre_open, 'pre_open') if pre_open < post_close else (post_close, 'post_close')
+
+    def run_forever(self, stop_event: Optional[threading.Event] = None) -> None:
+        """按交易日历循环运行，stop_event 置位时退出"""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            when, job = self.next_run()
+            delay = max(0.0, (when - self.calendar.now()).total_seconds())
+            logger.info(f"下一次预热: {job} @ {when:%Y-%m-%d %H:%M}（{delay / 3600:.1f} 小时后）")
+            if stop_event.wait(delay):
+                break
+            self.run(job)
+
+    def start(self) -> None:
+        """在后台守护线程中运行（重复调用无效）"""
+        if self._stop is not None:
+            return
+        self._stop = threading.Event()
+        threading.Thread(target=self.run_forever, args=(self._stop,),
+                         name='cache-warmup', daemon=True).start()
+
+    def stop(self) -> None:
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+    # ------------------------------------------------------------------
+    # 任务
+    # ------------------------------------------------------------------
+
+    def run(self, job: str) -> Dict:
+        """运行一次任务并返回统计（单个股票池失败不影响其余股票池）"""
+        if job not in JOBS:
+            raise ValueError(f"未知的预热任务: {job}（可选 {', '.join(JOBS)}）")
+        started = time.time()
+        stats: Dict = {'job': job, 'universes': {}}
+        try:
+            if job == 'post_close':
+                stats['eod'] = self._ingest_snapshot()
+            for name in self.universes:
+                try:
+                    stats['universes'][name] = self._warm_universe(name, metadata=(job == 'pre_open'))
+                except Exception as e:
+                    logger.error(f"预热股票池 {name} 失败: {e}", exc_info=True)
+                    stats['universes'][name] = {'error': str(e)}
+        finally:
+            stats['seconds'] = round(time.time() - started, 1)
+            self._last_runs[job] = stats
+        logger.info(f"预热任务 {job} 完成，用时 {stats['seconds']} 秒")
+        return stats
+
+    def _universe_tickers(self, name: str) -> List[str]:
+        from .universe import get_universe_registry
+        return get_universe_registry(self.data_config).get(name).tickers
+
+    def _ingest_snapshot(self) -> Dict[str, int]:
+        """收盘后一次快照写入所有股票池的当日日线"""
+        from .eod import ingest_spot_snapshot
+        symbols = sorted({ticker for name in self.universes for ticker in self._universe_tickers(name)})
+        try:
+            return ingest_spot_snapshot(symbols=symbols)
+        except Exception as e:
+            logger.warning(f"收盘快照入库失败，改为逐只加载: {e}")
+            return {}
+
+    def _warm_universe(self, name: str, metadata: bool) -> Dict:
+        tickers = self._universe_tickers(name)
+        if not tickers:
+            return {'tickers': 0}
+
+        stats = {'tickers': len(tickers)}
+        if metadata:
+            stats['metadata'] = self.loader.preload_metadata(tickers, full=self.full_metadata)
+        results = self.loader.batch_load_stock_data(tickers)
+        stats['loaded'] = sum(1 for df, _ in results if df is not None and not df.empty)
+        logger.info(f"股票池 {name} 预热: {stats['loaded']}/{len(tickers)} 只已加载")
+        return stats
+
+    def get_stats(self) -> Dict:
+        """最近一次各任务的运行统计与下一次计划"""
+        when, job = self.next_run()
+        return {
+            'universes': self.universes,
+            'last_runs': dict(self._last_runs),
+            'next_run': {'job': job, 'at': when.isoformat()},
+        }
+
+
+# 全局单例（界面进程内运行时使用）
+_scheduler_instance: Optional[WarmupScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def start_warmup_scheduler(data_config: Optional[DataConfig] = None) -> WarmupScheduler:
+    """启动进程内的预热调度（Streamlit 每次重跑脚本时调用也只会启动一次）"""
+    global _scheduler_instance
+    with _scheduler_lock:
+        if _scheduler_instance is None:
+            _scheduler_instance = WarmupScheduler(data_config)
+            _scheduler_instance.start()
+        return _scheduler_instance
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="按交易日历预热股票池数据")
+    parser.add_argument('--universe', action='append', default=None,
+                        help="要预热的股票池（可重复），默认 DataConfig.warmup_universes")
+    parser.add_argument('--once', choices=JOBS, default=None,
+                        help="立即运行一次指定任务后退出")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    scheduler = WarmupScheduler(universes=args.universe)
+    if args.once:
+        scheduler.run(args.once)
+        return
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        logger.info("预热调度已停止")
+
+
+if __name__ == '__main__':
+    main()
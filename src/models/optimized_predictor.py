@@ -18,6 +18,7 @@ import hashlib
 import pickle
 
 from .prediction import ReturnPredictor
+from src.data.trading_calendar import cache_expiry
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +35,7 @@ class CacheStrategy(Enum):
 class CacheConfig:
     """缓存配置"""
     strategy: CacheStrategy = CacheStrategy.MEMORY
-    ttl_seconds: int = 3600  # 1小时过期
+    ttl_seconds: int = 3600  # 盘中1小时过期；收盘定型后保留到下一次开盘（按交易日历）
     max_size: int = 1000  # 最大缓存条目数
     cache_dir: str = ".cache/recommendations"
 
@@ -89,19 +90,23 @@ class OptimizedReturnPredictor(ReturnPredictor):
         with self._cache_lock:
             if cache_key in self._cache:
                 entry = self._cache[cache_key]
-                if time.time() - entry['timestamp'] < self.cache_config.ttl_seconds:
+                if time.time() < self._expires_at(entry):
                     return entry['data']
                 else:
                     del self._cache[cache_key]
             return None
 
-    def _save_to_cache(self, cache_key: str, data: Dict) -> None:
-        """保存数据到缓存"""
+    def _expires_at(self, entry: Dict) -> float:
+        """条目的过期时间戳（旧版磁盘缓存没有 expires_at，按写入时间 + TTL）"""
+        return entry.get('expires_at', entry['timestamp'] + self.cache_config.ttl_seconds)
+
+    def _save_to_cache(self, cache_key: str, data: Dict, ticker: Optional[str] = None) -> None:
+        """保存数据到缓存；给出 ticker 时按其市场的交易日历决定过期时间"""
         with self._cache_lock:
             current_time = time.time()
             expired_keys = [
                 k for k, v in self._cache.items()
-                if current_time - v['timestamp'] > self.cache_config.ttl_seconds
+                if current_time >= self._expires_at(v)
             ]
             for key in expired_keys:
                 del self._cache[key]
@@ -111,7 +116,9 @@ class OptimizedReturnPredictor(ReturnPredictor):
                                key=lambda k: self._cache[k]['timestamp'])
                 del self._cache[oldest_key]
 
-            self._cache[cache_key] = {'data': data, 'timestamp': current_time}
+            expires_at = (cache_expiry(ticker, live_ttl=self.cache_config.ttl_seconds) if ticker
+                          else current_time + self.cache_config.ttl_seconds)
+            self._cache[cache_key] = {'data': data, 'timestamp': current_time, 'expires_at': expires_at}
 
             if self.cache_config.strategy == CacheStrategy.DISK:
                 if len(self._cache) % 10 == 0:
@@ -132,7 +139,7 @@ class OptimizedReturnPredictor(ReturnPredictor):
             return cached_result
 
         result = self.calculate_expected_return(ticker, start_date, window, confidence)
-        self._save_to_cache(cache_key, result)
+        self._save_to_cache(cache_key, result, ticker)
         return result
 
     def _process_single_stock(
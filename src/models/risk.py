@@ -3,6 +3,7 @@ import numpy as np
 from typing import Dict
 from src.config.settings import ModelConfig
 import logging
+import warnings
 
 logger = logging.getLogger(__name__)
 
@@ -44,3 +45,43 @@ class RiskCalculator:
                 '最大回撤': 0.0,
                 '夏普比率': 0.0
             }
+
+    def calculate_panel_risk_metrics(self, panel) -> pd.DataFrame:
+        """
+        对整个股票池一次性计算风险指标（与 calculate_risk_metrics 口径一致）。
+
+        Args:
+            panel: src.data.panel.Panel
+
+        Returns:
+            以股票代码为索引、列为 波动率/最大回撤/夏普比率 的 DataFrame
+        """
+        returns = panel.returns('Close').astype(np.float64)
+        valid = ~np.isnan(returns)
+        counts = valid.sum(axis=0)
+
+        # 全部停牌的股票会产生空切片警告，结果在下方统一置 0
+        with warnings.catch_warnings(), np.errstate(divide='ignore', invalid='ignore'):
+            warnings.simplefilter('ignore', RuntimeWarning)
+            std = np.nanstd(returns, axis=0, ddof=1)
+            mean = np.nanmean(returns, axis=0)
+
+            # 停牌日收益按 0 计，净值保持不变；与逐只计算一致，净值从第一个有效收益开始，
+            # 之前（未上市、停牌或首行）的初始净值 1.0 不参与回撤高点
+            cumulative_returns = np.cumprod(1 + np.where(valid, returns, 0.0), axis=0)
+            started = np.logical_or.accumulate(valid, axis=0)
+            rolling_max = np.maximum.accumulate(np.where(started, cumulative_returns, -np.inf), axis=0)
+            drawdowns = np.where(valid, (cumulative_returns - rolling_max) / rolling_max, 0.0)
+
+            stdannual = std * np.sqrt(252)
+            excess_returns = mean * 252 - self.model_config.risk_free_rate
+            sharpe_ratio = np.where(stdannual > 0, excess_returns / stdannual, 0.0)
+
+        metrics = pd.DataFrame({
+            '波动率': stdannual * 100,
+            '最大回撤': np.abs(drawdowns.min(axis=0, initial=0.0)) * 100,
+            '夏普比率': sharpe_ratio,
+        }, index=panel.tickers)
+        # 有效收益不足两天的股票无法计算
+        metrics[counts < 2] = 0.0
+        return metrics
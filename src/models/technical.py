@@ -6,6 +6,11 @@ logger = logging.getLogger(__name__)
 
 
 class TechnicalIndicatorCalculator:
+    @staticmethod
+    def _close(data: pd.DataFrame) -> pd.Series:
+        """TA-Lib 只接受 float64 输入，行情数据的价格列为 float32"""
+        return data['Close'].astype('float64')
+
     def calculate_ma(self, data: pd.DataFrame, period: int) -> pd.Series:
         """计算移动平均线 (使用 pandas)"""
         return data['Close'].rolling(window=period).mean()
@@ -14,7 +19,7 @@ class TechnicalIndicatorCalculator:
         """计算RSI (使用 TA-Lib)"""
         if 'Close' not in data.columns or data['Close'].isnull().all():
             return pd.Series(index=data.index, dtype='float64')
-        return talib.RSI(data['Close'], timeperiod=period)
+        return talib.RSI(self._close(data), timeperiod=period)
 
     def calculate_macd(
         self, data: pd.DataFrame,
@@ -26,7 +31,7 @@ class TechnicalIndicatorCalculator:
             return empty_series, empty_series, empty_series
 
         macd, macdsignal, macdhist = talib.MACD(
-            data['Close'],
+            self._close(data),
             fastperiod=fastperiod,
             slowperiod=slowperiod,
             signalperiod=signalperiod
@@ -43,7 +48,7 @@ class TechnicalIndicatorCalculator:
             return empty_series, empty_series, empty_series
 
         upperband, middleband, lowerband = talib.BBANDS(
-            data['Close'],
+            self._close(data),
             timeperiod=period,
             nbdevup=nbdevup,
             nbdevdn=nbdevdn,
@@ -4,6 +4,44 @@ from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 import json
 
+from src.data.cassette import get_cassette
+from src.data.http_pool import get_yf_session
+from src.data.rate_limiter import get_rate_limiter
+
+
+class _RecordedTicker:
+    """
+    yf.Ticker 的录制/回放包装（见 src/data/cassette.py）：
+    只有真实请求上游时才创建 Ticker 并占用限流令牌；Ticker 使用共享的 HTTP 会话。
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self._ticker = None
+
+    def _live(self, fetch):
+        def call():
+            if self._ticker is None:
+                session = get_yf_session()
+                self._ticker = (yf.Ticker(self.symbol, session=session) if session is not None
+                                else yf.Ticker(self.symbol))
+            get_rate_limiter('yfinance').acquire()
+            return fetch(self._ticker)
+        return call
+
+    @property
+    def info(self) -> dict:
+        return get_cassette().call(
+            'yf.Ticker.info', {'symbol': self.symbol}, self._live(lambda t: t.info)
+        )
+
+    def history(self, **kwargs):
+        return get_cassette().call(
+            'yf.Ticker.history', {'symbol': self.symbol, **kwargs},
+            self._live(lambda t: t.history(**kwargs))
+        )
+
+
 class StockInput(BaseModel):
     """Input schema for YFinanceStockTool."""
     symbol: str = Field(..., description="The stock symbol to analyze (e.g., 'AAPL', 'GOOGL')")
@@ -23,7 +61,7 @@ class YFinanceStockTool(BaseTool):
 
     def _run(self, symbol: str) -> str:
         try:
-            stock = yf.Ticker(symbol)
+            stock = _RecordedTicker(symbol)
             
             # Get basic info
             info = stock.info
@@ -108,7 +108,7 @@ class ReportGenerator:
                 # Candlestick Patterns
                 ohlc_cols = ['Open', 'High', 'Low', 'Close']
                 if all(col in stock_data.columns for col in ohlc_cols) and stock_data[ohlc_cols].iloc[-len(stock_data):].notna().all().all(): # Check all needed rows for talib
-                    op, hi, lo, cl = stock_data['Open'], stock_data['High'], stock_data['Low'], stock_data['Close']
+                    op, hi, lo, cl = (stock_data[col].astype('float64') for col in ohlc_cols)  # TA-Lib 需要 float64
                     if len(op) > 0: # Ensure there is data for TA-Lib functions
                         # Consistently use .values[-1] for TA-Lib pattern results
                         doji_pattern_output = talib.CDLDOJI(op, hi, lo, cl)
@@ -0,0 +1,75 @@
+"""
+离线测试的公共夹具
+
+测试不访问网络：未安装 akshare / streamlit 时以空模块代替，
+各测试用 monkeypatch 在 akshare 模块上替换需要的接口。
+
+运行: python -m pytest -q tests
+"""
+
+import os
+import sys
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _ensure_module(name: str, silent: bool = False) -> None:
+    """依赖未安装时注册一个空模块；silent 时任意属性都是无操作函数（st.info 等）"""
+    try:
+        __import__(name)
+    except ImportError:
+        module = types.ModuleType(name)
+        if silent:
+            module.__getattr__ = lambda attr: (lambda *args, **kwargs: None)
+        sys.modules[name] = module
+
+
+_ensure_module('akshare')
+_ensure_module('streamlit', silent=True)
+
+
+def _offline_calendar(self):
+    raise RuntimeError("测试中不获取交易日历")
+
+
+@pytest.fixture
+def data_config(tmp_path, monkeypatch):
+    """写入临时目录、不启动后台探测的 DataConfig，并重置相关单例"""
+    from src.config.settings import DataConfig
+    from src.data import cassette, dataset_store, metadata, minute_store, store, trading_calendar
+    from src.data.cache import clear_frame_caches
+    from src.data.smart_loader import reset_smart_loader
+
+    config = DataConfig()
+    config.store_dir = str(tmp_path / 'store')
+    config.metadata_dir = str(tmp_path / 'metadata')
+    config.universe_dir = str(tmp_path / 'universes')
+    config.health_probe_enabled = False
+
+    for module, name in ((store, '_store_instance'), (metadata, '_metadata_store_instance'),
+                         (dataset_store, '_dataset_store_instance'),
+                         (minute_store, '_minute_store_instance')):
+        monkeypatch.setattr(module, name, None)
+    # 交易日历按工作日估算，不请求上游、不读写仓库内的缓存
+    monkeypatch.setattr(DataConfig, 'calendar_dir', str(tmp_path / 'calendar'))
+    monkeypatch.setattr(trading_calendar, '_calendars', {})
+    monkeypatch.setattr(trading_calendar.TradingCalendar, '_fetch_days', _offline_calendar)
+    monkeypatch.setattr(cassette, '_cassette_instance',
+                        cassette.Cassette(str(tmp_path / 'cassettes'), 'off'))
+    reset_smart_loader()
+    clear_frame_caches()
+    yield config
+    reset_smart_loader()
+    clear_frame_caches()
+
+
+@pytest.fixture
+def ak(monkeypatch):
+    """可替换接口的 akshare 模块（AKShareDataLoader 依赖 requests）"""
+    pytest.importorskip('requests')
+    import akshare
+    return akshare
@@ -0,0 +1,202 @@
+"""
+AKShare 日线经本地存储加载的测试 - 增量拉取、缺口补齐与复权因子
+
+上游接口以假数据代替：RAW 为不复权日线，2024-01-04 每10股送10股（价格减半）。
+"""
+
+import pandas as pd
+import pytest
+
+from src.data.store import PARQUET_AVAILABLE
+
+pytestmark = pytest.mark.skipif(not PARQUET_AVAILABLE, reason="需要 pyarrow")
+
+EX_DATE = pd.Timestamp('2024-01-04')
+
+# 日期, 不复权收盘价, 涨跌额（交易所按除权后的昨收计算）
+RAW = [
+    ('2024-01-02', 10.0, 0.0),
+    ('2024-01-03', 10.5, 0.5),
+    ('2024-01-04', 5.2, -0.05),
+    ('2024-01-05', 5.3, 0.1),
+    ('2024-01-08', 5.4, 0.1),
+]
+
+
+def _factor(date, adjust):
+    """前复权：除权日前的价格除以 2；后复权：除权日起的价格乘以 2"""
+    before = pd.Timestamp(date) < EX_DATE
+    if adjust == 'qfq':
+        return 2.0 if before else 1.0
+    return 1.0 if before else 2.0
+
+
+class FakeHistory:
+    """stock_zh_a_hist / stock_zh_a_daily 的替身，记录每次请求"""
+
+    def __init__(self, rows=RAW):
+        self.rows = list(rows)
+        self.calls = []
+        self.factor_calls = 0
+        self.factor_error = None
+        self.ex_right_published = True  # 因子表中是否已有 EX_DATE 的除权记录
+
+    def hist(self, symbol, period, start_date, end_date, adjust):
+        self.calls.append((start_date, end_date, adjust))
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        records = []
+        for day, close, change in self.rows:
+            if not start <= pd.Timestamp(day) <= end:
+                continue
+            scale = 1.0 / _factor(day, 'qfq') if adjust == 'qfq' else 1.0
+            price = close * scale
+            records.append({'日期': day, '开盘': price, '收盘': price, '最高': price, '最低': price,
+                            '成交量': 1000, '成交额': 1e6, '涨跌额': change * scale})
+        return pd.DataFrame(records)
+
+    def daily(self, symbol, adjust):
+        self.factor_calls += 1
+        if self.factor_error is not None:
+            raise self.factor_error
+        kind = adjust.split('-')[0]
+        if not self.ex_right_published:
+            return pd.DataFrame({'date': ['2023-12-29'], f"{kind}_factor": [1.0]})
+        dates = ['2023-12-29', EX_DATE.strftime('%Y-%m-%d')]
+        return pd.DataFrame({'date': dates,
+                             f"{kind}_factor": [_factor(d, kind) for d in dates]})
+
+    def history_calls(self, adjust=''):
+        return [call for call in self.calls if call[2] == adjust]
+
+
+@pytest.fixture
+def upstream(ak, monkeypatch):
+    fake = FakeHistory()
+    monkeypatch.setattr(ak, 'stock_zh_a_hist', fake.hist, raising=False)
+    monkeypatch.setattr(ak, 'stock_zh_a_daily', fake.daily, raising=False)
+    return fake
+
+
+@pytest.fixture
+def loader(data_config, upstream):
+    from src.data.loader_akshare import AKShareDataLoader
+    return AKShareDataLoader(data_config)
+
+
+def _closes(df):
+    return [round(float(x), 3) for x in df['Close']]
+
+
+def test_missing_factors_fall_back_to_upstream_qfq(loader, upstream):
+    from src.data.loader_akshare import AKShareDataLoader
+
+    upstream.factor_error = ConnectionError("sina unavailable")
+    df, _ = loader.load_stock_data('600000', start_date='20240102', end_date='20240105')
+
+    # 不复权的 10.0 / 10.5 / 5.2 不能作为前复权价格返回
+    assert _closes(df) == [5.0, 5.25, 5.2, 5.3]
+    assert upstream.history_calls('qfq') == [('20240102', '20240105', 'qfq')]
+    # 不复权K线仍写入存储，因子恢复后可直接换算
+    assert loader.store.coverage('600000')
+    assert loader.store.read('600000', '20240102', '20240105')['Close'].iloc[0] == 10.0
+
+    upstream.factor_error = None
+    fresh = AKShareDataLoader(loader.config)
+    fresh.cache.clear()
+    df, _ = fresh.load_stock_data('600000', start_date='20240102', end_date='20240105')
+    assert _closes(df) == [5.0, 5.25, 5.2, 5.3]
+    assert len(upstream.history_calls('qfq')) == 1
+
+
+def test_hfq_and_raw_from_factor_table(loader, upstream):
+    hfq, _ = loader.load_stock_data('600000', start_date='20240102', end_date='20240105',
+                                    adjust='hfq')
+    raw, _ = loader.load_stock_data('600000', start_date='20240102', end_date='20240105',
+                                    adjust='none')
+    assert _closes(hfq) == [10.0, 10.5, 10.4, 10.6]
+    assert _closes(raw) == [10.0, 10.5, 5.2, 5.3]
+    assert upstream.history_calls('qfq') == [] and upstream.history_calls('hfq') == []
+
+
+def test_stock_loader_never_labels_raw_as_adjusted(data_config, upstream):
+    from src.data.loader import StockDataLoader
+    from src.data.store import get_ohlcv_store
+
+    store = get_ohlcv_store(data_config)
+    bars = pd.DataFrame({'Date': pd.to_datetime([d for d, _, _ in RAW[:4]]),
+                         'Close': [c for _, c, _ in RAW[:4]], 'Change': [c for _, _, c in RAW[:4]],
+                         'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Volume': 1000})
+    store.write('600000', bars, '20240102', '20240105', basis='raw')
+
+    loader = StockDataLoader(data_config)
+    df, _ = loader.load_stock_data('600000', start_date='20240102', end_date='20240105',
+                                   adjust='hfq')
+    assert df.empty
+    raw, _ = loader.load_stock_data('600000', start_date='20240102', end_date='20240105',
+                                    adjust='none')
+    assert _closes(raw) == [10.0, 10.5, 5.2, 5.3]
+
+
+def test_tail_only_fetch(loader, upstream):
+    loader.load_stock_data('600000', start_date='20240102', end_date='20240104')
+    assert upstream.history_calls() == [('20240102', '20240104', '')]
+    assert upstream.factor_calls == 2
+
+    loader.cache.clear()
+    df, _ = loader.load_stock_data('600000', start_date='20240102', end_date='20240108',
+                                   adjust='none')
+    # 只拉取尾部，从本地最后一根K线开始（重叠一根用于判断除权）
+    assert upstream.history_calls()[1:] == [('20240104', '20240108', '')]
+    assert _closes(df) == [10.0, 10.5, 5.2, 5.3, 5.4]
+    # 因子表未过期且尾部没有新的除权除息，不重新请求
+    assert upstream.factor_calls == 2
+
+    loader.cache.clear()
+    loader.load_stock_data('600000', start_date='20240102', end_date='20240108')
+    assert len(upstream.history_calls()) == 2
+
+
+def test_gap_fill_fetches_only_missing_ranges(loader, upstream):
+    loader.load_stock_data('600000', start_date='20240103', end_date='20240104', adjust='none')
+    loader.cache.clear()
+    df, _ = loader.load_stock_data('600000', start_date='20240102', end_date='20240105',
+                                   adjust='none')
+
+    assert upstream.history_calls() == [
+        ('20240103', '20240104', ''),
+        ('20240102', '20240102', ''),   # 头部缺口按缺口原样拉取
+        ('20240104', '20240105', ''),   # 尾部缺口从最后一根K线开始
+    ]
+    assert _closes(df) == [10.0, 10.5, 5.2, 5.3]
+    assert loader.store.missing_ranges('600000', '20240102', '20240105') == []
+
+
+def test_new_ex_right_refreshes_factors(loader, upstream):
+    upstream.ex_right_published = False
+    before, _ = loader.load_stock_data('600000', start_date='20240102', end_date='20240103')
+    assert _closes(before) == [10.0, 10.5]
+    assert upstream.factor_calls == 2
+
+    # 尾部出现除权除息（交易所昨收与实际昨收不一致），未过期的因子表也要重新请求
+    upstream.ex_right_published = True
+    loader.cache.clear()
+    after, _ = loader.load_stock_data('600000', start_date='20240102', end_date='20240105')
+    assert upstream.factor_calls == 4
+    assert _closes(after) == [5.0, 5.25, 5.2, 5.3]
+    # 已存储的K线不重新拉取
+    assert upstream.history_calls() == [('20240102', '20240103', ''), ('20240103', '20240105', '')]
+
+
+def test_legacy_adjusted_store_is_refetched_as_raw(loader, upstream):
+    legacy = pd.DataFrame({'Date': pd.to_datetime(['2024-01-02', '2024-01-03']),
+                           'Open': 5.0, 'High': 5.0, 'Low': 5.0, 'Close': [5.0, 5.25],
+                           'Volume': 1000})
+    loader.store.write('600000', legacy, '20240102', '20240103')
+    assert loader.store.price_basis('600000') is None
+
+    df, _ = loader.load_stock_data('600000', start_date='20240102', end_date='20240105',
+                                   adjust='none')
+    # 旧版前复权数据整体清除，按不复权口径重新拉取整个区间
+    assert upstream.history_calls() == [('20240102', '20240105', '')]
+    assert loader.store.price_basis('600000') == 'raw'
+    assert _closes(df) == [10.0, 10.5, 5.2, 5.3]
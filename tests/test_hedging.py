@@ -0,0 +1,79 @@
+"""
+对冲请求测试 - 只向独立提供该市场数据的备用数据源发出对冲
+"""
+
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+
+class FakeSource:
+    """按固定延迟返回一根K线的数据源"""
+
+    def __init__(self, delay: float, markets=None):
+        self.delay = delay
+        self.markets = markets
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def load_stock_data(self, stock_code, period='daily', start_date=None, end_date=None,
+                        raise_errors=False):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return pd.DataFrame({'Date': [pd.Timestamp('2024-01-02')], 'Close': [10.0]}), stock_code
+
+
+@pytest.fixture
+def hedging_loader(data_config):
+    from src.data.smart_loader import SmartDataSource
+
+    data_config.hedge_enabled = True
+    data_config.routing_min_samples = 3
+
+    def build(primary, backup):
+        loader = SmartDataSource(data_config)
+        loader.data_sources = {'primary': primary, 'backup': backup}
+        loader.source_priority = ['primary', 'backup']
+        loader._start_health_monitor()
+        loader.initialized = True
+        # 首选数据源的历史延迟约 20ms：超过 16ms 未返回即对冲
+        for _ in range(3):
+            loader.record_outcome('primary', True, 0.02)
+        return loader
+
+    loaders = []
+
+    def factory(primary, backup):
+        loaders.append(build(primary, backup))
+        return loaders[-1]
+
+    yield factory
+    for loader in loaders:
+        loader.reset()
+
+
+def test_hedges_to_independent_backup(hedging_loader):
+    primary, backup = FakeSource(0.5, markets=('CN',)), FakeSource(0.0)
+    loader = hedging_loader(primary, backup)
+
+    df, _, source = loader.load_stock_data('600000', 'daily', '20240101', '20240131')
+
+    assert source == 'backup' and not df.empty
+    stats = loader.get_hedge_stats()
+    assert stats['hedged'] == 1 and stats['backup_wins'] == 1
+
+
+@pytest.mark.parametrize('backup_markets', [(), ('US',)])
+def test_no_hedge_without_independent_backup(hedging_loader, backup_markets):
+    # 备用数据源回到 SmartDataSource 加载（markets 为空），或不覆盖A股
+    primary, backup = FakeSource(0.1, markets=('CN',)), FakeSource(0.0, markets=backup_markets)
+    loader = hedging_loader(primary, backup)
+
+    df, _, source = loader.load_stock_data('600000', 'daily', '20240101', '20240131')
+
+    assert source == 'primary' and not df.empty
+    assert backup.calls == 0
+    assert loader.get_hedge_stats()['eligible'] == 0
@@ -0,0 +1,76 @@
+"""
+共享 HTTP 连接池测试 - yfinance 的 curl_cffi 会话每线程一个，并计入连接池统计
+"""
+
+import sys
+import threading
+import types
+
+import pytest
+
+
+class FakeResponse:
+    def __init__(self, local_port):
+        self.primary_ip = '203.0.113.1'
+        self.local_port = local_port
+
+
+class FakeCurlSession:
+    """curl_cffi.requests.Session 的替身：每个会话固定一个本地端口（单连接、持续复用）"""
+    ports = iter(range(50000, 60000))
+
+    def __init__(self, impersonate=None):
+        self.port = next(FakeCurlSession.ports)
+        self.closed = False
+
+    def request(self, method, url, *args, **kwargs):
+        return FakeResponse(self.port)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def http_pool(monkeypatch):
+    pytest.importorskip('requests')
+    from src.data import http_pool
+
+    curl_cffi = types.ModuleType('curl_cffi')
+    curl_cffi.requests = types.SimpleNamespace(Session=FakeCurlSession)
+    monkeypatch.setitem(sys.modules, 'curl_cffi', curl_cffi)
+    monkeypatch.setitem(sys.modules, 'curl_cffi.requests', curl_cffi.requests)
+    monkeypatch.setattr(http_pool, '_curl_session_class', None)
+    monkeypatch.setattr(http_pool, '_pool_instance', None)
+    yield http_pool
+    if http_pool._pool_instance is not None:
+        http_pool._pool_instance.close()
+
+
+def test_yf_session_is_per_thread_and_counted(http_pool):
+    main_session = http_pool.get_yf_session()
+    assert http_pool.get_yf_session() is main_session
+    for _ in range(3):
+        main_session.get('https://query1.finance.yahoo.com/v8/finance/chart/AAPL')
+
+    other = {}
+
+    def worker():
+        other['session'] = http_pool.get_yf_session()
+        other['session'].get('https://query1.finance.yahoo.com/v8/finance/chart/MSFT')
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    assert other['session'] is not main_session
+    stats = http_pool.get_http_pool_stats()
+    assert stats['curl_sessions'] == 2
+    assert stats['curl_requests'] == 4
+    assert stats['requests'] == 4
+    assert stats['host_requests'] == {'query1.finance.yahoo.com': 4}
+    assert stats['connections_opened'] == 2
+    assert stats['connections_reused'] == 2
+    assert stats['reuse_rate'] == 0.5
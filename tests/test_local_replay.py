@@ -0,0 +1,59 @@
+"""
+本地回放数据源测试 - 回放的数据不能写入真实的日线存储与共享缓存
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from src.data.cache import get_frame_cache
+from src.data.store import OHLCVStore, PARQUET_AVAILABLE
+
+
+def _bars(dates):
+    n = len(dates)
+    return pd.DataFrame({
+        'Date': pd.to_datetime(dates),
+        'Open': [10.0] * n, 'High': [11.0] * n, 'Low': [9.0] * n,
+        'Close': [10.5] * n, 'Volume': [1000.0] * n,
+    })
+
+
+def _snapshot(root):
+    """目录下所有文件及其修改时间"""
+    files = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            files[path] = os.path.getmtime(path)
+    return files
+
+
+@pytest.fixture
+def replay_config(data_config, tmp_path):
+    replay_dir = tmp_path / 'replay'
+    OHLCVStore(str(replay_dir)).write('600000', _bars(['2024-01-02', '2024-01-03', '2024-01-04']),
+                                      '20240102', '20240104')
+    # 真实存储中已有其他股票的数据，回放后应保持原样
+    OHLCVStore(data_config.store_dir).write('000001', _bars(['2024-01-02']), '20240102', '20240102')
+
+    data_config.local_source_exclusive = True
+    data_config.local_source_dir = str(replay_dir)
+    return data_config
+
+
+@pytest.mark.skipif(not PARQUET_AVAILABLE, reason="需要 pyarrow")
+def test_replay_leaves_real_store_untouched(replay_config):
+    from src.data.loader import StockDataLoader
+
+    before = _snapshot(replay_config.store_dir)
+    real_cache_size = len(get_frame_cache('stock_loader'))
+
+    loader = StockDataLoader(replay_config)
+    df, code = loader.load_stock_data('600000', start_date='20240101', end_date='20240105')
+
+    assert len(df) == 3
+    assert loader.store.coverage('600000') == []
+    assert _snapshot(replay_config.store_dir) == before
+    assert len(get_frame_cache('stock_loader')) == real_cache_size
@@ -0,0 +1,48 @@
+"""
+风险指标测试 - 面板一次性计算与逐只计算口径一致
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config.settings import ModelConfig
+from src.data.panel import Panel
+from src.models.risk import RiskCalculator
+
+DATES = pd.bdate_range('2024-01-01', periods=8)
+
+
+def _frame(closes, dates=DATES):
+    """closes 中的 None 为停牌日（不生成K线）"""
+    rows = [(d, c) for d, c in zip(dates, closes) if c is not None]
+    return pd.DataFrame({'Date': [d for d, _ in rows], 'Close': [c for _, c in rows]})
+
+
+FRAMES = {
+    'FIRST_DAY_LOSS': _frame([10.0, 9.0, 9.5, 9.8, 10.2, 9.9, 10.5, 10.1]),
+    'LATE_LISTING': _frame([None, None, 20.0, 18.0, 19.0, 21.0, 20.5, 19.0]),
+    'SUSPENDED': _frame([5.0, 5.2, None, None, 4.8, 4.9, 5.1, 4.7]),
+    'TOO_SHORT': _frame([None, None, None, None, None, None, 8.0, 8.4]),
+}
+
+
+def test_panel_metrics_match_per_ticker():
+    calculator = RiskCalculator(ModelConfig())
+    tickers = list(FRAMES)
+    panel = Panel.from_frames([FRAMES[t] for t in tickers], tickers, fields=['Close'])
+
+    metrics = calculator.calculate_panel_risk_metrics(panel)
+
+    for ticker in tickers:
+        expected = calculator.calculate_risk_metrics(FRAMES[ticker])
+        if ticker == 'TOO_SHORT':
+            # 只有一个有效收益，面板按规则置 0
+            assert (metrics.loc[ticker] == 0.0).all()
+            continue
+        for name, value in expected.items():
+            assert metrics.loc[ticker, name] == pytest.approx(value, rel=1e-4, abs=1e-6), (ticker, name)
+
+    # 首日即下跌（10.0 -> 9.0）不计入回撤：最大回撤为其后的 10.5 -> 10.1
+    assert metrics.loc['FIRST_DAY_LOSS', '最大回撤'] == pytest.approx((1 - 10.1 / 10.5) * 100, rel=1e-4)
+    assert not np.isnan(metrics.to_numpy()).any()
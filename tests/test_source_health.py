@@ -0,0 +1,59 @@
+"""
+数据源健康与熔断测试 - 上游异常必须经由真实请求计入熔断器
+"""
+
+import pandas as pd
+import pytest
+
+
+def _connection_error(**kwargs):
+    raise ConnectionError("upstream unavailable")
+
+
+@pytest.fixture
+def smart_loader(data_config, ak, monkeypatch):
+    from src.data.smart_loader import get_smart_loader
+
+    data_config.store_enabled = False
+    monkeypatch.setattr(ak, 'stock_zh_a_hist', _connection_error, raising=False)
+    loader = get_smart_loader(data_config)
+    loader.initialize_sources()
+    assert 'akshare' in loader.data_sources
+    return loader
+
+
+def test_upstream_errors_trip_breaker_through_load_stock_data(smart_loader, data_config):
+    threshold = data_config.unhealthy_after_failures
+    for _ in range(threshold):
+        df, _, source = smart_loader.load_stock_data('600000', 'daily', '20240101', '20240131')
+        assert df.empty and source == 'failed'
+
+    stats = smart_loader.get_source_stats()
+    assert stats['circuit_breakers']['akshare']['state'] == 'open'
+    assert stats['latency']['akshare']['error_rate'] == 1.0
+    assert smart_loader.source_status['akshare'] == 'unhealthy'
+
+
+def test_empty_result_is_recorded_as_success(smart_loader, ak, monkeypatch):
+    monkeypatch.setattr(ak, 'stock_zh_a_hist', lambda **kwargs: pd.DataFrame(), raising=False)
+    smart_loader.load_stock_data('600000', 'daily', '20240101', '20240131')
+
+    stats = smart_loader.get_source_stats()
+    assert stats['circuit_breakers']['akshare'] == {'state': 'closed', 'consecutive_failures': 0}
+    assert stats['latency']['akshare']['error_rate'] == 0.0
+
+
+def test_quote_failures_mark_source_unhealthy(smart_loader, data_config, ak, monkeypatch):
+    from src.data import loader_akshare
+    from src.data.spot import SpotSnapshot
+
+    monkeypatch.setattr(ak, 'stock_zh_a_spot', _connection_error, raising=False)
+    monkeypatch.setattr(loader_akshare, '_spot_snapshot',
+                        SpotSnapshot(loader_akshare._fetch_spot, ttl_seconds=0))
+
+    for _ in range(data_config.unhealthy_after_failures):
+        quote, source = smart_loader.get_real_time_quote('600000')
+        assert quote == {} and source == 'failed'
+
+    assert smart_loader.source_status['akshare'] == 'unhealthy'
+    assert smart_loader.get_source_stats()['latency']['akshare']['total_errors'] == 3